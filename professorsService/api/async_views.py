@@ -0,0 +1,110 @@
+"""
+Native async versions of the professor read endpoints.
+
+DRF's ``@api_view`` is synchronous, so under ASGI every request to
+``views.py`` is pushed through a thread-sensitive sync adapter. These views
+are plain Django coroutines: the ORM is queried with ``aget`` and
+``async for``, the cache through its async API, and authentication runs
+inline because ``ExternalJWTAuthentication`` does no I/O (it verifies the
+token locally or hits its in-memory cache). Responses match the sync views
+byte for byte and share their ETags and cached bodies.
+"""
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from rest_framework import status
+from rest_framework.exceptions import APIException, AuthenticationFailed, NotAuthenticated, PermissionDenied, Throttled
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.response import Response
+from rest_framework.views import exception_handler
+
+from base import search
+from base.models import Professor, Review
+from base.search import search_professors
+from professorsService.authentication import ExternalJWTAuthentication
+from .caching import acatalog_etag, aprofessor_etag, async_versioned_response
+from .pagination import KeysetPagination
+from .permissions import IsStudent
+from .throttling import ReadThrottle, SearchThrottle, acheck_throttles
+from . import fastpath
+from .fastpath import JSONBytesResponse
+from .views import recent_reviews, values_for
+
+
+def async_api_view(permission_class, throttles=()):
+    """
+    Authenticate, authorize and throttle like ``@api_view`` +
+    ``@permission_classes`` + ``@throttle_classes``, then render the
+    returned DRF ``Response`` as JSON.
+    """
+    def decorator(view):
+        @wraps(view)
+        async def wrapper(request, *args, **kwargs):
+            try:
+                check_access(request, permission_class)
+                wait = await acheck_throttles(request, throttles)
+                if wait is not None:
+                    raise Throttled(wait)
+                response = await view(request, *args, **kwargs)
+            except (AuthenticationFailed, NotAuthenticated, PermissionDenied) as exc:
+                # ExternalJWTAuthentication has no authenticate_header, so like
+                # DRF every authentication failure is answered with 403
+                response = Response({'detail': exc.detail}, status=status.HTTP_403_FORBIDDEN)
+            except APIException as exc:
+                # Throttling, invalid cursors and the like, answered as DRF would
+                response = exception_handler(exc, {})
+            response.accepted_renderer = JSONRenderer()
+            response.accepted_media_type = JSONRenderer.media_type
+            response.renderer_context = {'request': request, 'response': response}
+            return response
+        return wrapper
+    return decorator
+
+
+def check_access(request, permission_class):
+    result = ExternalJWTAuthentication().authenticate(request)
+    if result is None:
+        raise NotAuthenticated()
+    request.user, request.auth = result
+    if not permission_class().has_permission(request, None):
+        raise PermissionDenied()
+
+
+@async_api_view(IsStudent, throttles=(ReadThrottle, SearchThrottle))
+@async_versioned_response(acatalog_etag)
+async def getProfessorsAsync(request):
+    """
+    Async ``getProfessors``: same query parameters, body and headers.
+    """
+    query = request.GET.get('query', '')
+    include_reviews = 'reviews' in request.GET.get('include', '').split(',')
+    professors = Professor.objects.all()
+    ordering = ('name', 'id')
+    if query:
+        # The index check queries sqlite_master once per process; keep it off the event loop
+        await sync_to_async(search.is_available)()
+        professors, ordering = search_professors(professors, query)
+    paginator = KeysetPagination(ordering=ordering)
+    if include_reviews:
+        page = await paginator.apaginate_queryset(values_for(professors, fastpath.PROFESSOR, ordering), Request(request))
+        reviews = Review.objects.filter(professor_id__in=[row['id'] for row in page])
+        data = await fastpath.aprofessors_with_reviews(page, reviews)
+    else:
+        page = await paginator.apaginate_queryset(values_for(professors, fastpath.PROFESSOR_SUMMARY, ordering), Request(request))
+        data = fastpath.summaries(page)
+    return paginator.get_paginated_response(data)
+
+
+@async_api_view(IsStudent, throttles=(ReadThrottle,))
+@async_versioned_response(aprofessor_etag)
+async def getProfessorAsync(request, pk):
+    """
+    Async ``getProfessor``: same body and headers.
+    """
+    try:
+        professor = await Professor.objects.values(*fastpath.PROFESSOR.fields).aget(pk=pk)
+    except Professor.DoesNotExist:
+        return Response({'error': 'Professor not found'}, status=status.HTTP_404_NOT_FOUND)
+    data, = await fastpath.aprofessors_with_reviews([professor], recent_reviews(pk, request))
+    return JSONBytesResponse(data)
@@ -0,0 +1,234 @@
+"""
+Versioned response caching and conditional GET for professor reads.
+
+Every professor has a version counter and the catalog (anything a list
+could show) has a global one, both kept in Django's cache. Write views
+bump them; read views derive a strong ETag from the versions alone, so
+``If-None-Match`` can be answered with 304 without touching the ORM, and
+serialized bodies are cached under that ETag.
+"""
+import hashlib
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.utils.http import parse_etags
+from rest_framework import status
+from rest_framework.response import Response
+
+from .fastpath import JSONBytesResponse
+
+CATALOG_VERSION_KEY = 'professors:version:catalog'
+PROFESSOR_VERSION_KEY = 'professors:version:{pk}'
+BODY_KEY = 'professors:body:{etag}'
+
+LOCAL_CACHE_WARNING = (
+    "The cache is local to this process, so running servers keep their cached bodies and ETags "
+    "until they restart. Set PROFESSORS_REDIS_URL to share the cache with them."
+)
+
+
+def _get_version(key):
+    version = cache.get(key)
+    if version is None:
+        # Seed from the clock, so a version lost to eviction never comes
+        # back with a value a stale body may still be cached under.
+        cache.add(key, time.time_ns(), timeout=None)
+        version = cache.get(key)
+    return version
+
+
+async def _aget_version(key):
+    version = await cache.aget(key)
+    if version is None:
+        await cache.aadd(key, time.time_ns(), timeout=None)
+        version = await cache.aget(key)
+    return version
+
+
+def _bump(key):
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, time.time_ns(), timeout=None)
+
+
+def catalog_version():
+    return _get_version(CATALOG_VERSION_KEY)
+
+
+def professor_version(pk):
+    return _get_version(PROFESSOR_VERSION_KEY.format(pk=pk))
+
+
+def bump_catalog():
+    _bump(CATALOG_VERSION_KEY)
+
+
+def bump_professor(pk):
+    """A professor changed: invalidate its detail view and every list."""
+    _bump(PROFESSOR_VERSION_KEY.format(pk=pk))
+    bump_catalog()
+
+
+def bump_professors(pks):
+    """
+    ``bump_professor`` for many professors with one cache round-trip. The
+    new versions come from the clock like fresh ones, which is past any
+    version a body can have been cached under.
+    """
+    now = time.time_ns()
+    cache.set_many({PROFESSOR_VERSION_KEY.format(pk=pk): now for pk in pks}, timeout=None)
+    bump_catalog()
+
+
+def warn_if_process_local(command):
+    """
+    Warn from a management command that its bumps cannot reach the server:
+    with the default locmem cache every process has its own versions.
+    """
+    if isinstance(caches['default'], LocMemCache):
+        command.stderr.write(command.style.WARNING(LOCAL_CACHE_WARNING))
+
+
+def professor_versions(pks):
+    """``professor_version`` for many professors with one cache round-trip."""
+    keys = {PROFESSOR_VERSION_KEY.format(pk=pk): pk for pk in pks}
+    versions = cache.get_many(keys)
+    return {pk: versions[key] if key in versions else _get_version(key) for key, pk in keys.items()}
+
+
+def professor_etag(request, pk):
+    return _professor_etag(pk, professor_version(pk), _params_digest(request))
+
+
+def _professor_etag(pk, version, digest):
+    return f'"p{pk}-{version}-{digest}"'
+
+
+def detail_etags(pks):
+    """ETag of each professor's detail view without query parameters."""
+    digest = _digest('')
+    return {pk: _professor_etag(pk, version, digest) for pk, version in professor_versions(pks).items()}
+
+
+def batch_etag(etags):
+    return f'"b{_digest("".join(etags))}"'
+
+
+def cached_bodies(etags):
+    """Cached response bodies of ``etags``, fetched together; missing ones are left out."""
+    keys = {BODY_KEY.format(etag=etag): etag for etag in etags}
+    return {keys[key]: data for key, (data, headers) in cache.get_many(keys).items()}
+
+
+def cache_bodies(bodies):
+    """Cache ``{etag: data}`` the way ``versioned_response`` caches a view's body."""
+    cache.set_many(
+        {BODY_KEY.format(etag=etag): (data, {}) for etag, data in bodies.items()},
+        settings.PROFESSORS_CACHE_TIMEOUT,
+    )
+
+
+def reviews_etag(request, pk):
+    return f'"r{pk}-{professor_version(pk)}-{_params_digest(request)}"'
+
+
+def similar_etag(request, pk):
+    # Neighbour lists show other professors and are rebuilt in bulk, so
+    # they follow the catalog version rather than the professor's own
+    return f'"s{pk}-{catalog_version()}-{_params_digest(request)}"'
+
+
+def catalog_etag(request, *args, **kwargs):
+    return f'"c{catalog_version()}-{_params_digest(request)}"'
+
+
+def catalog_etag_for(view):
+    """
+    ``catalog_etag`` for another view that depends on the whole catalog.
+    The name keeps its ETags, and so its cached bodies, apart from the
+    list's when the query strings match.
+    """
+    def etag(request, *args, **kwargs):
+        return f'"c{catalog_version()}-{view}-{_params_digest(request)}"'
+    return etag
+
+
+async def aprofessor_etag(request, pk):
+    return _professor_etag(pk, await _aget_version(PROFESSOR_VERSION_KEY.format(pk=pk)), _params_digest(request))
+
+
+async def acatalog_etag(request, *args, **kwargs):
+    return f'"c{await _aget_version(CATALOG_VERSION_KEY)}-{_params_digest(request)}"'
+
+
+def _params_digest(request):
+    return _digest(request.GET.urlencode())
+
+
+def _digest(text):
+    return hashlib.sha1(text.encode()).hexdigest()[:16]
+
+
+def not_modified(request, etag):
+    if_none_match = [tag.removeprefix('W/') for tag in parse_etags(request.headers.get('If-None-Match', ''))]
+    return etag in if_none_match or '*' in if_none_match
+
+
+def versioned_response(etag_func):
+    """
+    Wrap a read view: answer ``If-None-Match`` with 304 and serve cached
+    200 bodies (plus their headers) for the current ETag.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            etag = etag_func(request, *args, **kwargs)
+            if not_modified(request, etag):
+                return Response(status=status.HTTP_304_NOT_MODIFIED, headers={'ETag': etag})
+
+            body_key = BODY_KEY.format(etag=etag)
+            cached = cache.get(body_key)
+            if cached is not None:
+                data, headers = cached
+                return JSONBytesResponse(data, headers={**headers, 'ETag': etag})
+
+            response = view(request, *args, **kwargs)
+            if response.status_code == status.HTTP_200_OK:
+                headers = dict(response.headers)
+                cache.set(body_key, (response.data, headers), settings.PROFESSORS_CACHE_TIMEOUT)
+                response['ETag'] = etag
+            return response
+        return wrapper
+    return decorator
+
+
+def async_versioned_response(etag_func):
+    """
+    ``versioned_response`` for async views, using the async cache API. It
+    shares ETags and cached bodies with the sync views.
+    """
+    def decorator(view):
+        @wraps(view)
+        async def wrapper(request, *args, **kwargs):
+            etag = await etag_func(request, *args, **kwargs)
+            if not_modified(request, etag):
+                return Response(status=status.HTTP_304_NOT_MODIFIED, headers={'ETag': etag})
+
+            body_key = BODY_KEY.format(etag=etag)
+            cached = await cache.aget(body_key)
+            if cached is not None:
+                data, headers = cached
+                return JSONBytesResponse(data, headers={**headers, 'ETag': etag})
+
+            response = await view(request, *args, **kwargs)
+            if response.status_code == status.HTTP_200_OK:
+                headers = dict(response.headers)
+                await cache.aset(body_key, (response.data, headers), settings.PROFESSORS_CACHE_TIMEOUT)
+                response['ETag'] = etag
+            return response
+        return wrapper
+    return decorator
@@ -0,0 +1,165 @@
+"""
+Read-only fast path for the professor list, detail and similar endpoints
+and the review search.
+
+DRF serializers resolve every field of every object through generic
+``get_attribute``/``to_representation`` calls, which costs more than the
+SQL on list pages. Here rows are read with ``.values()`` and turned into
+output dicts by ``RowMapper``s compiled once from the serializers
+themselves, so field names, order and formatting stay exactly theirs:
+values are copied as they come from the database and only fields whose
+representation differs (floats, datetimes, snippets) are converted.
+``JSONBytesResponse`` then renders the result with a single
+``json.dumps`` using ``JSONRenderer``'s options, so the bytes are the
+same as before.
+"""
+import copy
+import json
+from collections import defaultdict
+from operator import itemgetter
+
+from rest_framework import serializers
+from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils import encoders
+
+from professorsService.profiling import timed
+from .serializers import (
+    LeaderboardSerializer, ProfessorSerializer, ProfessorSummarySerializer, ReviewSearchResultSerializer, ReviewSerializer,
+    SimilarProfessorSerializer,
+)
+
+# Fields whose database value already is their representation
+_VERBATIM = (serializers.CharField, serializers.IntegerField, serializers.PrimaryKeyRelatedField)
+
+
+class RowMapper:
+    """
+    Builds the representation of a ``serializer_class`` instance from a
+    ``.values(*mapper.fields)`` row. Nested serializer fields keep their
+    place in the output and are filled by the caller.
+    """
+
+    def __init__(self, serializer_class):
+        declared = serializer_class().fields
+        flat = {name: field for name, field in declared.items() if not isinstance(field, serializers.BaseSerializer)}
+        self.template = dict.fromkeys(declared)
+        self.names = tuple(flat)
+        self.fields = tuple(field.source for field in flat.values())
+        self._get = itemgetter(*self.fields)
+        self._converted = {name: field for name, field in flat.items() if not isinstance(field, _VERBATIM)}
+
+    def bind(self):
+        """
+        Return ``build(row, **nested)`` for the current request. Datetime
+        fields get the active time zone now instead of looking it up for
+        every value.
+        """
+        converters = []
+        for name, field in self._converted.items():
+            if isinstance(field, serializers.DateTimeField) and not hasattr(field, 'timezone'):
+                field = copy.copy(field)
+                field.timezone = field.default_timezone()
+            converters.append((name, field.to_representation))
+        template, names, get = self.template, self.names, self._get
+
+        def build(row, **nested):
+            data = template.copy()
+            data.update(zip(names, get(row)))
+            for name, convert in converters:
+                value = data[name]
+                if value is not None:
+                    data[name] = convert(value)
+            data.update(nested)
+            return data
+        return build
+
+
+PROFESSOR_SUMMARY = RowMapper(ProfessorSummarySerializer)
+LEADERBOARD = RowMapper(LeaderboardSerializer)
+PROFESSOR = RowMapper(ProfessorSerializer)
+REVIEW = RowMapper(ReviewSerializer)
+SIMILAR_PROFESSOR = RowMapper(SimilarProfessorSerializer)
+REVIEW_SEARCH_RESULT = RowMapper(ReviewSearchResultSerializer)
+
+
+def summaries(rows):
+    """``ProfessorSummarySerializer(rows, many=True).data`` for ``.values()`` rows."""
+    with timed('serialize'):
+        build = PROFESSOR_SUMMARY.bind()
+        return [build(row) for row in rows]
+
+
+def leaderboard(rows):
+    """``LeaderboardSerializer(rows, many=True).data`` for ``.values()`` rows."""
+    with timed('serialize'):
+        build = LEADERBOARD.bind()
+        return [build(row) for row in rows]
+
+
+def similar_professors(rows):
+    """``SimilarProfessorSerializer(rows, many=True).data`` for ``.values()`` rows."""
+    with timed('serialize'):
+        build = SIMILAR_PROFESSOR.bind()
+        return [build(row) for row in rows]
+
+
+def review_search_results(rows):
+    """``ReviewSearchResultSerializer(rows, many=True).data`` for ``.values()`` rows."""
+    with timed('serialize'):
+        build = REVIEW_SEARCH_RESULT.bind()
+        return [build(row) for row in rows]
+
+
+def professors_with_reviews(rows, reviews):
+    """
+    ``ProfessorSerializer(..., many=True).data`` for ``.values()`` rows, each
+    with its reviews from the ``reviews`` queryset in that queryset's order.
+    """
+    return _embed_reviews(list(rows), reviews.values(*REVIEW.fields))
+
+
+async def aprofessors_with_reviews(rows, reviews):
+    """``professors_with_reviews`` for async views."""
+    return _embed_reviews(rows, [review async for review in reviews.values(*REVIEW.fields)])
+
+
+def _embed_reviews(rows, reviews):
+    grouped = defaultdict(list)
+    for review in reviews:
+        grouped[review['professor']].append(review)
+    with timed('serialize'):
+        professor, review = PROFESSOR.bind(), REVIEW.bind()
+        return [professor(row, reviews=[review(item) for item in grouped[row['id']]]) for row in rows]
+
+
+def render_json(data):
+    """Encode ``data`` exactly as ``JSONRenderer`` does for ``application/json``."""
+    content = json.dumps(
+        data,
+        cls=encoders.JSONEncoder,
+        ensure_ascii=not api_settings.UNICODE_JSON,
+        allow_nan=not api_settings.STRICT_JSON,
+        separators=(',', ':') if api_settings.COMPACT_JSON else (', ', ': '),
+    )
+    # Same escaping JSONRenderer applies for JavaScript compatibility
+    return content.replace('\u2028', '\\u2028').replace('\u2029', '\\u2029').encode()
+
+
+class JSONBytesResponse(Response):
+    """
+    ``Response`` that renders plain JSON with one ``render_json`` call when
+    ``JSONRenderer`` was negotiated. Other renderers, such as the browsable
+    API, and indented output go through DRF as usual. ``.data`` is kept, so
+    response caching works unchanged.
+    """
+
+    @property
+    def rendered_content(self):
+        renderer = getattr(self, 'accepted_renderer', None)
+        if (type(renderer) is not JSONRenderer or self.data is None
+                or 'indent' in (self.accepted_media_type or '')):
+            return super().rendered_content
+        self['Content-Type'] = self.content_type or renderer.media_type
+        return render_json(self.data)
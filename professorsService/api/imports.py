@@ -0,0 +1,117 @@
+"""
+Batched professor import used by the bulk endpoint.
+
+Rows are validated with ``ProfessorSerializer`` one chunk at a time and
+written with ``bulk_create``/``bulk_update``, so an import costs a handful
+of statements per chunk instead of one request and INSERT per professor.
+Invalid rows are reported back and skipped; valid rows are still saved.
+"""
+import csv
+import io
+from itertools import islice
+
+from django.db import transaction
+from rest_framework.exceptions import ValidationError
+
+from base.models import Professor
+from .serializers import ProfessorSerializer
+
+CHUNK_SIZE = 500
+
+# Fields an import may write; the rest, rating included, are maintained
+# by the service from the reviews
+IMPORT_FIELDS = ('name', 'department', 'email', 'office')
+
+
+class ImportResult:
+    def __init__(self):
+        self.created = 0
+        self.updated = 0
+        self.unchanged = 0
+        self.errors = []
+        self.updated_ids = []
+
+    def as_dict(self):
+        return {'created': self.created, 'updated': self.updated, 'unchanged': self.unchanged, 'errors': self.errors}
+
+
+def read_csv(upload):
+    """Stream rows from an uploaded CSV file without loading it whole."""
+    for row in csv.DictReader(io.TextIOWrapper(upload, encoding='utf-8-sig', newline='')):
+        # Empty cells mean "not provided", so optional columns keep their defaults
+        yield {field: value for field, value in row.items() if field and value not in ('', None)}
+
+
+def chunked(rows, size):
+    rows = iter(rows)
+    while chunk := list(islice(rows, size)):
+        yield chunk
+
+
+def import_professors(rows, creator_id=None, upsert=False, chunk_size=CHUNK_SIZE):
+    """
+    Import an iterable of row dicts. With ``upsert`` a row whose email
+    already exists updates that professor instead of creating a new one,
+    which makes re-importing the same file idempotent.
+    """
+    result = ImportResult()
+    with transaction.atomic():
+        for number, chunk in enumerate(chunked(rows, chunk_size)):
+            valid = _validate(chunk, number * chunk_size, result)
+            if upsert:
+                _upsert(valid, creator_id, result)
+            else:
+                Professor.objects.bulk_create(
+                    [Professor(creator_id=creator_id, **attrs) for attrs in valid], batch_size=chunk_size
+                )
+                result.created += len(valid)
+    return result
+
+
+def _validate(chunk, offset, result):
+    # One serializer for the whole chunk: building its fields costs more
+    # than validating a row, so it must not happen once per row.
+    serializer = ProfessorSerializer()
+    valid = []
+    for index, row in enumerate(chunk, start=offset):
+        if not isinstance(row, dict):
+            result.errors.append({'row': index, 'errors': {'non_field_errors': ['Expected an object.']}})
+            continue
+        try:
+            attrs = serializer.run_validation(row)
+        except ValidationError as exc:
+            result.errors.append({'row': index, 'errors': exc.detail})
+            continue
+        valid.append({field: value for field, value in attrs.items() if field in IMPORT_FIELDS})
+    return valid
+
+
+def _upsert(valid, creator_id, result):
+    # Later rows for the same email win, as if imported one by one
+    by_email = {attrs['email']: attrs for attrs in valid}
+    existing = {}
+    # Descending so the oldest professor with a duplicated email is the one kept
+    for professor in Professor.objects.filter(email__in=list(by_email)).order_by('-id'):
+        existing[professor.email] = professor
+
+    to_update, to_create, fields = [], [], set()
+    for email, attrs in by_email.items():
+        professor = existing.get(email)
+        if professor is None:
+            to_create.append(Professor(creator_id=creator_id, **attrs))
+            continue
+        changed = {field for field, value in attrs.items() if getattr(professor, field) != value}
+        if not changed:
+            result.unchanged += 1
+            continue
+        for field in changed:
+            setattr(professor, field, attrs[field])
+        fields.update(changed)
+        to_update.append(professor)
+
+    Professor.objects.bulk_create(to_create, batch_size=CHUNK_SIZE)
+    if to_update:
+        Professor.objects.bulk_update(to_update, sorted(fields), batch_size=CHUNK_SIZE)
+    result.created += len(to_create)
+    result.updated += len(to_update)
+    result.updated_ids.extend(professor.id for professor in to_update)
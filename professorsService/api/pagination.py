@@ -0,0 +1,208 @@
+import datetime
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from binascii import Error as BinasciiError
+
+from django.core.exceptions import ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+from .fastpath import JSONBytesResponse
+
+
+class CursorEncoder(DjangoJSONEncoder):
+    """Keep full datetime precision; DjangoJSONEncoder cuts to milliseconds."""
+
+    def default(self, o):
+        if isinstance(o, datetime.datetime):
+            return o.isoformat()
+        return super().default(o)
+
+
+class KeysetPagination(BasePagination):
+    """
+    Keyset (cursor) pagination over a stable, unique ordering.
+
+    Unlike offset pagination, each page is fetched with a ``WHERE`` on the
+    last seen ordering key, so deep pages cost the same as the first one.
+    The page body stays a plain list; ``next``/``prev`` cursors are opaque
+    and returned in the ``Link`` header.
+
+    Query Parameters:
+        - limit: Page size (capped at ``max_limit``)
+        - cursor: Opaque cursor taken from a previous ``Link`` header
+    """
+
+    ordering = ('name', 'id')
+    default_limit = 50
+    max_limit = 200
+    limit_query_param = 'limit'
+    cursor_query_param = 'cursor'
+    invalid_cursor_message = 'Invalid cursor'
+
+    def __init__(self, ordering=None, default_limit=None, max_limit=None):
+        if ordering is not None:
+            self.ordering = tuple(ordering)
+        if default_limit is not None:
+            self.default_limit = default_limit
+        if max_limit is not None:
+            self.max_limit = max_limit
+
+    def paginate_queryset(self, queryset, request, view=None):
+        page = self._page_queryset(queryset, request)
+        return self._finish_page(list(page))
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """``paginate_queryset`` for async views, fetching with ``async for``."""
+        page = self._page_queryset(queryset, request)
+        return self._finish_page([row async for row in page])
+
+    def _page_queryset(self, queryset, request):
+        self.request = request
+        self.limit = self.get_limit(request)
+        position, self.reverse = self.decode_cursor(request, queryset)
+        self.has_cursor = position is not None
+
+        ordering = self._reversed(self.ordering) if self.reverse else self.ordering
+        queryset = queryset.order_by(*ordering)
+        if position is not None:
+            queryset = queryset.filter(self._seek(ordering, position))
+        return queryset[:self.limit + 1]
+
+    def _finish_page(self, rows):
+        has_more = len(rows) > self.limit
+        rows = rows[:self.limit]
+        if self.reverse:
+            rows.reverse()
+
+        self.next_position = None
+        self.prev_position = None
+        if rows:
+            if has_more or self.reverse:
+                self.next_position = self._position(rows[-1])
+            if self.has_cursor and (has_more or not self.reverse):
+                self.prev_position = self._position(rows[0])
+        return rows
+
+    def get_paginated_response(self, data):
+        return JSONBytesResponse(data, headers=self.get_headers())
+
+    def get_headers(self):
+        links = []
+        next_link = self.get_next_link()
+        if next_link:
+            links.append(f'<{next_link}>; rel="next"')
+        prev_link = self.get_previous_link()
+        if prev_link:
+            links.append(f'<{prev_link}>; rel="prev"')
+        return {'Link': ', '.join(links)} if links else {}
+
+    def get_next_link(self):
+        if self.next_position is None:
+            return None
+        return self._link(self.next_position, reverse=False)
+
+    def get_previous_link(self):
+        if self.prev_position is None:
+            return None
+        return self._link(self.prev_position, reverse=True)
+
+    def get_limit(self, request):
+        try:
+            limit = int(request.query_params[self.limit_query_param])
+        except (KeyError, ValueError):
+            return self.default_limit
+        if limit <= 0:
+            return self.default_limit
+        return min(limit, self.max_limit)
+
+    def encode_cursor(self, position, reverse):
+        payload = json.dumps({'p': position, 'r': int(reverse)}, cls=CursorEncoder, separators=(',', ':'))
+        return urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+    def decode_cursor(self, request, queryset):
+        """
+        The position and direction of the request's cursor, or ``(None,
+        False)`` without one. Every value must be a valid, non-null value of
+        its ordering field (a model field or an annotation of
+        ``queryset``), so a tampered or foreign cursor is a 404, never a
+        query error.
+        """
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None, False
+        try:
+            padded = encoded + '=' * (-len(encoded) % 4)
+            payload = json.loads(urlsafe_b64decode(padded.encode()))
+            position = payload['p']
+            reverse = bool(payload.get('r', 0))
+            if not isinstance(position, list) or len(position) != len(self.ordering):
+                raise ValueError(position)
+            position = [
+                self._to_python(queryset, field, value)
+                for field, value in zip(self.ordering, position)
+            ]
+        except (BinasciiError, KeyError, TypeError, ValueError, OverflowError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+        return position, reverse
+
+    def _link(self, position, reverse):
+        url = self.request.build_absolute_uri()
+        url = replace_query_param(url, self.cursor_query_param, self.encode_cursor(position, reverse))
+        if self.limit == self.default_limit:
+            url = remove_query_param(url, self.limit_query_param)
+        return url
+
+    def _position(self, row):
+        return [self._value(row, field.lstrip('-')) for field in self.ordering]
+
+    @staticmethod
+    def _value(row, path):
+        if isinstance(row, dict):
+            return row[path]
+        for attr in path.split('__'):
+            row = getattr(row, attr)
+        return row
+
+    @staticmethod
+    def _to_python(queryset, field, value):
+        name = field.lstrip('-')
+        annotation = queryset.query.annotations.get(name)
+        if annotation is not None:
+            model_field = annotation.output_field
+        else:
+            model_field = queryset.model._meta.get_field(name)
+        # None would become an IS NULL lookup Django refuses in _seek
+        if value is None or isinstance(value, (dict, list)):
+            raise ValueError(value)
+        value = model_field.to_python(value)
+        # Integer range validators keep ids SQLite cannot bind out
+        model_field.run_validators(value)
+        model_field.get_prep_value(value)
+        return value
+
+    @staticmethod
+    def _reversed(ordering):
+        return tuple(field[1:] if field.startswith('-') else f'-{field}' for field in ordering)
+
+    @staticmethod
+    def _seek(ordering, position):
+        """
+        Build ``(a, b) > (x, y)`` as ``a >= x AND (a > x OR (a = x AND b > y))``
+        honouring per-field direction. The redundant bound on the first
+        field is what lets the database seek on a matching index instead of
+        filtering every row before the cursor.
+        """
+        condition = Q()
+        prefix = {}
+        for field, value in zip(ordering, position):
+            name = field.lstrip('-')
+            lookup = 'lt' if field.startswith('-') else 'gt'
+            condition |= Q(**prefix, **{f'{name}__{lookup}': value})
+            prefix[name] = value
+        first = ordering[0]
+        bound = Q(**{f'{first.lstrip("-")}__{"lte" if first.startswith("-") else "gte"}': position[0]})
+        return bound & condition
@@ -1,14 +1,96 @@
 from rest_framework import serializers
-from base.models import Professor, Review
+from base.models import DepartmentStats, Professor, Review
+from base.review_search import highlight
+from professorsService.profiling import timed
 
-class ReviewSerializer(serializers.ModelSerializer):
+
+class TimedListSerializer(serializers.ListSerializer):
+    @property
+    def data(self):
+        with timed('serialize'):
+            return super().data
+
+
+class TimedModelSerializer(serializers.ModelSerializer):
+    """
+    ModelSerializer whose ``.data`` (one object or, through
+    ``TimedListSerializer``, a list) is reported as the request's
+    ``serialize`` timing when profiling is on.
+    """
+    @property
+    def data(self):
+        with timed('serialize'):
+            return super().data
+
+
+class ReviewSerializer(TimedModelSerializer):
     class Meta:
         model = Review
         fields = '__all__'
+        list_serializer_class = TimedListSerializer
+        # The range import_reviews enforces; the rating counters are unsigned
+        extra_kwargs = {'rating': {'min_value': 1, 'max_value': 5}}
+        # createReview upserts on (professor, creator_id), so the
+        # UniqueTogetherValidator DRF derives from the constraint would only
+        # add a query and reject the update
+        validators = []
 
-class ProfessorSerializer(serializers.ModelSerializer):
+class ProfessorSerializer(TimedModelSerializer):
     reviews = ReviewSerializer(many=True, read_only=True)
     
     class Meta:
         model = Professor
-        fields = '__all__'
+        # deleted_at is set by deleteProfessor only, and hidden professors are never served
+        exclude = ['deleted_at']
+        # Derived from the reviews (see base.ratings)
+        read_only_fields = ['rating', 'review_count', 'rating_sum', 'score']
+        list_serializer_class = TimedListSerializer
+
+
+class ProfessorSummarySerializer(TimedModelSerializer):
+    """
+    List representation without embedded reviews.
+    """
+    class Meta:
+        model = Professor
+        fields = ['id', 'name', 'department', 'email', 'office', 'rating', 'creator_id', 'review_count']
+        list_serializer_class = TimedListSerializer
+
+
+class LeaderboardSerializer(ProfessorSummarySerializer):
+    class Meta(ProfessorSummarySerializer.Meta):
+        fields = ProfessorSummarySerializer.Meta.fields + ['score']
+
+
+class SimilarProfessorSerializer(ProfessorSummarySerializer):
+    similarity = serializers.FloatField(read_only=True)
+    co_raters = serializers.IntegerField(read_only=True)
+
+    class Meta(ProfessorSummarySerializer.Meta):
+        fields = ProfessorSummarySerializer.Meta.fields + ['similarity', 'co_raters']
+
+
+class SnippetField(serializers.ReadOnlyField):
+    """A ``base.review_search.Snippet``: escaped, with the hits in ``<mark>``."""
+    def to_representation(self, value):
+        return highlight(value)
+
+
+class ReviewSearchResultSerializer(TimedModelSerializer):
+    professor_name = serializers.CharField(read_only=True)
+    department = serializers.CharField(read_only=True)
+    snippet = SnippetField()
+
+    class Meta:
+        model = Review
+        fields = ['id', 'professor', 'professor_name', 'department', 'author', 'rating', 'created_at', 'snippet']
+        list_serializer_class = TimedListSerializer
+
+
+class DepartmentStatsSerializer(TimedModelSerializer):
+    rating = serializers.FloatField(read_only=True)
+
+    class Meta:
+        model = DepartmentStats
+        fields = ['department', 'professor_count', 'review_count', 'rating']
+        list_serializer_class = TimedListSerializer
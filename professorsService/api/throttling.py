@@ -0,0 +1,226 @@
+"""
+Per-user token-bucket throttling.
+
+Every user gets one bucket per scope (``read``, ``search``, ``write``),
+sized by ``PROFESSORS_THROTTLE_RATES[role][scope]``: ``"30/min"`` holds 30
+requests and refills one every two seconds, so a client may burst up to
+the limit and then continues at the average rate. Roles or scopes without
+a rate are not throttled.
+
+Buckets are ``(tokens, timestamp)`` pairs in the
+``PROFESSORS_THROTTLE_CACHE`` cache, so the limits hold across workers
+that share it. Reading and writing a bucket is not atomic: concurrent
+requests of one user on different workers may overshoot by a request or
+two, which is fine for abuse protection and costs one ``get`` and one
+``set`` per bucket on the allowed path.
+
+A request spends a token from every bucket it touches or from none: when
+one bucket rejects it (a search over its ``search`` budget), the tokens
+the earlier buckets already spent are refunded, and the later buckets
+only report their level.
+
+The async views throttle with ``acheck_throttles``, which reads and
+writes the buckets through the cache's async API.
+
+Rejected requests get DRF's 429 with ``Retry-After``.
+``RateLimitHeadersMiddleware`` (sync and async) adds ``RateLimit-Limit``,
+``RateLimit-Remaining`` and ``RateLimit-Reset`` (seconds until the bucket
+is full) for the most depleted bucket a request touched.
+"""
+import math
+import time
+from functools import lru_cache
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.throttling import BaseThrottle
+
+BUCKET_KEY = 'professors:throttle:{scope}:{role}:{user_id}'
+
+PERIODS = {'s': 1, 'sec': 1, 'm': 60, 'min': 60, 'h': 3600, 'hour': 3600, 'd': 86400, 'day': 86400}
+
+
+@lru_cache(maxsize=None)
+def parse_rate(rate):
+    """``"30/min"`` -> ``(30, 60)``: bucket size and the seconds to refill it."""
+    count, period = rate.split('/')
+    return int(count), PERIODS[period]
+
+
+class TokenBucketThrottle(BaseThrottle):
+    scope = None
+
+    def applies(self, request):
+        return True
+
+    def bucket(self, request):
+        """``(key, capacity, period)`` of the user's bucket, or None if the request is not throttled."""
+        user = request.user
+        role = getattr(user, 'role', None)
+        rate = settings.PROFESSORS_THROTTLE_RATES.get(role, {}).get(self.scope)
+        if rate is None or not self.applies(request):
+            return None
+        capacity, period = parse_rate(rate)
+        return BUCKET_KEY.format(scope=self.scope, role=role, user_id=user.id), capacity, period
+
+    def allow_request(self, request, view):
+        self.wait_seconds = None
+        bucket = self.bucket(request)
+        if bucket is None:
+            return True
+        key, capacity, period = bucket
+        cache = caches[settings.PROFESSORS_THROTTLE_CACHE]
+        allowed, spent, refunds = self.settle(request, bucket, cache.get(key), time.time())
+        if spent is not None:
+            cache.set(key, spent, period)
+        for key, capacity, period in refunds:
+            stored = cache.get(key)
+            if stored is not None:
+                cache.set(key, refunded(request, key, capacity, period, stored), period)
+        return allowed
+
+    async def aallow_request(self, request, view):
+        """``allow_request`` through the cache's async API."""
+        self.wait_seconds = None
+        bucket = self.bucket(request)
+        if bucket is None:
+            return True
+        key, capacity, period = bucket
+        cache = caches[settings.PROFESSORS_THROTTLE_CACHE]
+        allowed, spent, refunds = self.settle(request, bucket, await cache.aget(key), time.time())
+        if spent is not None:
+            await cache.aset(key, spent, period)
+        for key, capacity, period in refunds:
+            stored = await cache.aget(key)
+            if stored is not None:
+                await cache.aset(key, refunded(request, key, capacity, period, stored), period)
+        return allowed
+
+    def settle(self, request, bucket, stored, now):
+        """
+        Decide on the request given the ``stored`` bucket: returns whether it
+        is allowed, the bucket to store if a token was spent, and the
+        buckets to refund if it was rejected.
+        """
+        key, capacity, period = bucket
+        state = throttle_state(request)
+        tokens = refilled(stored, capacity, period, now)
+        allowed, spent, refunds = tokens >= 1, None, []
+        if not allowed:
+            self.wait_seconds = (1 - tokens) * period / capacity
+            state.rejected = True
+            refunds = state.take_charges()
+        elif not state.rejected:
+            tokens -= 1
+            # An idle bucket is full again after one period, so it can expire
+            spent = (tokens, now)
+            state.charges.append(bucket)
+        record_rate_limit(request, key, capacity, period, tokens)
+        return allowed, spent, refunds
+
+    def wait(self):
+        return self.wait_seconds
+
+
+class ReadThrottle(TokenBucketThrottle):
+    scope = 'read'
+
+
+class SearchThrottle(TokenBucketThrottle):
+    """Only requests with a ``query`` parameter spend search tokens."""
+    scope = 'search'
+
+    def applies(self, request):
+        return bool(request.GET.get('query'))
+
+
+class WriteThrottle(TokenBucketThrottle):
+    scope = 'write'
+
+
+class ThrottleState:
+    """What the throttles of one request charged and reported, kept on the Django request."""
+
+    def __init__(self):
+        self.charges = []
+        self.rejected = False
+        # key -> (limit, remaining, reset)
+        self.limits = {}
+
+    def take_charges(self):
+        charges, self.charges = self.charges, []
+        return charges
+
+    def most_depleted(self):
+        return min(self.limits.values(), key=lambda limit: limit[1], default=None)
+
+
+def throttle_state(request):
+    # On the Django request so the middleware sees it behind DRF's wrapper
+    request = getattr(request, '_request', request)
+    state = getattr(request, 'throttle_state', None)
+    if state is None:
+        state = request.throttle_state = ThrottleState()
+    return state
+
+
+def refilled(bucket, capacity, period, now):
+    """Tokens in a stored ``(tokens, timestamp)`` bucket at ``now``; a missing bucket is full."""
+    if bucket is None:
+        return capacity
+    return min(capacity, bucket[0] + (now - bucket[1]) * capacity / period)
+
+
+def refunded(request, key, capacity, period, stored):
+    """The ``stored`` bucket with one token given back."""
+    tokens = min(capacity, stored[0] + 1)
+    record_rate_limit(request, key, capacity, period, tokens)
+    return tokens, stored[1]
+
+
+def record_rate_limit(request, key, capacity, period, tokens):
+    reset = math.ceil((capacity - tokens) * period / capacity)
+    throttle_state(request).limits[key] = (capacity, int(tokens), reset)
+
+
+async def acheck_throttles(request, throttle_classes):
+    """
+    Run ``throttle_classes`` outside DRF views (the async views) and return
+    the longest wait if any of them rejects the request, else ``None``.
+    """
+    waits = []
+    for throttle in (cls() for cls in throttle_classes):
+        if not await throttle.aallow_request(request, None):
+            waits.append(throttle.wait())
+    return max(waits) if waits else None
+
+
+class RateLimitHeadersMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        return add_rate_limit_headers(request, self.get_response(request))
+
+    async def __acall__(self, request):
+        return add_rate_limit_headers(request, await self.get_response(request))
+
+
+def add_rate_limit_headers(request, response):
+    state = getattr(request, 'throttle_state', None)
+    rate_limit = state and state.most_depleted()
+    if rate_limit is not None:
+        limit, remaining, reset = rate_limit
+        response['RateLimit-Limit'] = limit
+        response['RateLimit-Remaining'] = remaining
+        response['RateLimit-Reset'] = reset
+    return response
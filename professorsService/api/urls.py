@@ -1,11 +1,22 @@
 from django.urls import path
-from . import views
+from . import async_views, views
 
 urlpatterns = [
     path('professors/', views.getProfessors, name='getProfessors'),
     path('professors/create/', views.createProfessor, name='createProfessor'),
+    path('professors/bulk/', views.bulkCreateProfessors, name='bulkCreateProfessors'),
+    path('professors/top/', views.getTopProfessors, name='getTopProfessors'),
+    path('professors/batch/', views.getProfessorsBatch, name='getProfessorsBatch'),
     path('professors/<int:pk>/', views.getProfessor, name='getProfessor'),
+    path('professors/<int:pk>/reviews/', views.getProfessorReviews, name='getProfessorReviews'),
+    path('professors/<int:pk>/similar/', views.getSimilarProfessors, name='getSimilarProfessors'),
     path('professors/<int:pk>/delete/', views.deleteProfessor, name='deleteProfessor'),
     path('professors/<int:pk>/review/', views.createReview, name='createReview'),
     path('professors/<int:prof_pk>/review/<int:review_pk>/delete/', views.deleteReview, name='deleteReview'),
+    path('reviews/search/', views.searchReviews, name='searchReviews'),
+    path('reviews/by-user/<int:creator_id>/delete/', views.deleteUserReviews, name='deleteUserReviews'),
+    path('async/professors/', async_views.getProfessorsAsync, name='getProfessorsAsync'),
+    path('async/professors/<int:pk>/', async_views.getProfessorAsync, name='getProfessorAsync'),
+    path('departments/', views.getDepartments, name='getDepartments'),
+    path('export/<str:resource>/', views.exportData, name='exportData'),
 ]
@@ -1,53 +1,308 @@
+import csv
+from django.http import StreamingHttpResponse
 from rest_framework.permissions import IsAuthenticated
-from rest_framework.decorators import api_view, permission_classes
+from rest_framework.decorators import api_view, permission_classes, throttle_classes
 from rest_framework import status
-from django.db.models import Q, Avg
-from base.models import Professor, Review
-from .serializers import ProfessorSerializer, ReviewSerializer
+from django.db import transaction
+from django.db.models import F, Window
+from django.utils import timezone
+from django.db.models.functions import RowNumber
+from base.models import DepartmentStats, Professor, Review
+from base.search import search_professors
+from base.ratings import UPSERT_FIELDS, apply_review_delta, mean_rating_expression, upsert_review
+from base.export import RESOURCES, gzipped, ndjson_lines, parse_since
+from base import purge, review_search
+from base.moderation import delete_reviews_by_creator
+from .serializers import DepartmentStatsSerializer, ProfessorSerializer, ReviewSerializer
 from .permissions import IsStudent, IsStaff, IsAdmin
+from .throttling import ReadThrottle, SearchThrottle, WriteThrottle
+from .pagination import KeysetPagination
+from . import fastpath
+from .fastpath import JSONBytesResponse
+from .imports import import_professors, read_csv
+from .caching import (
+    batch_etag, bump_catalog, bump_professor, bump_professors, cache_bodies, cached_bodies, catalog_etag, catalog_etag_for,
+    detail_etags, not_modified, professor_etag, reviews_etag, similar_etag, versioned_response,
+)
 from rest_framework.response import Response
 
+RECENT_REVIEWS = 10
+MAX_RECENT_REVIEWS = 100
+MAX_BATCH_IDS = 50
+# Largest id SQLite can bind; bigger ones fail in the query instead of matching nothing
+MAX_ID = 2 ** 63 - 1
+
+# Review orderings for getProfessorReviews; id breaks ties so each is unique
+REVIEW_SORTS = {
+    'newest': ('-created_at', '-id'),
+    'highest': ('-rating', '-created_at', '-id'),
+    'lowest': ('rating', 'created_at', 'id'),
+}
+
+def recent_reviews(pk, request):
+    """
+    The most recent reviews of professor ``pk`` for ``getProfessor``:
+    ``?reviews=N`` (default ``RECENT_REVIEWS``, at most ``MAX_RECENT_REVIEWS``),
+    read newest first from the ``(professor, created_at)`` index.
+    """
+    try:
+        count = int(request.GET.get('reviews', RECENT_REVIEWS))
+    except ValueError:
+        count = RECENT_REVIEWS
+    count = min(max(count, 0), MAX_RECENT_REVIEWS)
+    return Review.objects.filter(professor_id=pk).order_by(*REVIEW_SORTS['newest'])[:count]
+
+def values_for(queryset, mapper, ordering):
+    """``.values()`` with the mapper's fields plus the keys pagination needs."""
+    return queryset.values(*dict.fromkeys(mapper.fields + tuple(field.lstrip('-') for field in ordering)))
+
 @api_view(['GET'])
 @permission_classes([IsStudent])
+@throttle_classes([ReadThrottle, SearchThrottle])
+@versioned_response(catalog_etag)
 def getProfessors(request):
     """
-    Retrieve a list of professors, optionally filtered by query.
+    Retrieve a page of professors, optionally filtered by query.
 
-    **GET**: Returns a list of professors.
+    **GET**: Returns a list of professor summaries (rating and review count,
+    no reviews) ordered by (name, id). Links to the next/previous pages are
+    returned in the ``Link`` header. Responses carry an ``ETag``; a matching
+    ``If-None-Match`` gets 304 Not Modified.
 
     Query Parameters:
-        - query: Filter by professor name or department (case-insensitive, partial match)
+        - query: Search professor name and department. Every word is prefix
+          matched (case- and accent-insensitive) and results are ranked best
+          first; falls back to a substring match where no index is available.
+        - include: ``reviews`` to embed each professor's reviews
+        - limit: Page size (default 50, max 200)
+        - cursor: Opaque cursor from a previous ``Link`` header
     """
     query = request.GET.get('query', '')
+    include_reviews = 'reviews' in request.GET.get('include', '').split(',')
     professors = Professor.objects.all()
+    ordering = ('name', 'id')
     if query:
-        professors = professors.filter(
-            Q(name__icontains=query) | 
-            Q(department__icontains=query)
-        )
-    serializer = ProfessorSerializer(professors, many=True)
-    return Response(serializer.data)
+        professors, ordering = search_professors(professors, query)
+    paginator = KeysetPagination(ordering=ordering)
+    if include_reviews:
+        page = paginator.paginate_queryset(values_for(professors, fastpath.PROFESSOR, ordering), request)
+        reviews = Review.objects.filter(professor_id__in=[row['id'] for row in page])
+        data = fastpath.professors_with_reviews(page, reviews)
+    else:
+        page = paginator.paginate_queryset(values_for(professors, fastpath.PROFESSOR_SUMMARY, ordering), request)
+        data = fastpath.summaries(page)
+    return paginator.get_paginated_response(data)
 
 @api_view(['GET'])
 @permission_classes([IsStudent])
+@throttle_classes([ReadThrottle])
+@versioned_response(catalog_etag_for('top'))
+def getTopProfessors(request):
+    """
+    Leaderboard of professors by Bayesian-smoothed rating.
+
+    **GET**: Returns professor summaries with their ``score`` ordered by
+    (-score, id): the mean rating pulled toward ``RATING_PRIOR_MEAN`` by
+    ``RATING_PRIOR_WEIGHT`` virtual reviews, so many good reviews outrank a
+    single perfect one. The score is stored and indexed, so each page is an
+    index range scan. Links to further pages are returned in the ``Link``
+    header.
+
+    Query Parameters:
+        - department: Only rank professors of this department
+        - limit: Page size (default 10, max 100)
+        - cursor: Opaque cursor from a previous ``Link`` header
+    """
+    professors = Professor.objects.all()
+    department = request.GET.get('department')
+    if department:
+        professors = professors.filter(department=department)
+    paginator = KeysetPagination(ordering=('-score', 'id'), default_limit=10, max_limit=100)
+    page = paginator.paginate_queryset(values_for(professors, fastpath.LEADERBOARD, paginator.ordering), request)
+    return paginator.get_paginated_response(fastpath.leaderboard(page))
+
+@api_view(['GET'])
+@permission_classes([IsStudent])
+@throttle_classes([ReadThrottle])
+@versioned_response(professor_etag)
 def getProfessor(request, pk):
     """
     Retrieve a single professor by primary key (pk).
 
-    **GET**: Returns professor details or 404 if not found.
+    **GET**: Returns professor details with the most recent reviews, newest
+    first, or 404 if not found. ``review_count`` is the total; page through
+    every review with ``getProfessorReviews``. Responses carry an ``ETag``;
+    a matching ``If-None-Match`` gets 304 Not Modified.
 
     Path Parameters:
         - pk: Professor primary key (integer)
+
+    Query Parameters:
+        - reviews: Number of recent reviews to embed (default 10, max 100)
     """
     try:
-        professor = Professor.objects.get(pk=pk)
-        serializer = ProfessorSerializer(professor)
-        return Response(serializer.data)
+        professor = Professor.objects.values(*fastpath.PROFESSOR.fields).get(pk=pk)
+        data, = fastpath.professors_with_reviews([professor], recent_reviews(pk, request))
+        return JSONBytesResponse(data)
     except Professor.DoesNotExist:
         return Response({'error': 'Professor not found'}, status=status.HTTP_404_NOT_FOUND)
 
+@api_view(['GET'])
+@permission_classes([IsStudent])
+@throttle_classes([ReadThrottle])
+def getProfessorsBatch(request):
+    """
+    Retrieve many professors in one request.
+
+    **GET**: Returns an object keyed by professor id, in the order asked,
+    whose values are the bodies ``getProfessor`` returns without query
+    parameters, or ``null`` for ids that do not exist. Bodies come from the
+    per-professor response cache where present; the rest are loaded with one
+    ``pk__in`` query and one query for their recent reviews, and cached
+    for later detail and batch reads. The response carries an ``ETag``
+    derived from every professor's version; a matching ``If-None-Match``
+    gets 304 Not Modified.
+
+    Query Parameters:
+        - ids: Comma-separated professor ids (at most 50)
+    """
+    try:
+        pks = list(dict.fromkeys(int(pk) for pk in request.GET.get('ids', '').split(',') if pk.strip()))
+        if not all(0 < pk <= MAX_ID for pk in pks):
+            raise ValueError(pks)
+    except ValueError:
+        return Response({'error': 'ids must be comma-separated integers'}, status=status.HTTP_400_BAD_REQUEST)
+    if not pks:
+        return Response({'error': 'ids is required'}, status=status.HTTP_400_BAD_REQUEST)
+    if len(pks) > MAX_BATCH_IDS:
+        return Response({'error': f'At most {MAX_BATCH_IDS} ids per request'}, status=status.HTTP_400_BAD_REQUEST)
+
+    etags = detail_etags(pks)
+    etag = batch_etag(etags[pk] for pk in pks)
+    if not_modified(request, etag):
+        return Response(status=status.HTTP_304_NOT_MODIFIED, headers={'ETag': etag})
+
+    bodies = cached_bodies(etags.values())
+    missing = [pk for pk in pks if etags[pk] not in bodies]
+    if missing:
+        professors = Professor.objects.filter(pk__in=missing).values(*fastpath.PROFESSOR.fields)
+        newest = REVIEW_SORTS['newest']
+        reviews = Review.objects.filter(professor_id__in=missing).alias(
+            position=Window(RowNumber(), partition_by='professor', order_by=newest)
+        ).filter(position__lte=RECENT_REVIEWS).order_by(*newest)
+        loaded = {row['id']: row for row in fastpath.professors_with_reviews(professors, reviews)}
+        cache_bodies({etags[pk]: data for pk, data in loaded.items()})
+        bodies.update((etags[pk], data) for pk, data in loaded.items())
+    return JSONBytesResponse({str(pk): bodies.get(etags[pk]) for pk in pks}, headers={'ETag': etag})
+
+@api_view(['GET'])
+@permission_classes([IsStudent])
+@throttle_classes([ReadThrottle])
+@versioned_response(reviews_etag)
+def getProfessorReviews(request, pk):
+    """
+    Page through a professor's reviews.
+
+    **GET**: Returns a list of reviews, or 404 if the professor does not
+    exist. Pages are keyset paginated over the chosen sort, each one an
+    index range scan on ``(professor, created_at)`` or
+    ``(professor, rating, created_at)``. Links to the next/previous pages are
+    returned in the ``Link`` header.
+
+    Path Parameters:
+        - pk: Professor primary key (integer)
+
+    Query Parameters:
+        - sort: ``newest`` (default), ``highest`` or ``lowest`` rating first
+        - limit: Page size (default 20, max 100)
+        - cursor: Opaque cursor from a previous ``Link`` header
+    """
+    sort = request.GET.get('sort', 'newest')
+    if sort not in REVIEW_SORTS:
+        return Response({'error': f"sort must be one of: {', '.join(REVIEW_SORTS)}"}, status=status.HTTP_400_BAD_REQUEST)
+    if not Professor.objects.filter(pk=pk).exists():
+        return Response({'error': 'Professor not found'}, status=status.HTTP_404_NOT_FOUND)
+    paginator = KeysetPagination(ordering=REVIEW_SORTS[sort], default_limit=20, max_limit=100)
+    page = paginator.paginate_queryset(Review.objects.filter(professor_id=pk), request)
+    serializer = ReviewSerializer(page, many=True)
+    return paginator.get_paginated_response(serializer.data)
+
+@api_view(['GET'])
+@permission_classes([IsStudent])
+@throttle_classes([ReadThrottle])
+@versioned_response(similar_etag)
+def getSimilarProfessors(request, pk):
+    """
+    Professors whose students rated them like this one ("students who liked
+    X also rated Y highly").
+
+    **GET**: Returns up to ``base.similarity.NEIGHBOURS`` professor
+    summaries, most similar first, each with its ``similarity`` and the
+    number of ``co_raters`` it is based on, or 404 if the professor does
+    not exist. The lists are precomputed by ``manage.py build_similarity``,
+    so this is one lookup on the ``(professor, -similarity)`` index.
+
+    Path Parameters:
+        - pk: Professor primary key (integer)
+    """
+    neighbours = Professor.objects.filter(
+        similar_to__professor_id=pk, similar_to__professor__deleted_at__isnull=True,
+    ).annotate(similarity=F('similar_to__similarity'), co_raters=F('similar_to__co_raters'))
+    rows = list(neighbours.order_by('-similarity', 'id').values(*fastpath.SIMILAR_PROFESSOR.fields))
+    # Professors without neighbours yet, e.g. too few reviews, get an empty list
+    if not rows and not Professor.objects.filter(pk=pk).exists():
+        return Response({'error': 'Professor not found'}, status=status.HTTP_404_NOT_FOUND)
+    return JSONBytesResponse(fastpath.similar_professors(rows))
+
+@api_view(['GET'])
+@permission_classes([IsStudent])
+@throttle_classes([ReadThrottle, SearchThrottle])
+@versioned_response(catalog_etag_for('review-search'))
+def searchReviews(request):
+    """
+    Search the comments of every review.
+
+    **GET**: Returns the reviews whose comment contains every word of
+    ``query``, best match (bm25) first, each with its professor's name and
+    department and a ``snippet``: the part of the comment around the hits,
+    HTML-escaped, with the hits wrapped in ``<mark>``. Words are stemmed
+    and matched case- and accent-insensitively, so ``curved exams`` also
+    finds "curve" and "exam". Served from the FTS5 index of
+    ``base.review_search``, which also filters by professor and department;
+    503 where the database has none. A query matching more than
+    ``RANK_WINDOW`` reviews ranks the newest ones. Links to further pages
+    are returned in the ``Link`` header.
+
+    Query Parameters:
+        - query: Words to find; double-quoted words must appear as a phrase
+        - professor: Only reviews of this professor (id)
+        - department: Only reviews of professors in this department
+        - limit: Page size (default 20, max 100)
+        - cursor: Opaque cursor from a previous ``Link`` header
+    """
+    try:
+        professor = int(request.GET['professor']) if request.GET.get('professor') else None
+    except ValueError:
+        return Response({'error': 'professor must be an integer'}, status=status.HTTP_400_BAD_REQUEST)
+    department = request.GET.get('department')
+    expression = review_search.build_query(request.GET.get('query', ''), professor, department)
+    if not expression:
+        return Response({'error': 'query is required'}, status=status.HTTP_400_BAD_REQUEST)
+    reviews = Review.objects.filter(professor__deleted_at__isnull=True)
+    if department:
+        reviews = reviews.filter(professor__department=department)
+    if not review_search.is_available(reviews.db):
+        return Response({'error': 'Review search is not available'}, status=status.HTTP_503_SERVICE_UNAVAILABLE)
+    reviews = review_search.search_reviews(reviews, expression).annotate(
+        professor_name=F('professor__name'), department=F('professor__department')
+    )
+    paginator = KeysetPagination(ordering=('search_rank', 'id'), default_limit=20, max_limit=100)
+    page = paginator.paginate_queryset(values_for(reviews, fastpath.REVIEW_SEARCH_RESULT, paginator.ordering), request)
+    return paginator.get_paginated_response(fastpath.review_search_results(page))
+
 @api_view(['POST'])
 @permission_classes([IsStaff])
+@throttle_classes([WriteThrottle])
 def createProfessor(request):
     """
     Create a new professor.
@@ -64,32 +319,74 @@ def createProfessor(request):
     serializer = ProfessorSerializer(data=request.data)
     if serializer.is_valid():
         serializer.save(creator_id=request.user.id)
+        bump_catalog()
         return Response(serializer.data, status=status.HTTP_201_CREATED)
     return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
+@api_view(['POST'])
+@permission_classes([IsStaff])
+@throttle_classes([WriteThrottle])
+def bulkCreateProfessors(request):
+    """
+    Create many professors in one request.
+
+    **POST**: Validates the rows in chunks and inserts the valid ones with
+    batched INSERTs in a single transaction. Invalid rows are skipped and
+    reported; they do not abort the import.
+
+    Request Body (one of):
+        - a JSON array of professor objects
+        - a multipart upload with a CSV ``file`` (header: name,department,email,office)
+
+    Ratings come from the reviews, so a ``rating`` in a row is ignored.
+
+    Query Parameters:
+        - mode: ``upsert`` to update professors whose email already exists instead of creating duplicates
+
+    Returns ``created``, ``updated`` and ``unchanged`` counts and per-row ``errors``.
+    """
+    upsert = request.GET.get('mode') == 'upsert'
+    if 'file' in request.FILES:
+        rows = read_csv(request.FILES['file'])
+    elif isinstance(request.data, list):
+        rows = request.data
+    else:
+        return Response({'error': 'Expected a JSON array or a CSV file upload'}, status=status.HTTP_400_BAD_REQUEST)
+    try:
+        result = import_professors(rows, creator_id=request.user.id, upsert=upsert)
+    except (UnicodeDecodeError, csv.Error) as exc:
+        return Response({'error': f'Unreadable CSV: {exc}'}, status=status.HTTP_400_BAD_REQUEST)
+    for pk in result.updated_ids:
+        bump_professor(pk)
+    bump_catalog()
+    return Response(result.as_dict(), status=status.HTTP_200_OK)
+
 @api_view(['DELETE'])
 @permission_classes([IsStaff])
+@throttle_classes([WriteThrottle])
 def deleteProfessor(request, pk):
     """
     Delete a professor by primary key (pk).
 
-    **DELETE**: Deletes the specified professor.
+    **DELETE**: Soft-deletes the specified professor, who disappears from
+    every read endpoint at once. Their reviews and row are purged in short
+    batches in the background (see ``base.purge``).
 
     Path Parameters:
         - pk: Professor primary key (integer)
 
     Returns 204 No Content on success, or 404 if the professor does not exist.
     """
-    try:
-        professor = Professor.objects.get(pk=pk)
-        professor.delete()
-        return Response(status=status.HTTP_204_NO_CONTENT)
-    except Professor.DoesNotExist:
+    if not Professor.objects.filter(pk=pk).update(deleted_at=timezone.now()):
         return Response({'error': 'Professor not found'}, status=status.HTTP_404_NOT_FOUND)
+    bump_professor(pk)
+    purge.schedule(pk)
+    return Response(status=status.HTTP_204_NO_CONTENT)
 
 
 @api_view(['POST'])
 @permission_classes([IsStudent])
+@throttle_classes([WriteThrottle])
 def createReview(request, pk):
     """
     Create or update a review for a professor.
@@ -111,34 +408,28 @@ def createReview(request, pk):
     except Professor.DoesNotExist:
         return Response({'error': 'Professor not found'}, status=status.HTTP_404_NOT_FOUND)
 
-    # If user already reviewed, update the review
     data = request.data.copy()
     data['professor'] = professor.id
-    review = Review.objects.filter(professor=professor, creator_id=request.user.id).first()
-    if review:
-        serializer = ReviewSerializer(review, data=data, partial=True)
-        if serializer.is_valid():
-            serializer.save()
-            avg_rating = professor.reviews.aggregate(Avg('rating'))['rating__avg']
-            professor.rating = round(avg_rating, 1) if avg_rating else 0.0
-            professor.save()
-            return Response(serializer.data, status=status.HTTP_200_OK)
-        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
-    else:
-        serializer = ReviewSerializer(data=data)
-        if serializer.is_valid():
-            serializer.save(creator_id=request.user.id)
-            avg_rating = professor.reviews.aggregate(Avg('rating'))['rating__avg']
-            professor.rating = round(avg_rating, 1) if avg_rating else 0.0
-            professor.save()
-            return Response(serializer.data, status=status.HTTP_201_CREATED)
-        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+    # Look up, write and update the counters in one transaction; the unique
+    # (professor, creator_id) constraint makes the write itself an upsert,
+    # so concurrent submissions can never create a second review
+    with transaction.atomic():
+        review = Review.objects.filter(professor=professor, creator_id=request.user.id).first()
+        # If user already reviewed, only the fields sent are changed
+        serializer = ReviewSerializer(review, data=data, partial=review is not None)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        fields = {name: value for name, value in serializer.validated_data.items() if name in UPSERT_FIELDS}
+        serializer.instance = upsert_review(professor.id, request.user.id, fields, existing=review)
+    bump_professor(professor.id)
+    return Response(serializer.data, status=status.HTTP_201_CREATED if review is None else status.HTTP_200_OK)
 
 
 # DELETE review endpoint
 from rest_framework.permissions import IsAuthenticated
 @api_view(['DELETE'])
 @permission_classes([IsStudent])
+@throttle_classes([WriteThrottle])
 def deleteReview(request, prof_pk, review_pk):
     """
     Delete a review for a professor.
@@ -163,9 +454,98 @@ def deleteReview(request, prof_pk, review_pk):
     user_role = getattr(request.user, 'role', None)
     if review.creator_id != request.user.id and user_role not in ["ADMIN", "STAFF"]:
         return Response({'error': 'Permission denied'}, status=status.HTTP_403_FORBIDDEN)
-    review.delete()
-    # Update professor's average rating
-    avg_rating = professor.reviews.aggregate(Avg('rating'))['rating__avg']
-    professor.rating = round(avg_rating, 1) if avg_rating else 0.0
-    professor.save()
+    # Update professor's rating counters in the same transaction; a review a
+    # concurrent request already deleted must not be subtracted twice
+    with transaction.atomic():
+        deleted, _ = review.delete()
+        if deleted:
+            apply_review_delta(professor.id, -1, -review.rating)
+    bump_professor(professor.id)
     return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+@api_view(['DELETE'])
+@permission_classes([IsStaff])
+@throttle_classes([WriteThrottle])
+def deleteUserReviews(request, creator_id):
+    """
+    Delete every review a user wrote, e.g. when banning a spam account (STAFF/ADMIN only).
+
+    **DELETE**: Removes the reviews with one set-based DELETE and recomputes
+    the ratings of the affected professors only (see ``base.moderation``).
+
+    Path Parameters:
+        - creator_id: the user whose reviews are removed (integer)
+
+    Query Parameters:
+        - since: only reviews created at or after this ISO date or datetime
+        - until: only reviews created before this ISO date or datetime
+
+    Returns the number of ``deleted`` reviews and of affected ``professors``.
+    """
+    bounds = {}
+    for name in ('since', 'until'):
+        if request.GET.get(name):
+            bounds[name] = parse_since(request.GET[name])
+            if bounds[name] is None:
+                return Response({'error': f'Invalid {name}'}, status=status.HTTP_400_BAD_REQUEST)
+    deleted, professor_ids = delete_reviews_by_creator(creator_id, **bounds)
+    if professor_ids:
+        bump_professors(professor_ids)
+    return Response({'deleted': deleted, 'professors': len(professor_ids)}, status=status.HTTP_200_OK)
+
+
+@api_view(['GET'])
+@permission_classes([IsStaff])
+def exportData(request, resource):
+    """
+    Stream every professor or review as NDJSON (one JSON object per line).
+
+    **GET**: Rows are streamed in id order with flat memory use.
+
+    Path Parameters:
+        - resource: ``professors`` or ``reviews``
+
+    Query Parameters:
+        - after: Only rows with a greater id; pass the last id received to resume
+        - since: Only reviews created at or after this ISO date or datetime
+        - gzip: ``1`` to gzip the stream (sent with ``Content-Encoding: gzip``)
+    """
+    if resource not in RESOURCES:
+        return Response({'error': 'Unknown resource'}, status=status.HTTP_404_NOT_FOUND)
+    try:
+        after = int(request.GET['after']) if request.GET.get('after') else None
+    except ValueError:
+        return Response({'error': 'Invalid after'}, status=status.HTTP_400_BAD_REQUEST)
+    since = None
+    if request.GET.get('since'):
+        since = parse_since(request.GET['since'])
+        if since is None:
+            return Response({'error': 'Invalid since'}, status=status.HTTP_400_BAD_REQUEST)
+
+    stream = ndjson_lines(resource, after=after, since=since)
+    compress = request.GET.get('gzip') == '1'
+    response = StreamingHttpResponse(gzipped(stream) if compress else stream, content_type='application/x-ndjson')
+    if compress:
+        response['Content-Encoding'] = 'gzip'
+    return response
+
+
+@api_view(['GET'])
+@permission_classes([IsStudent])
+@throttle_classes([ReadThrottle])
+@versioned_response(catalog_etag_for('departments'))
+def getDepartments(request):
+    """
+    List every department with its professor count, review count and mean rating.
+
+    **GET**: Reads the precomputed per-department totals (see
+    ``base.departments``), so the cost does not grow with the number of
+    professors. The rating is the mean of all reviews of the department's
+    professors. Responses carry an ``ETag`` like the professor list.
+    """
+    departments = DepartmentStats.objects.filter(professor_count__gt=0).annotate(
+        rating=mean_rating_expression(F('review_count'), F('rating_sum'))
+    ).order_by('department')
+    serializer = DepartmentStatsSerializer(departments, many=True)
+    return Response(serializer.data)
@@ -0,0 +1,100 @@
+"""
+Per-department professor and review totals.
+
+``DepartmentStats`` holds one row per department with its professor count
+and the sums of its professors' review counters, so the department
+directory reads a handful of rows however many professors there are. On
+SQLite, triggers on ``base_professor`` keep it current on every write path:
+inserts, deletes, soft deletes, department changes and the counter
+updates made by ``ratings.apply_review_delta`` and ``ratings.recompute``.
+Soft-deleted professors (``deleted_at`` set) no longer count, so their
+final purge leaves the totals alone. ``rebuild`` recomputes it from the
+professor table.
+
+Like the search index triggers, these are dropped when Django rebuilds the
+professor table, so migrations that alter ``Professor`` must call
+``install_triggers`` again.
+"""
+TABLE = 'base_departmentstats'
+SOURCE_TABLE = 'base_professor'
+TRIGGERS = (f'{TABLE}_ai', f'{TABLE}_ad', f'{TABLE}_au')
+
+
+def _sql(soft_delete):
+    """
+    The trigger and rebuild statements. With ``soft_delete`` a professor
+    whose ``deleted_at`` is set counts as removed; migrations older than
+    the column get the plain version.
+    """
+    new_active = ' AND new.deleted_at IS NULL' if soft_delete else ''
+    old_active = ' AND old.deleted_at IS NULL' if soft_delete else ''
+    add_new = f"""INSERT INTO {TABLE} (department, professor_count, review_count, rating_sum)
+        SELECT new.department, 1, new.review_count, new.rating_sum WHERE true{new_active}
+        ON CONFLICT (department) DO UPDATE SET
+            professor_count = professor_count + 1,
+            review_count = review_count + excluded.review_count,
+            rating_sum = rating_sum + excluded.rating_sum;"""
+    remove_old = f"""UPDATE {TABLE} SET
+            professor_count = professor_count - 1,
+            review_count = review_count - old.review_count,
+            rating_sum = rating_sum - old.rating_sum
+        WHERE department = old.department{old_active};"""
+    columns = 'department, review_count, rating_sum, deleted_at' if soft_delete else 'department, review_count, rating_sum'
+    changed = 'old.department IS NOT new.department OR old.review_count != new.review_count OR old.rating_sum != new.rating_sum'
+    if soft_delete:
+        changed += ' OR old.deleted_at IS NOT new.deleted_at'
+    create_triggers = (
+        f"""CREATE TRIGGER IF NOT EXISTS {TABLE}_ai AFTER INSERT ON {SOURCE_TABLE} BEGIN
+        {add_new}
+    END""",
+        f"""CREATE TRIGGER IF NOT EXISTS {TABLE}_ad AFTER DELETE ON {SOURCE_TABLE} BEGIN
+        {remove_old}
+    END""",
+        f"""CREATE TRIGGER IF NOT EXISTS {TABLE}_au AFTER UPDATE OF {columns} ON {SOURCE_TABLE}
+    WHEN {changed}
+    BEGIN
+        {remove_old}
+        {add_new}
+    END""",
+    )
+    rebuild = (
+        f"DELETE FROM {TABLE}",
+        f"""INSERT INTO {TABLE} (department, professor_count, review_count, rating_sum)
+        SELECT department, COUNT(*), SUM(review_count), SUM(rating_sum) FROM {SOURCE_TABLE}
+        {'WHERE deleted_at IS NULL ' if soft_delete else ''}GROUP BY department""",
+    )
+    return create_triggers, rebuild
+
+
+def _statements(connection):
+    with connection.cursor() as cursor:
+        columns = {column.name for column in connection.introspection.get_table_description(cursor, SOURCE_TABLE)}
+    return _sql(soft_delete='deleted_at' in columns)
+
+
+def install(connection):
+    """Create the triggers and fill the table from the current professors."""
+    install_triggers(connection)
+    rebuild(connection)
+
+
+def install_triggers(connection):
+    if connection.vendor != 'sqlite':
+        return
+    create_triggers, _ = _statements(connection)
+    with connection.cursor() as cursor:
+        for sql in create_triggers:
+            cursor.execute(sql)
+
+
+def uninstall(connection):
+    with connection.cursor() as cursor:
+        for trigger in TRIGGERS:
+            cursor.execute(f'DROP TRIGGER IF EXISTS {trigger}')
+
+
+def rebuild(connection):
+    _, rebuild_sql = _statements(connection)
+    with connection.cursor() as cursor:
+        for sql in rebuild_sql:
+            cursor.execute(sql)
@@ -0,0 +1,69 @@
+"""
+Streaming NDJSON export of professors and reviews.
+
+Rows are read with ``QuerySet.iterator(chunk_size=...)`` in primary key
+order and encoded one line at a time, so memory stays flat however large
+the tables are. Every line carries its ``id``; passing the last one seen
+as ``after`` resumes an interrupted export.
+"""
+import datetime
+import zlib
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from .models import Professor, Review
+
+CHUNK_SIZE = 2000
+
+RESOURCES = {
+    'professors': (Professor, ('id', 'name', 'department', 'email', 'office', 'rating', 'review_count', 'creator_id')),
+    'reviews': (Review, ('id', 'professor_id', 'author', 'creator_id', 'rating', 'comment', 'created_at')),
+}
+
+
+def export_queryset(resource, after=None, since=None):
+    """
+    Rows of ``resource`` as dicts in id order, without soft-deleted
+    professors or their reviews. ``since`` limits reviews to those created
+    at or after it.
+    """
+    model, fields = RESOURCES[resource]
+    queryset = model.objects.order_by('id')
+    if after is not None:
+        queryset = queryset.filter(id__gt=after)
+    if resource == 'reviews':
+        # Reviews of soft-deleted professors are gone once their purge runs
+        queryset = queryset.filter(professor__deleted_at__isnull=True)
+        if since is not None:
+            queryset = queryset.filter(created_at__gte=since)
+    return queryset.values(*fields)
+
+
+def ndjson_lines(resource, after=None, since=None, chunk_size=CHUNK_SIZE):
+    encoder = DjangoJSONEncoder(separators=(',', ':'))
+    for row in export_queryset(resource, after, since).iterator(chunk_size=chunk_size):
+        yield (encoder.encode(row) + '\n').encode()
+
+
+def gzipped(chunks, level=6):
+    """Compress a byte stream incrementally into a single gzip member."""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    for chunk in chunks:
+        if data := compressor.compress(chunk):
+            yield data
+    yield compressor.flush()
+
+
+def parse_since(value):
+    """Parse an ISO date or datetime into an aware datetime, or None."""
+    try:
+        since = parse_datetime(value)
+        if since is None and (day := parse_date(value)) is not None:
+            since = datetime.datetime.combine(day, datetime.time.min)
+    except ValueError:
+        return None
+    if since is not None and timezone.is_naive(since):
+        since = timezone.make_aware(since, datetime.timezone.utc)
+    return since
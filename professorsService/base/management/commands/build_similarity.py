@@ -0,0 +1,25 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from base import similarity
+
+
+class Command(BaseCommand):
+    help = "Recompute the similar professor lists, only those affected by review changes since the last run unless --full."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--full', action='store_true', help="Recompute every professor's list.")
+        parser.add_argument('--chunk-size', type=int, default=similarity.CHUNK_SIZE, help="Professors per query and transaction.")
+        parser.add_argument('--database', default='default', help="Database alias to build.")
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+        professors, written = similarity.build(options['full'], options['database'], options['chunk_size'])
+        if professors:
+            from api.caching import bump_catalog, warn_if_process_local
+            bump_catalog()
+            warn_if_process_local(self)
+        self.stdout.write(self.style.SUCCESS(
+            f"Refreshed {professors} professor(s), {written} neighbour(s) in {time.perf_counter() - start:.1f}s."
+        ))
@@ -0,0 +1,40 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from base.export import RESOURCES, gzipped, ndjson_lines, parse_since
+
+
+class Command(BaseCommand):
+    help = "Stream every professor or review as NDJSON, in id order and with flat memory use."
+
+    def add_arguments(self, parser):
+        parser.add_argument('resource', choices=sorted(RESOURCES))
+        parser.add_argument('-o', '--output', default='-', help="Output file, or - for stdout.")
+        parser.add_argument('--after', type=int, help="Only rows with a greater id; the last id written resumes an export.")
+        parser.add_argument('--since', help="Only reviews created at or after this ISO date or datetime.")
+        parser.add_argument('--gzip', action='store_true', help="Gzip the output.")
+        parser.add_argument('--chunk-size', type=int, default=2000, help="Rows fetched per database round-trip.")
+
+    def handle(self, *args, **options):
+        since = None
+        if options['since']:
+            since = parse_since(options['since'])
+            if since is None:
+                raise CommandError(f"Invalid --since: {options['since']!r}")
+
+        stream = ndjson_lines(options['resource'], after=options['after'], since=since, chunk_size=options['chunk_size'])
+        if options['gzip']:
+            stream = gzipped(stream)
+
+        if options['output'] == '-':
+            output = getattr(self.stdout, 'buffer', None) or sys.stdout.buffer
+            for chunk in stream:
+                output.write(chunk)
+            output.flush()
+        else:
+            # Append when resuming, so the rows already written are kept
+            mode = 'ab' if options['after'] is not None else 'wb'
+            with open(options['output'], mode) as output:
+                for chunk in stream:
+                    output.write(chunk)
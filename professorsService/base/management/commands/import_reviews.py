@@ -0,0 +1,152 @@
+import csv
+import datetime
+import json
+import sys
+import time
+from contextlib import contextmanager
+from itertools import islice
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from base import ratings
+from base.models import Professor, Review
+
+
+class Command(BaseCommand):
+    help = (
+        "Stream a review export (NDJSON or CSV) into the review table in batches, then recompute "
+        "the rating of every affected professor once. Each record needs author, rating, comment and "
+        "either professor (id) or professor_email; creator_id and created_at are optional."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="Export file, or - for stdin.")
+        parser.add_argument('--format', choices=['ndjson', 'csv'], help="Input format (default: from the file extension).")
+        parser.add_argument('--batch-size', type=int, default=5000, help="Reviews per INSERT transaction.")
+        parser.add_argument(
+            '--offset', type=int, default=0,
+            help="Skip this many records first; use the last committed offset to resume after a crash.",
+        )
+
+    def handle(self, *args, **options):
+        fmt = options['format'] or ('csv' if options['path'].endswith('.csv') else 'ndjson')
+        batch_size = options['batch_size']
+        if batch_size <= 0:
+            raise CommandError("--batch-size must be positive.")
+
+        # Every professor as id and email -> id, so no record needs a lookup query
+        professor_ids = set()
+        emails = {}
+        for pk, email in Professor.objects.values_list('id', 'email').iterator(chunk_size=10000):
+            professor_ids.add(pk)
+            emails.setdefault(email, pk)
+
+        stream = sys.stdin if options['path'] == '-' else open(options['path'], encoding='utf-8-sig', newline='')
+        offset = options['offset']
+        affected = set()
+        imported = skipped = 0
+        started = time.perf_counter()
+        try:
+            records = islice(self.read(stream, fmt), offset, None)
+            with historical_timestamps():
+                while batch := list(islice(records, batch_size)):
+                    reviews = {}
+                    for number, record in enumerate(batch, start=offset):
+                        try:
+                            review = self.build_review(record, professor_ids, emails)
+                        except (KeyError, TypeError, ValueError) as exc:
+                            skipped += 1
+                            self.stderr.write(f"record {number}: skipped ({exc!r})")
+                            continue
+                        # A user has one review per professor: the last record wins,
+                        # within the batch here and against the table on conflict
+                        key = (review.professor_id, review.creator_id) if review.creator_id is not None else number
+                        reviews.pop(key, None)
+                        reviews[key] = review
+                        affected.add(review.professor_id)
+                    with transaction.atomic():
+                        Review.objects.bulk_create(
+                            list(reviews.values()),
+                            update_conflicts=True,
+                            unique_fields=['professor', 'creator_id'],
+                            update_fields=['author', 'rating', 'comment', 'created_at'],
+                        )
+                    imported += len(reviews)
+                    offset += len(batch)
+                    elapsed = time.perf_counter() - started
+                    self.stdout.write(
+                        f"committed through offset {offset}: {imported} imported, {skipped} skipped, "
+                        f"{imported / elapsed:,.0f} reviews/s"
+                    )
+        finally:
+            if stream is not sys.stdin:
+                stream.close()
+
+        # A resumed run cannot know which professors the interrupted run
+        # already touched, so it recomputes all of them.
+        with transaction.atomic():
+            drifted = ratings.recompute(None if options['offset'] else affected)
+        from api.caching import bump_professors, warn_if_process_local
+        bump_professors(affected | {professor.id for professor in drifted})
+        warn_if_process_local(self)
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {imported} reviews ({skipped} skipped) for {len(affected)} professors."
+        ))
+
+    @staticmethod
+    def read(stream, fmt):
+        if fmt == 'csv':
+            yield from csv.DictReader(stream)
+            return
+        for line in stream:
+            try:
+                yield json.loads(line)
+            except ValueError:
+                yield None  # reported and skipped like any other bad record
+
+    @staticmethod
+    def build_review(record, professor_ids, emails):
+        if not isinstance(record, dict):
+            raise ValueError("not a JSON object")
+        if record.get('professor') not in (None, ''):
+            professor_id = int(record['professor'])
+            if professor_id not in professor_ids:
+                raise ValueError(f"unknown professor {professor_id}")
+        else:
+            professor_id = emails[record['professor_email']]
+        rating = int(record['rating'])
+        if not 1 <= rating <= 5:
+            raise ValueError(f"rating {rating} out of range")
+        creator_id = record.get('creator_id')
+        created_at = timezone.now()
+        if record.get('created_at'):
+            created_at = parse_datetime(record['created_at'])
+            if created_at is None:
+                raise ValueError(f"invalid created_at {record['created_at']!r}")
+            if timezone.is_naive(created_at):
+                created_at = timezone.make_aware(created_at, datetime.timezone.utc)
+        return Review(
+            professor_id=professor_id,
+            author=record['author'],
+            rating=rating,
+            comment=record['comment'],
+            creator_id=int(creator_id) if creator_id not in (None, '') else None,
+            created_at=created_at,
+        )
+
+
+@contextmanager
+def historical_timestamps():
+    """
+    Let ``created_at`` keep the exported value; ``auto_now_add`` would
+    otherwise stamp every imported review with the import time.
+    """
+    field = Review._meta.get_field('created_at')
+    field.auto_now_add = False
+    try:
+        yield
+    finally:
+        field.auto_now_add = True
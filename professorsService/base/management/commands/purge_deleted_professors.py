@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from base import purge
+
+
+class Command(BaseCommand):
+    help = "Delete the reviews and rows of soft-deleted professors in short batched transactions."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, help="Reviews deleted per transaction (default: PROFESSORS_PURGE_BATCH_SIZE).")
+        parser.add_argument('--database', default='default', help="Database alias to purge.")
+
+    def handle(self, *args, **options):
+        stats = purge.purge_pending(options['batch_size'], options['database'])
+        self.stdout.write(self.style.SUCCESS(
+            f"Purged {stats.professors} professor(s) and {stats.reviews} review(s) in {stats.transactions} "
+            f"transaction(s); the longest took {stats.max_transaction_seconds * 1000:.1f} ms."
+        ))
@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+from django.db import connections, transaction
+
+from base import departments
+
+
+class Command(BaseCommand):
+    help = "Reinstall the department stats triggers and recompute every department's totals."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', default='default', help="Database alias to rebuild.")
+
+    def handle(self, *args, **options):
+        connection = connections[options['database']]
+        with transaction.atomic(using=connection.alias):
+            departments.install(connection)
+        from api.caching import bump_catalog, warn_if_process_local
+        bump_catalog()
+        warn_if_process_local(self)
+        self.stdout.write(self.style.SUCCESS("Department stats rebuilt."))
@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections, transaction
+
+from base import review_search
+
+
+class Command(BaseCommand):
+    help = "Reinstall the review search index triggers and re-index every review comment."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', default='default', help="Database alias to rebuild.")
+
+    def handle(self, *args, **options):
+        connection = connections[options['database']]
+        if not review_search.fts5_supported(connection):
+            raise CommandError("This database has no FTS5 support; review search is unavailable.")
+        with transaction.atomic(using=connection.alias):
+            if review_search.TABLE in connection.introspection.table_names():
+                review_search.install_triggers(connection)
+                review_search.rebuild(connection)
+            else:
+                review_search.install(connection)
+        self.stdout.write(self.style.SUCCESS("Review search index rebuilt."))
@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections, transaction
+
+from base import search
+
+
+class Command(BaseCommand):
+    help = "Reinstall the professor search index triggers and re-index every professor."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', default='default', help="Database alias to rebuild.")
+
+    def handle(self, *args, **options):
+        connection = connections[options['database']]
+        if not search.fts5_supported(connection):
+            raise CommandError("This database has no FTS5 support; search uses the icontains fallback.")
+        with transaction.atomic(using=connection.alias):
+            if search.TABLE in connection.introspection.table_names():
+                search.install_triggers(connection)
+                search.rebuild(connection)
+            else:
+                search.install(connection)
+        self.stdout.write(self.style.SUCCESS("Search index rebuilt."))
@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from base import ratings
+
+
+class Command(BaseCommand):
+    help = "Recompute every professor's review count, rating sum and rating from the reviews and repair drift."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help="Report drifted professors without repairing them.")
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            drifted = ratings.recompute(dry_run=options['dry_run'])
+        if drifted and not options['dry_run']:
+            from api.caching import bump_professors, warn_if_process_local
+            bump_professors([professor.id for professor in drifted])
+            warn_if_process_local(self)
+        for professor in drifted:
+            self.stdout.write(f"professor {professor.id}: review_count={professor.review_count} rating_sum={professor.rating_sum}")
+        verb = "found" if options['dry_run'] else "repaired"
+        self.stdout.write(self.style.SUCCESS(f"{len(drifted)} drifted professor(s) {verb}."))
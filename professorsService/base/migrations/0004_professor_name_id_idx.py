@@ -0,0 +1,17 @@
+# Generated by Django 5.2.8 on 2026-10-17 00:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('base', '0003_review_creator_id'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='professor',
+            index=models.Index(fields=['name', 'id'], name='professor_name_id_idx'),
+        ),
+    ]
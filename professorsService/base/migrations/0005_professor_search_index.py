@@ -0,0 +1,38 @@
+# Generated by Django 5.2.8 on 2026-10-17 00:56
+
+import base.search
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def install_search_index(apps, schema_editor):
+    base.search.install(schema_editor.connection)
+
+
+def uninstall_search_index(apps, schema_editor):
+    base.search.uninstall(schema_editor.connection)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('base', '0004_professor_name_id_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProfessorSearchIndex',
+            fields=[
+                ('professor', models.OneToOneField(db_column='rowid', on_delete=django.db.models.deletion.DO_NOTHING, primary_key=True, related_name='search_index', serialize=False, to='base.professor')),
+                ('name', models.CharField(max_length=100)),
+                ('department', models.CharField(max_length=100)),
+                ('document', base.search.FullTextField(db_column='base_professor_search')),
+                ('rank', models.FloatField()),
+            ],
+            options={
+                'db_table': 'base_professor_search',
+                'managed': False,
+            },
+        ),
+        migrations.RunPython(install_search_index, uninstall_search_index),
+    ]
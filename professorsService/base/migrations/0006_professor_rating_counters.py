@@ -0,0 +1,39 @@
+# Generated by Django 5.2.8 on 2026-10-17 00:58
+
+import base.search
+from django.db import migrations, models
+from django.db.models import Count, Sum
+
+
+def backfill_counters(apps, schema_editor):
+    Professor = apps.get_model('base', 'Professor')
+    Review = apps.get_model('base', 'Review')
+    totals = Review.objects.order_by().values('professor_id').annotate(count=Count('id'), total=Sum('rating'))
+    for row in totals:
+        Professor.objects.filter(pk=row['professor_id']).update(review_count=row['count'], rating_sum=row['total'])
+
+
+def reinstall_search_triggers(apps, schema_editor):
+    base.search.install_triggers(schema_editor.connection)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('base', '0005_professor_search_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='professor',
+            name='rating_sum',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='professor',
+            name='review_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_counters, migrations.RunPython.noop),
+        migrations.RunPython(reinstall_search_triggers, migrations.RunPython.noop),
+    ]
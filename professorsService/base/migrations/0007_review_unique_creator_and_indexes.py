@@ -0,0 +1,52 @@
+# Generated by Django 5.2.8 on 2026-10-17 01:32
+
+from django.db import migrations, models
+from django.db.models import Count, F, Min, Sum
+
+from base.ratings import mean_rating_expression
+
+
+def dedupe_reviews(apps, schema_editor):
+    """
+    Keep the oldest review of each user per professor, the one createReview
+    has always updated, and fix the counters of the professors affected.
+    """
+    Professor = apps.get_model('base', 'Professor')
+    Review = apps.get_model('base', 'Review')
+    duplicates = (
+        Review.objects.filter(creator_id__isnull=False).order_by()
+        .values('professor_id', 'creator_id').annotate(keep=Min('id'), count=Count('id')).filter(count__gt=1)
+    )
+    affected = set()
+    for row in duplicates:
+        Review.objects.filter(professor_id=row['professor_id'], creator_id=row['creator_id']).exclude(pk=row['keep']).delete()
+        affected.add(row['professor_id'])
+    for professor_id in affected:
+        totals = Review.objects.filter(professor_id=professor_id).aggregate(count=Count('id'), total=Sum('rating'))
+        Professor.objects.filter(pk=professor_id).update(review_count=totals['count'], rating_sum=totals['total'] or 0)
+        Professor.objects.filter(pk=professor_id).update(
+            rating=mean_rating_expression(F('review_count'), F('rating_sum'))
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('base', '0006_professor_rating_counters'),
+    ]
+
+    operations = [
+        migrations.RunPython(dedupe_reviews, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='professor',
+            index=models.Index(fields=['department'], name='professor_department_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='review',
+            index=models.Index(fields=['professor', 'created_at'], name='review_professor_created_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='review',
+            constraint=models.UniqueConstraint(fields=('professor', 'creator_id'), name='review_professor_creator_uniq'),
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.8 on 2026-10-17 01:36
+
+import base.departments
+from django.db import migrations, models
+
+
+def install_department_stats(apps, schema_editor):
+    base.departments.install(schema_editor.connection)
+
+
+def uninstall_department_stats(apps, schema_editor):
+    base.departments.uninstall(schema_editor.connection)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('base', '0007_review_unique_creator_and_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DepartmentStats',
+            fields=[
+                ('department', models.CharField(max_length=100, primary_key=True, serialize=False)),
+                ('professor_count', models.IntegerField(default=0)),
+                ('review_count', models.IntegerField(default=0)),
+                ('rating_sum', models.IntegerField(default=0)),
+            ],
+        ),
+        migrations.RunPython(install_department_stats, uninstall_department_stats),
+    ]
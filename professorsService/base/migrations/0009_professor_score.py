@@ -0,0 +1,47 @@
+# Generated by Django 5.2.8 on 2026-10-17 01:37
+
+import base.departments
+import base.models
+import base.search
+from django.db import migrations, models
+from django.db.models import F
+
+from base.ratings import bayesian_score_expression
+
+
+def backfill_scores(apps, schema_editor):
+    Professor = apps.get_model('base', 'Professor')
+    Professor.objects.update(score=bayesian_score_expression(F('review_count'), F('rating_sum')))
+
+
+def reinstall_triggers(apps, schema_editor):
+    # Adding or removing the column rebuilds base_professor, which drops its triggers
+    base.search.install_triggers(schema_editor.connection)
+    base.departments.install_triggers(schema_editor.connection)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('base', '0008_department_stats'),
+    ]
+
+    operations = [
+        # Reverse order: the column removal rebuilds the table too
+        migrations.RunPython(migrations.RunPython.noop, reinstall_triggers),
+        migrations.AddField(
+            model_name='professor',
+            name='score',
+            field=models.FloatField(default=base.models.prior_score),
+        ),
+        migrations.RunPython(reinstall_triggers, migrations.RunPython.noop),
+        migrations.RunPython(backfill_scores, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='professor',
+            index=models.Index(fields=['-score', 'id'], name='professor_score_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='professor',
+            index=models.Index(fields=['department', '-score', 'id'], name='professor_dept_score_idx'),
+        ),
+    ]
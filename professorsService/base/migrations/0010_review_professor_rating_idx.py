@@ -0,0 +1,17 @@
+# Generated by Django 5.2.8 on 2026-10-17 01:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('base', '0009_professor_score'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='review',
+            index=models.Index(fields=['professor', 'rating', 'created_at'], name='review_professor_rating_idx'),
+        ),
+    ]
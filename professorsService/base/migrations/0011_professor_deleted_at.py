@@ -0,0 +1,37 @@
+# Generated by Django 5.2.8 on 2026-10-17 02:03
+
+import base.departments
+from django.db import migrations, models
+
+
+def reinstall_department_triggers(apps, schema_editor):
+    # Recreated for the column they now read: soft-deleted professors stop counting
+    base.departments.uninstall(schema_editor.connection)
+    base.departments.install(schema_editor.connection)
+
+
+def uninstall_department_triggers(apps, schema_editor):
+    # SQLite refuses to drop a column that triggers still reference
+    base.departments.uninstall(schema_editor.connection)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('base', '0010_review_professor_rating_idx'),
+    ]
+
+    operations = [
+        # Reverse order: once the column is gone, restore the triggers without it
+        migrations.RunPython(migrations.RunPython.noop, reinstall_department_triggers),
+        migrations.AddField(
+            model_name='professor',
+            name='deleted_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='professor',
+            index=models.Index(condition=models.Q(('deleted_at__isnull', False)), fields=['deleted_at'], name='professor_deleted_idx'),
+        ),
+        migrations.RunPython(reinstall_department_triggers, uninstall_department_triggers),
+    ]
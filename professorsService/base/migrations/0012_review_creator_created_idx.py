@@ -0,0 +1,17 @@
+# Generated by Django 5.2.8 on 2026-10-17 02:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('base', '0011_professor_deleted_at'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='review',
+            index=models.Index(fields=['creator_id', 'created_at'], name='review_creator_created_idx'),
+        ),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 5.2.8 on 2026-10-17 02:12
+
+import base.similarity
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def install_change_log(apps, schema_editor):
+    base.similarity.install_triggers(schema_editor.connection)
+
+
+def uninstall_change_log(apps, schema_editor):
+    base.similarity.uninstall(schema_editor.connection)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('base', '0012_review_creator_created_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SimilarityChange',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('creator_id', models.IntegerField()),
+                ('professor_id', models.IntegerField()),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ProfessorNeighbour',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('similarity', models.FloatField()),
+                ('co_raters', models.PositiveIntegerField()),
+                ('neighbour', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='similar_to', to='base.professor')),
+                ('professor', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='neighbours', to='base.professor')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['professor', '-similarity'], name='neighbour_professor_sim_idx')],
+            },
+        ),
+        migrations.RunPython(install_change_log, uninstall_change_log),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 5.2.8 on 2026-10-17 09:12
+
+import base.review_search
+import base.search
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def install_review_search_index(apps, schema_editor):
+    base.review_search.install(schema_editor.connection)
+
+
+def uninstall_review_search_index(apps, schema_editor):
+    base.review_search.uninstall(schema_editor.connection)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('base', '0013_professor_neighbours'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReviewSearchIndex',
+            fields=[
+                ('review', models.OneToOneField(db_column='rowid', on_delete=django.db.models.deletion.DO_NOTHING, primary_key=True, related_name='search_index', serialize=False, to='base.review')),
+                ('comment', models.TextField()),
+                ('professor_id', models.IntegerField()),
+                ('department', models.CharField(max_length=100)),
+                ('document', base.search.FullTextField(db_column='base_review_search')),
+                ('rank', models.FloatField()),
+            ],
+            options={
+                'db_table': 'base_review_search',
+                'managed': False,
+            },
+        ),
+        migrations.RunPython(install_review_search_index, uninstall_review_search_index),
+    ]
@@ -1,12 +1,49 @@
+from django.conf import settings
 from django.db import models
 
+from .search import FullTextField
+
+
+def prior_score():
+    """Leaderboard score of a professor without reviews."""
+    return float(settings.RATING_PRIOR_MEAN)
+
+
+class ActiveProfessorManager(models.Manager):
+    """Hides soft-deleted professors, which wait for ``base.purge``."""
+
+    def get_queryset(self):
+        return super().get_queryset().filter(deleted_at__isnull=True)
+
+
 class Professor(models.Model):
     name = models.CharField(max_length=100)
     department = models.CharField(max_length=100)
     email = models.EmailField()
     office = models.CharField(max_length=50)
     rating = models.FloatField(default=0.0)
+    review_count = models.PositiveIntegerField(default=0)
+    rating_sum = models.PositiveIntegerField(default=0)
+    # Bayesian-smoothed rating the leaderboard is ordered by
+    score = models.FloatField(default=prior_score)
     creator_id = models.IntegerField(null=True, blank=True)
+    # Set by deleteProfessor; base.purge removes the row and its reviews later
+    deleted_at = models.DateTimeField(null=True, blank=True)
+
+    objects = ActiveProfessorManager()
+    all_objects = models.Manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['name', 'id'], name='professor_name_id_idx'),
+            models.Index(fields=['department'], name='professor_department_idx'),
+            models.Index(fields=['-score', 'id'], name='professor_score_idx'),
+            models.Index(fields=['department', '-score', 'id'], name='professor_dept_score_idx'),
+            # Only the professors waiting for their purge
+            models.Index(
+                fields=['deleted_at'], name='professor_deleted_idx', condition=models.Q(deleted_at__isnull=False)
+            ),
+        ]
 
     def __str__(self):
         return self.name
@@ -19,5 +56,93 @@ class Review(models.Model):
     comment = models.TextField()
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        constraints = [
+            # One review per user and professor; createReview upserts against it
+            models.UniqueConstraint(fields=['professor', 'creator_id'], name='review_professor_creator_uniq'),
+        ]
+        indexes = [
+            models.Index(fields=['professor', 'created_at'], name='review_professor_created_idx'),
+            models.Index(fields=['professor', 'rating', 'created_at'], name='review_professor_rating_idx'),
+            # Moderation finds a user's reviews across all professors
+            models.Index(fields=['creator_id', 'created_at'], name='review_creator_created_idx'),
+        ]
+
     def __str__(self):
         return f"{self.professor.name} - {self.rating}"
+
+
+
+class DepartmentStats(models.Model):
+    """
+    Totals per department, maintained by the triggers in ``base.departments``.
+    """
+    department = models.CharField(max_length=100, primary_key=True)
+    professor_count = models.IntegerField(default=0)
+    review_count = models.IntegerField(default=0)
+    rating_sum = models.IntegerField(default=0)
+
+    def __str__(self):
+        return self.department
+
+class ProfessorNeighbour(models.Model):
+    """
+    A precomputed similar professor, written by ``base.similarity``: the
+    adjusted-cosine similarity of the two professors' ratings over the
+    students who rated both.
+    """
+    # The (professor, -similarity) index serves lookups by professor
+    professor = models.ForeignKey(Professor, on_delete=models.CASCADE, related_name='neighbours', db_index=False)
+    neighbour = models.ForeignKey(Professor, on_delete=models.CASCADE, related_name='similar_to')
+    similarity = models.FloatField()
+    co_raters = models.PositiveIntegerField()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['professor', '-similarity'], name='neighbour_professor_sim_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.professor_id} ~ {self.neighbour_id}"
+
+class SimilarityChange(models.Model):
+    """
+    A review written, changed or deleted since the last similarity build,
+    logged by the triggers in ``base.similarity`` for incremental refreshes.
+    """
+    creator_id = models.IntegerField()
+    professor_id = models.IntegerField()
+
+class ProfessorSearchIndex(models.Model):
+    """
+    Read-only mapping of the FTS5 index maintained by ``base.search``.
+    """
+    professor = models.OneToOneField(
+        Professor, on_delete=models.DO_NOTHING, primary_key=True, db_column='rowid', related_name='search_index'
+    )
+    name = models.CharField(max_length=100)
+    department = models.CharField(max_length=100)
+    document = FullTextField(db_column='base_professor_search')
+    rank = models.FloatField()
+
+    class Meta:
+        managed = False
+        db_table = 'base_professor_search'
+
+
+class ReviewSearchIndex(models.Model):
+    """
+    Read-only mapping of the FTS5 index maintained by ``base.review_search``.
+    """
+    review = models.OneToOneField(
+        Review, on_delete=models.DO_NOTHING, primary_key=True, db_column='rowid', related_name='search_index'
+    )
+    comment = models.TextField()
+    professor_id = models.IntegerField()
+    department = models.CharField(max_length=100)
+    document = FullTextField(db_column='base_review_search')
+    rank = models.FloatField()
+
+    class Meta:
+        managed = False
+        db_table = 'base_review_search'
@@ -0,0 +1,132 @@
+"""
+Batched purge of soft-deleted professors.
+
+Deleting a professor outright makes Django's deletion collector load every
+review for the ``CASCADE`` and remove them in one write transaction, which
+holds SQLite's only write lock for as long as that takes. Instead
+``deleteProfessor`` sets ``Professor.deleted_at``: ``Professor.objects``
+skips the professor from then on, so every read endpoint drops it at once.
+``schedule`` hands the professor to a background worker thread, where
+``purge_professor`` deletes the reviews ``PROFESSORS_PURGE_BATCH_SIZE`` at
+a time, each batch in its own short transaction so other writers get the
+lock in between, and the professor row last.
+
+Purges that never ran, for example because the process restarted, are
+drained by ``manage.py purge_deleted_professors``.
+"""
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass
+
+from django.conf import settings
+from django.db import connections, transaction
+
+from .models import Professor, Review
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+@dataclass
+class PurgeStats:
+    professors: int = 0
+    reviews: int = 0
+    transactions: int = 0
+    # Longest transaction, i.e. the longest the purge held the write lock
+    max_transaction_seconds: float = 0.0
+
+
+@contextmanager
+def _short_transaction(stats, using):
+    start = time.perf_counter()
+    with transaction.atomic(using=using):
+        yield
+    stats.transactions += 1
+    stats.max_transaction_seconds = max(stats.max_transaction_seconds, time.perf_counter() - start)
+
+
+def purge_professor(pk, batch_size=None, using='default', stats=None):
+    """
+    Delete a soft-deleted professor's reviews in transactions of at most
+    ``batch_size`` rows, then the professor. Active professors are left
+    alone. Returns the ``PurgeStats``, added to ``stats`` if given.
+    """
+    batch_size = batch_size or settings.PROFESSORS_PURGE_BATCH_SIZE
+    stats = stats or PurgeStats()
+    if not Professor.all_objects.using(using).filter(pk=pk, deleted_at__isnull=False).exists():
+        return stats
+    reviews = Review.objects.using(using).filter(professor_id=pk)
+    while True:
+        with _short_transaction(stats, using):
+            ids = list(reviews.values_list('id', flat=True)[:batch_size])
+            # Review has no dependents, so this is a single DELETE ... WHERE id IN
+            Review.objects.using(using).filter(pk__in=ids).delete()
+        stats.reviews += len(ids)
+        if len(ids) < batch_size:
+            break
+    with _short_transaction(stats, using):
+        # Takes any review written while the purge ran along with it
+        _, by_model = Professor.all_objects.using(using).filter(pk=pk, deleted_at__isnull=False).delete()
+    stats.professors += by_model.get(Professor._meta.label, 0)
+    stats.reviews += by_model.get(Review._meta.label, 0)
+    return stats
+
+
+def pending(using='default'):
+    """Ids of the soft-deleted professors still waiting for their purge, oldest first."""
+    return Professor.all_objects.using(using).filter(deleted_at__isnull=False).order_by('deleted_at', 'id').values_list(
+        'id', flat=True
+    )
+
+
+def purge_pending(batch_size=None, using='default'):
+    stats = PurgeStats()
+    for pk in list(pending(using)):
+        purge_professor(pk, batch_size, using, stats)
+    return stats
+
+
+def schedule(pk, using='default'):
+    """
+    Purge ``pk`` on the background worker once the current transaction
+    commits, if ``PROFESSORS_PURGE_IN_BACKGROUND`` is on. The single worker
+    runs purges one after another, so they never compete for the lock.
+    """
+    if settings.PROFESSORS_PURGE_IN_BACKGROUND:
+        transaction.on_commit(lambda: _worker().submit(_purge_in_background, pk, using), using=using)
+
+
+def shutdown():
+    """
+    Wait for the purges handed to the background worker and stop it, e.g.
+    before the database they run against goes away. A later ``schedule``
+    starts a new worker.
+    """
+    global _executor
+    with _executor_lock:
+        executor, _executor = _executor, None
+    if executor is not None:
+        executor.shutdown(wait=True)
+
+
+def _worker():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='professor-purge')
+        return _executor
+
+
+def _purge_in_background(pk, using):
+    try:
+        purge_professor(pk, using=using)
+    except Exception:
+        # The professor stays soft-deleted; purge_deleted_professors retries it
+        logger.exception("Purging professor %s failed", pk)
+    finally:
+        connections.close_all()
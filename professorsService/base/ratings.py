@@ -0,0 +1,146 @@
+"""
+Denormalized professor rating counters.
+
+``Professor.review_count`` and ``Professor.rating_sum`` are kept up to date
+with ``F()`` updates on every review write, so the displayed ``rating`` and
+the leaderboard ``score`` never need an aggregate over the review table.
+``recompute`` rebuilds the counters from the reviews themselves and is used
+to repair drift.
+"""
+from django.conf import settings
+from django.db.models import Count, F, FloatField, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Cast, Coalesce, NullIf, Round
+
+from .models import Professor, Review
+
+CHUNK_SIZE = 500
+
+# Review fields a user can change by reviewing the same professor again
+UPSERT_FIELDS = ('author', 'rating', 'comment')
+
+
+def mean_rating_expression(count, total):
+    """The mean rounded to one decimal as SQL, 0.0 without reviews."""
+    return Coalesce(
+        Round(Cast(total, FloatField()) / NullIf(count, Value(0)), 1),
+        Value(0.0),
+        output_field=FloatField(),
+    )
+
+
+def bayesian_score_expression(count, total):
+    """
+    The mean rating smoothed toward ``RATING_PRIOR_MEAN`` as SQL:
+    ``(weight * prior + total) / (weight + count)``.
+    """
+    weight = settings.RATING_PRIOR_WEIGHT
+    return (Value(float(weight * settings.RATING_PRIOR_MEAN)) + Cast(total, FloatField())) / (
+        Value(float(weight)) + Cast(count, FloatField())
+    )
+
+
+def expected_score(count, total):
+    weight = settings.RATING_PRIOR_WEIGHT
+    return (weight * settings.RATING_PRIOR_MEAN + total) / (weight + count)
+
+
+def apply_review_delta(professor_id, count_delta, sum_delta):
+    """
+    Shift a professor's counters by a review write and refresh ``rating``
+    and ``score``, in one ``UPDATE`` that never reads the row into Python.
+    Call inside the transaction that writes the review.
+    """
+    review_count = F('review_count') + count_delta
+    rating_sum = F('rating_sum') + sum_delta
+    Professor.objects.filter(pk=professor_id).update(
+        review_count=review_count,
+        rating_sum=rating_sum,
+        rating=mean_rating_expression(review_count, rating_sum),
+        score=bayesian_score_expression(review_count, rating_sum),
+    )
+
+
+def upsert_review(professor_id, creator_id, fields, existing=None):
+    """
+    Write a user's review of a professor with a single ``INSERT ... ON
+    CONFLICT (professor_id, creator_id) DO UPDATE`` and shift the counters.
+    ``existing`` is the stored review read earlier in the same transaction
+    (None if there is none), whose rating the counters are corrected by.
+    Returns the saved review.
+    """
+    review = existing or Review(professor_id=professor_id, creator_id=creator_id)
+    previous_rating, created_at = review.rating, review.created_at
+    for name, value in fields.items():
+        setattr(review, name, value)
+    Review.objects.bulk_create(
+        [review], update_conflicts=True, unique_fields=['professor', 'creator_id'], update_fields=list(UPSERT_FIELDS)
+    )
+    if existing is None:
+        apply_review_delta(professor_id, 1, review.rating)
+    else:
+        # bulk_create stamps auto_now_add fields even when the row is updated
+        review.created_at = created_at
+        apply_review_delta(professor_id, 0, review.rating - previous_rating)
+    return review
+
+
+def recompute(professor_ids=None, dry_run=False):
+    """
+    Recompute counters from the review table with one grouped aggregate and
+    bulk-update the professors that drifted. Limited to ``professor_ids``
+    when given (one aggregate per 500 ids). Returns the drifted professors
+    (unsaved if ``dry_run``).
+    """
+    if professor_ids is None:
+        return _recompute(Review.objects.all(), Professor.objects.all(), dry_run)
+    professor_ids = sorted(set(professor_ids))
+    drifted = []
+    for start in range(0, len(professor_ids), CHUNK_SIZE):
+        chunk = professor_ids[start:start + CHUNK_SIZE]
+        drifted += _recompute(
+            Review.objects.filter(professor_id__in=chunk), Professor.objects.filter(pk__in=chunk), dry_run
+        )
+    return drifted
+
+
+def _recompute(reviews, professors, dry_run):
+    totals = {
+        row['professor_id']: (row['count'], row['total'])
+        for row in reviews.order_by().values('professor_id').annotate(count=Count('id'), total=Sum('rating'))
+    }
+
+    drifted = []
+    for professor in professors.only('id', 'review_count', 'rating_sum', 'rating', 'score').iterator(chunk_size=2000):
+        count, total = totals.get(professor.id, (0, 0))
+        if (
+            (professor.review_count, professor.rating_sum) != (count, total)
+            or not _rating_matches(professor.rating, count, total)
+            or abs(professor.score - expected_score(count, total)) > 1e-9
+        ):
+            professor.review_count, professor.rating_sum = count, total
+            drifted.append(professor)
+
+    if drifted and not dry_run:
+        for start in range(0, len(drifted), CHUNK_SIZE):
+            chunk = Professor.objects.filter(pk__in=[p.pk for p in drifted[start:start + CHUNK_SIZE]])
+            # Correlated subqueries on the (professor, rating, ...) index
+            # rather than bulk_update, whose CASE per row Django is slow to build
+            chunk.update(review_count=_review_aggregate(Count('id')), rating_sum=_review_aggregate(Sum('rating')))
+            chunk.update(
+                rating=mean_rating_expression(F('review_count'), F('rating_sum')),
+                score=bayesian_score_expression(F('review_count'), F('rating_sum')),
+            )
+    return drifted
+
+
+def _review_aggregate(aggregate):
+    """``aggregate`` over the reviews of the professor being updated, 0 without reviews."""
+    reviews = Review.objects.filter(professor_id=OuterRef('pk')).order_by().values('professor_id')
+    return Coalesce(Subquery(reviews.annotate(value=aggregate).values('value')), Value(0))
+
+
+def _rating_matches(rating, count, total):
+    # The stored value is rounded by the database, whose tie-breaking may
+    # differ from Python's round(); anything within half a step is correct.
+    expected = total / count if count else 0.0
+    return abs(rating - expected) <= 0.05 + 1e-9
@@ -0,0 +1,216 @@
+"""
+Full-text search index over review comments.
+
+On SQLite builds with FTS5 the index is an FTS5 table
+(``base_review_search``) holding each review's comment, professor id and
+professor department, kept in sync by triggers: the upsert in
+``createReview``, deletes, the batched purge and bulk moderation all
+update it, and so does a professor changing department. The professor and
+department filters are columns of the index, so FTS5 intersects them with
+the words itself instead of joining every match to its review and
+professor. Unlike the professor index it keeps its own copy of the
+comment: the department is not a column of ``base_review``, so the
+external-content table would need a view, and SQLite refuses to rename a
+table into place while a view names it, which every Django table rebuild
+does.
+
+The porter stemmer on top of unicode61 lets ``curved exams`` match
+"curve" and "exam" as well, so words are matched whole rather than as the
+prefixes of the professor search. Matches are ranked by ``bm25()`` on the
+comment alone, and ``snippet()`` cuts the part of the comment around the
+hits. Ranking reads every match, so a query matching more than
+``RANK_WINDOW`` reviews ranks only the newest ``RANK_WINDOW`` of them;
+narrower queries are ranked in full.
+
+There is no ``LIKE`` fallback: a substring scan of every comment is too
+slow to serve, so without FTS5 the search endpoint is unavailable.
+
+The review triggers read ``base_professor``, and SQLite refuses to rename
+a table into place while a trigger names a missing one. Migrations that
+make Django rebuild ``base_review`` or ``base_professor`` must therefore
+call ``uninstall_triggers`` before and ``install_triggers`` after.
+"""
+import html
+import re
+
+from django.db import connections
+from django.db.models import F, Func, TextField
+
+from .search import fts5_supported, is_installed
+
+TABLE = 'base_review_search'
+SOURCE_TABLE = 'base_review'
+PROFESSOR_TABLE = 'base_professor'
+TRIGGERS = (f'{TABLE}_ai', f'{TABLE}_ad', f'{TABLE}_au', f'{TABLE}_pu')
+
+# bm25 weights for (comment, professor_id, department): the filter columns
+# must not move the ranking
+RANK = 'bm25(1.0, 0.0, 0.0)'
+RANK_WINDOW = 20_000
+SNIPPET_TOKENS = 16
+# snippet() wraps hits in these; highlight() turns them into <mark> once
+# the rest of the comment is escaped
+HIGHLIGHT = ('\x02', '\x03')
+
+CREATE_TABLE_SQL = (
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {TABLE} USING fts5("
+    f"comment, professor_id, department, tokenize='porter unicode61 remove_diacritics 2')"
+)
+
+CREATE_TRIGGERS_SQL = (
+    f"""CREATE TRIGGER IF NOT EXISTS {TABLE}_ai AFTER INSERT ON {SOURCE_TABLE} BEGIN
+        INSERT INTO {TABLE}(rowid, comment, professor_id, department)
+        SELECT new.id, new.comment, new.professor_id, department FROM {PROFESSOR_TABLE} WHERE id = new.professor_id;
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {TABLE}_ad AFTER DELETE ON {SOURCE_TABLE} BEGIN
+        DELETE FROM {TABLE} WHERE rowid = old.id;
+    END""",
+    # The upsert sets comment even when it is unchanged
+    f"""CREATE TRIGGER IF NOT EXISTS {TABLE}_au AFTER UPDATE OF comment, professor_id ON {SOURCE_TABLE}
+    WHEN old.comment IS NOT new.comment OR old.professor_id != new.professor_id
+    BEGIN
+        UPDATE {TABLE} SET comment = new.comment, professor_id = new.professor_id,
+            department = (SELECT department FROM {PROFESSOR_TABLE} WHERE id = new.professor_id)
+        WHERE rowid = old.id;
+    END""",
+    # Finds the professor's reviews through the index, so that this trigger
+    # does not name base_review
+    f"""CREATE TRIGGER IF NOT EXISTS {TABLE}_pu AFTER UPDATE OF department ON {PROFESSOR_TABLE}
+    WHEN old.department IS NOT new.department
+    BEGIN
+        UPDATE {TABLE} SET department = new.department
+        WHERE {TABLE} MATCH 'professor_id : "' || new.id || '"';
+    END""",
+)
+
+REBUILD_SQL = (
+    f"DELETE FROM {TABLE}",
+    f"""INSERT INTO {TABLE}(rowid, comment, professor_id, department)
+        SELECT r.id, r.comment, r.professor_id, p.department
+        FROM {SOURCE_TABLE} r JOIN {PROFESSOR_TABLE} p ON p.id = r.professor_id""",
+    # Merge the index into one b-tree for the fastest reads
+    f"INSERT INTO {TABLE}({TABLE}) VALUES ('optimize')",
+)
+
+# The oldest of the newest RANK_WINDOW matches, read off the index in rowid order
+WINDOW_SQL = f"SELECT rowid FROM {TABLE} WHERE {TABLE} MATCH %s ORDER BY rowid DESC LIMIT 1 OFFSET %s"
+
+_TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+_available = {}
+
+
+class Snippet(Func):
+    """
+    ``snippet()`` of the matched comment: at most ``SNIPPET_TOKENS`` tokens
+    around the hits, which are wrapped in the ``HIGHLIGHT`` markers.
+    """
+    function = 'snippet'
+    template = f"%(function)s(%(expressions)s, 0, char(2), char(3), '…', {SNIPPET_TOKENS})"
+    output_field = TextField()
+
+
+def install(connection):
+    """Create the index, its triggers and its ranking, then index existing reviews."""
+    if not fts5_supported(connection):
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(CREATE_TABLE_SQL)
+        cursor.execute(f"INSERT INTO {TABLE}({TABLE}, rank) VALUES ('rank', '{RANK}')")
+    install_triggers(connection)
+    rebuild(connection)
+
+
+def install_triggers(connection):
+    if TABLE not in connection.introspection.table_names():
+        return
+    with connection.cursor() as cursor:
+        for sql in CREATE_TRIGGERS_SQL:
+            cursor.execute(sql)
+    _available.pop(connection.alias, None)
+
+
+def uninstall_triggers(connection):
+    with connection.cursor() as cursor:
+        for trigger in TRIGGERS:
+            cursor.execute(f'DROP TRIGGER IF EXISTS {trigger}')
+    _available.pop(connection.alias, None)
+
+
+def uninstall(connection):
+    uninstall_triggers(connection)
+    with connection.cursor() as cursor:
+        cursor.execute(f'DROP TABLE IF EXISTS {TABLE}')
+
+
+def rebuild(connection):
+    """Re-index every review."""
+    with connection.cursor() as cursor:
+        for sql in REBUILD_SQL:
+            cursor.execute(sql)
+
+
+def is_available(using='default'):
+    """True when the index and all of its triggers exist; checked once per process."""
+    if using not in _available:
+        _available[using] = is_installed(connections[using], TABLE, TRIGGERS)
+    return _available[using]
+
+
+def build_query(text, professor=None, department=None):
+    """
+    Turn free text into an FTS5 expression over the comments that ANDs
+    every word, keeping double-quoted parts together as phrases, e.g.
+    ``"office hours" curved`` -> ``comment : ("office hours" "curved")``,
+    narrowed to the ``professor`` id and ``department`` if given. The
+    department column is tokenized, so callers still compare it exactly.
+    Returns ``''`` if the text has no searchable words.
+    """
+    terms = []
+    # Odd parts were inside quotes; an unclosed quote runs to the end
+    for index, part in enumerate(text.split('"')):
+        tokens = _TOKEN_RE.findall(part)
+        if index % 2:
+            if tokens:
+                terms.append('"{}"'.format(' '.join(tokens)))
+        else:
+            terms += [f'"{token}"' for token in tokens]
+    if not terms:
+        return ''
+    expression = 'comment : ({})'.format(' '.join(terms))
+    if professor is not None:
+        expression += f' AND professor_id : "{int(professor)}"'
+    department_tokens = _TOKEN_RE.findall(department or '')
+    if department_tokens:
+        expression += ' AND department : "{}"'.format(' '.join(department_tokens))
+    return expression
+
+
+def window_start(expression, using='default'):
+    """
+    The id of the oldest review among the newest ``RANK_WINDOW`` matches
+    of ``expression``, or None if it matches fewer.
+    """
+    with connections[using].cursor() as cursor:
+        cursor.execute(WINDOW_SQL, [expression, RANK_WINDOW - 1])
+        row = cursor.fetchone()
+    return row[0] if row else None
+
+
+def search_reviews(queryset, expression):
+    """
+    Filter ``queryset`` to reviews matching the FTS5 ``expression`` (the
+    newest ``RANK_WINDOW`` of them at most), annotated with
+    ``search_rank`` (bm25, lower is better) and ``snippet``. Order by
+    ``('search_rank', 'id')`` for the best matches first.
+    """
+    queryset = queryset.filter(search_index__document__match=expression)
+    start = window_start(expression, queryset.db)
+    if start is not None:
+        queryset = queryset.filter(search_index__review__gte=start)
+    return queryset.annotate(search_rank=F('search_index__rank'), snippet=Snippet('search_index__document'))
+
+
+def highlight(snippet):
+    """HTML-escape a ``Snippet`` and wrap its hits in ``<mark>`` tags."""
+    start, end = HIGHLIGHT
+    return html.escape(snippet).replace(start, '<mark>').replace(end, '</mark>')
@@ -0,0 +1,156 @@
+"""
+Full-text search index over professor name and department.
+
+On SQLite builds with FTS5 the index is an external-content FTS5 table
+(``base_professor_search``) kept in sync with ``base_professor`` by
+triggers, so every write path - ``save()``, ``bulk_create()``,
+``QuerySet.update()`` and deletes - updates it. The unicode61 tokenizer
+folds case and diacritics, and ``prefix`` indexes make the ``tok*``
+queries issued for search-as-you-type cheap. Other databases, or SQLite
+builds without FTS5, fall back to the ``icontains`` scan.
+
+Django rebuilds a SQLite table (dropping its triggers) for most schema
+changes, so migrations that alter ``Professor`` must call
+``install_triggers`` again.
+"""
+import re
+
+from django.db import connections
+from django.db.models import F, Lookup, Q, TextField
+
+TABLE = 'base_professor_search'
+CONTENT_TABLE = 'base_professor'
+TRIGGERS = (f'{TABLE}_ai', f'{TABLE}_ad', f'{TABLE}_au')
+
+# bm25 weights for (name, department): a name hit outranks a department hit.
+RANK = 'bm25(10.0, 1.0)'
+
+CREATE_TABLE_SQL = (
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {TABLE} USING fts5("
+    f"name, department, content='{CONTENT_TABLE}', content_rowid='id', "
+    f"tokenize='unicode61 remove_diacritics 2', prefix='2 3')"
+)
+
+CREATE_TRIGGERS_SQL = (
+    f"""CREATE TRIGGER IF NOT EXISTS {TABLE}_ai AFTER INSERT ON {CONTENT_TABLE} BEGIN
+        INSERT INTO {TABLE}(rowid, name, department) VALUES (new.id, new.name, new.department);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {TABLE}_ad AFTER DELETE ON {CONTENT_TABLE} BEGIN
+        INSERT INTO {TABLE}({TABLE}, rowid, name, department) VALUES ('delete', old.id, old.name, old.department);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {TABLE}_au AFTER UPDATE OF name, department ON {CONTENT_TABLE} BEGIN
+        INSERT INTO {TABLE}({TABLE}, rowid, name, department) VALUES ('delete', old.id, old.name, old.department);
+        INSERT INTO {TABLE}(rowid, name, department) VALUES (new.id, new.name, new.department);
+    END""",
+)
+
+_TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+_available = {}
+
+
+class FullTextField(TextField):
+    """
+    The hidden column FTS5 names after its table; ``field__match`` compiles
+    to ``<table> MATCH %s`` on whichever alias the join produced.
+    """
+
+
+@FullTextField.register_lookup
+class Match(Lookup):
+    lookup_name = 'match'
+
+    def as_sql(self, compiler, connection):
+        rhs_sql, rhs_params = self.process_rhs(compiler, connection)
+        return f'{compiler.quote_name_unless_alias(self.lhs.alias)} MATCH {rhs_sql}', rhs_params
+
+
+def fts5_supported(connection):
+    if connection.vendor != 'sqlite':
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute('PRAGMA compile_options')
+        return any(row[0] == 'ENABLE_FTS5' for row in cursor.fetchall())
+
+
+def install(connection):
+    """Create the index, its triggers and its ranking, then index existing rows."""
+    if not fts5_supported(connection):
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(CREATE_TABLE_SQL)
+        cursor.execute(f"INSERT INTO {TABLE}({TABLE}, rank) VALUES ('rank', '{RANK}')")
+    install_triggers(connection)
+    rebuild(connection)
+
+
+def install_triggers(connection):
+    if TABLE not in connection.introspection.table_names():
+        return
+    with connection.cursor() as cursor:
+        for sql in CREATE_TRIGGERS_SQL:
+            cursor.execute(sql)
+    _available.pop(connection.alias, None)
+
+
+def uninstall(connection):
+    with connection.cursor() as cursor:
+        for trigger in TRIGGERS:
+            cursor.execute(f'DROP TRIGGER IF EXISTS {trigger}')
+        cursor.execute(f'DROP TABLE IF EXISTS {TABLE}')
+    _available.pop(connection.alias, None)
+
+
+def rebuild(connection):
+    """Re-read every row of the content table into the index."""
+    with connection.cursor() as cursor:
+        cursor.execute(f"INSERT INTO {TABLE}({TABLE}) VALUES ('rebuild')")
+
+
+def is_available(using='default'):
+    """
+    True when the index and all of its triggers exist. Checked once per
+    process; a stale index is worse than the slower fallback.
+    """
+    if using not in _available:
+        _available[using] = is_installed(connections[using], TABLE, TRIGGERS)
+    return _available[using]
+
+
+def is_installed(connection, table, triggers):
+    """True when the FTS5 ``table`` and all of its ``triggers`` exist."""
+    if connection.vendor != 'sqlite':
+        return False
+    placeholders = ', '.join(['%s'] * len(triggers))
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"SELECT name FROM sqlite_master WHERE (type = 'table' AND name = %s) OR (type = 'trigger' AND name IN ({placeholders}))",
+            [table, *triggers],
+        )
+        return len(cursor.fetchall()) == 1 + len(triggers)
+
+
+def build_query(text):
+    """
+    Turn free text into an FTS5 expression that ANDs a prefix match on
+    every word, e.g. ``comp sci`` -> ``"comp"* "sci"*``. Returns ``''`` if
+    the text has no searchable words.
+    """
+    return ' '.join(f'"{token}"*' for token in _TOKEN_RE.findall(text))
+
+
+def search_professors(queryset, text):
+    """
+    Filter ``queryset`` to professors matching ``text``.
+
+    Returns ``(queryset, ordering)``: with the index, matches are annotated
+    with ``search_rank`` and ordered best first; otherwise the ``icontains``
+    scan is used and the usual ``(name, id)`` ordering is kept.
+    """
+    expression = build_query(text)
+    if expression and is_available(queryset.db):
+        queryset = queryset.filter(search_index__document__match=expression).annotate(
+            search_rank=F('search_index__rank')
+        )
+        return queryset, ('search_rank', 'id')
+    queryset = queryset.filter(Q(name__icontains=text) | Q(department__icontains=text))
+    return queryset, ('name', 'id')
@@ -0,0 +1,236 @@
+"""
+"Students who liked X also rated Y highly": precomputed similar professors.
+
+``build`` compares professors as sparse vectors of their ratings over
+students, each rating centred on its student's mean (adjusted cosine), so
+a student who gives everyone a 5 says nothing about which professors are
+alike. The sparse products run inside SQLite as a grouped self-join of
+the centred ratings on ``creator_id``, ``CHUNK_SIZE`` professors at a
+time, so memory is bounded by one chunk's candidate pairs whatever the
+number of reviews. Python keeps only the best ``NEIGHBOURS`` per
+professor, and each chunk's lists are replaced in a short transaction of
+their own.
+
+The similarity is ``dot / (|a| |b|)`` damped by ``min(co_raters,
+SIGNIFICANCE) / SIGNIFICANCE``, so two professors sharing one rater do not
+look identical. Students with more than ``MAX_RATER_REVIEWS`` reviews are
+left out: they add quadratically many pairs and are more likely bots.
+
+Triggers on ``base_review`` log every review write to
+``SimilarityChange``. An incremental build recomputes the lists of the
+professors those writes touched (the ones the changed students rate or
+rated) and patches every other list with its fresh similarities to them,
+which fall out of the same grouped queries because similarity is
+symmetric. Run a full build now and then: a patched list whose touched
+members dropped out can be left short. Like the other triggers in ``base``, they are dropped when Django rebuilds
+the review table, so migrations that alter ``Review`` must call
+``install_triggers`` again.
+"""
+import heapq
+import math
+from collections import defaultdict
+from itertools import groupby
+from operator import itemgetter
+
+from django.db import connections, transaction
+from django.db.models import Max
+
+from .models import Professor, ProfessorNeighbour, SimilarityChange
+
+NEIGHBOURS = 20
+CHUNK_SIZE = 200
+MIN_CO_RATERS = 2
+SIGNIFICANCE = 10
+MAX_RATER_REVIEWS = 500
+
+CHANGES_TABLE = 'base_similaritychange'
+SOURCE_TABLE = 'base_review'
+TRIGGERS = (f'{CHANGES_TABLE}_ai', f'{CHANGES_TABLE}_ad', f'{CHANGES_TABLE}_au')
+
+_LOG_NEW = f"""INSERT INTO {CHANGES_TABLE} (creator_id, professor_id)
+        SELECT new.creator_id, new.professor_id WHERE new.creator_id IS NOT NULL;"""
+_LOG_OLD = f"""INSERT INTO {CHANGES_TABLE} (creator_id, professor_id)
+        SELECT old.creator_id, old.professor_id WHERE old.creator_id IS NOT NULL;"""
+
+CREATE_TRIGGERS_SQL = (
+    f"""CREATE TRIGGER IF NOT EXISTS {CHANGES_TABLE}_ai AFTER INSERT ON {SOURCE_TABLE} BEGIN
+        {_LOG_NEW}
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {CHANGES_TABLE}_ad AFTER DELETE ON {SOURCE_TABLE} BEGIN
+        {_LOG_OLD}
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {CHANGES_TABLE}_au AFTER UPDATE OF rating, professor_id, creator_id ON {SOURCE_TABLE}
+    WHEN old.rating != new.rating OR old.professor_id != new.professor_id OR old.creator_id IS NOT new.creator_id
+    BEGIN
+        {_LOG_OLD}
+        {_LOG_NEW}
+    END""",
+)
+
+# Centred ratings of the students that count, indexed both ways for the join
+CENTRED = 'similarity_centred'
+CREATE_CENTRED_SQL = (
+    f"DROP TABLE IF EXISTS temp.{CENTRED}",
+    f"""CREATE TEMP TABLE {CENTRED} AS
+        SELECT r.creator_id, r.professor_id, r.rating - m.mean AS value
+        FROM {SOURCE_TABLE} r
+        JOIN (
+            SELECT creator_id, AVG(rating) AS mean FROM {SOURCE_TABLE} WHERE creator_id IS NOT NULL
+            GROUP BY creator_id HAVING COUNT(*) BETWEEN 2 AND {int(MAX_RATER_REVIEWS)}
+        ) m ON m.creator_id = r.creator_id
+        JOIN base_professor p ON p.id = r.professor_id AND p.deleted_at IS NULL
+        WHERE r.rating != m.mean""",
+    f"CREATE INDEX temp.{CENTRED}_professor ON {CENTRED} (professor_id, creator_id, value)",
+    f"CREATE INDEX temp.{CENTRED}_creator ON {CENTRED} (creator_id, professor_id, value)",
+)
+
+NORMS_SQL = f"SELECT professor_id, SUM(value * value) FROM {CENTRED} GROUP BY professor_id"
+
+PAIRS_SQL = f"""SELECT a.professor_id, b.professor_id, SUM(a.value * b.value), COUNT(*)
+    FROM {CENTRED} a JOIN {CENTRED} b ON b.creator_id = a.creator_id AND b.professor_id != a.professor_id
+    WHERE a.professor_id IN ({{placeholders}})
+    GROUP BY a.professor_id, b.professor_id
+    HAVING COUNT(*) >= {int(MIN_CO_RATERS)} AND SUM(a.value * b.value) > 0
+    ORDER BY a.professor_id"""
+
+INSERT_SQL = "INSERT INTO base_professorneighbour (professor_id, neighbour_id, similarity, co_raters) VALUES (%s, %s, %s, %s)"
+
+# Professors whose rating vectors changed: the ones the logged students
+# rate now or rated before
+TOUCHED = 'similarity_touched'
+CREATE_TOUCHED_SQL = (
+    f"DROP TABLE IF EXISTS temp.{TOUCHED}",
+    f"""CREATE TEMP TABLE {TOUCHED} AS
+        WITH changed AS (SELECT DISTINCT creator_id, professor_id FROM {CHANGES_TABLE} WHERE id <= %s)
+        SELECT professor_id FROM changed
+        UNION SELECT professor_id FROM {SOURCE_TABLE} WHERE creator_id IN (SELECT creator_id FROM changed)""",
+)
+
+# Untouched professors listing a touched one, whose lists need patching
+# even if the pair no longer qualifies
+LISTING_TOUCHED_SQL = f"""SELECT DISTINCT professor_id FROM base_professorneighbour
+    WHERE neighbour_id IN (SELECT professor_id FROM {TOUCHED})
+    AND professor_id NOT IN (SELECT professor_id FROM {TOUCHED})"""
+
+
+def install_triggers(connection):
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        for sql in CREATE_TRIGGERS_SQL:
+            cursor.execute(sql)
+
+
+def uninstall(connection):
+    with connection.cursor() as cursor:
+        for trigger in TRIGGERS:
+            cursor.execute(f'DROP TRIGGER IF EXISTS {trigger}')
+
+
+def build(full=False, using='default', chunk_size=CHUNK_SIZE):
+    """
+    Recompute the neighbour lists: every professor's with ``full``, else
+    those the logged review changes affect. Returns the number of
+    professors refreshed and of neighbour rows written.
+    """
+    connection = connections[using]
+    last_change = SimilarityChange.objects.using(using).aggregate(last=Max('id'))['last']
+    if not full and last_change is None:
+        return 0, 0
+    with connection.cursor() as cursor:
+        try:
+            for sql in CREATE_CENTRED_SQL:
+                cursor.execute(sql)
+            cursor.execute(NORMS_SQL)
+            norms = {professor_id: math.sqrt(total) for professor_id, total in cursor.fetchall()}
+            if full:
+                targets = list(Professor.objects.using(using).order_by('id').values_list('id', flat=True))
+                patches = None
+            else:
+                cursor.execute(CREATE_TOUCHED_SQL[0])
+                cursor.execute(CREATE_TOUCHED_SQL[1], [last_change])
+                cursor.execute(f'SELECT professor_id FROM {TOUCHED} ORDER BY professor_id')
+                targets = [row[0] for row in cursor.fetchall()]
+                patches = defaultdict(list)
+            touched = set(targets)
+            written = 0
+            for start in range(0, len(targets), chunk_size):
+                chunk = targets[start:start + chunk_size]
+                written += _replace(using, chunk, _neighbours(cursor, chunk, norms, touched, patches))
+            if patches is not None:
+                cursor.execute(LISTING_TOUCHED_SQL)
+                patched = sorted(set(patches).union(row[0] for row in cursor.fetchall()))
+                for start in range(0, len(patched), chunk_size):
+                    chunk = patched[start:start + chunk_size]
+                    written += _replace(using, chunk, _patched(using, chunk, touched, patches))
+                targets += patched
+        finally:
+            cursor.execute(f'DROP TABLE IF EXISTS temp.{CENTRED}')
+            cursor.execute(f'DROP TABLE IF EXISTS temp.{TOUCHED}')
+    # Changes logged while the build ran stay for the next one
+    if last_change is not None:
+        SimilarityChange.objects.using(using).filter(id__lte=last_change).delete()
+    return len(targets), written
+
+
+def _neighbours(cursor, chunk, norms, touched, patches):
+    """
+    The lists of the professors in ``chunk``. With ``patches``, also keep
+    the best of the chunk's professors as candidates for every untouched
+    professor they pair with: similarity is symmetric, so this is the
+    untouched professor's fresh similarity to each of them.
+    """
+    cursor.execute(PAIRS_SQL.format(placeholders=', '.join(['%s'] * len(chunk))), chunk)
+    neighbours = []
+    for professor_id, pairs in groupby(cursor.fetchall(), key=itemgetter(0)):
+        norm = norms[professor_id]
+        scored = [
+            (dot / (norm * norms[neighbour_id]) * min(co_raters, SIGNIFICANCE) / SIGNIFICANCE, -neighbour_id, co_raters)
+            for _, neighbour_id, dot, co_raters in pairs
+        ]
+        neighbours += _rows(professor_id, heapq.nlargest(NEIGHBOURS, scored))
+        if patches is not None:
+            for similarity, negated_id, co_raters in scored:
+                if -negated_id not in touched:
+                    _keep_best(patches[-negated_id], (similarity, -professor_id, co_raters))
+    return neighbours
+
+
+def _patched(using, chunk, touched, patches):
+    """
+    Merge the fresh candidates into the stored lists of untouched
+    professors: their pairs with untouched professors did not change. A
+    list whose touched members dropped out may come up short of
+    ``NEIGHBOURS`` until the next full build.
+    """
+    lists = defaultdict(list)
+    for professor_id, neighbour_id, similarity, co_raters in ProfessorNeighbour.objects.using(using).filter(
+        professor_id__in=chunk,
+    ).values_list('professor_id', 'neighbour_id', 'similarity', 'co_raters'):
+        if neighbour_id not in touched:
+            lists[professor_id].append((similarity, -neighbour_id, co_raters))
+    neighbours = []
+    for professor_id in chunk:
+        neighbours += _rows(professor_id, heapq.nlargest(NEIGHBOURS, lists[professor_id] + patches.get(professor_id, [])))
+    return neighbours
+
+
+def _keep_best(heap, candidate):
+    if len(heap) < NEIGHBOURS:
+        heapq.heappush(heap, candidate)
+    elif candidate > heap[0]:
+        heapq.heapreplace(heap, candidate)
+
+
+def _rows(professor_id, scored):
+    return [(professor_id, -negated_id, similarity, co_raters) for similarity, negated_id, co_raters in scored]
+
+
+def _replace(using, chunk, neighbours):
+    # Plain tuples through executemany: model instances and bulk_create
+    # cost more than the similarity queries on a full build
+    with transaction.atomic(using=using):
+        ProfessorNeighbour.objects.using(using).filter(professor_id__in=chunk).delete()
+        with connections[using].cursor() as cursor:
+            cursor.executemany(INSERT_SQL, neighbours)
+    return len(neighbours)
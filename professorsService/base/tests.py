@@ -1,9 +1,39 @@
-from django.test import TestCase
-from rest_framework.test import APIClient
-from rest_framework import status
-from base.models import Professor, Review
+import datetime
+import gzip
+import json
+import logging
+import os
+import shutil
+import tempfile
+import time
+from io import StringIO
 from unittest.mock import patch
-from django.test import override_settings
+
+import jwt
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.test import AsyncClient, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.test import APIClient, APIRequestFactory
+from rest_framework_simplejwt.exceptions import TokenBackendError
+
+from api.caching import BODY_KEY
+from api.pagination import KeysetPagination
+from api.serializers import LeaderboardSerializer, ProfessorSerializer, ProfessorSummarySerializer, ReviewSerializer
+from base import ratings, review_search, search
+from base.models import DepartmentStats, Professor, ProfessorSearchIndex, Review
+from professorsService.authentication import ExternalJWTAuthentication, ExternalJWTUser, VerifiedTokenCache, token_cache
+
+# The real method, for the tests that run it under setUp's patch
+REAL_AUTHENTICATE = ExternalJWTAuthentication.authenticate
 
 @override_settings()
 class ProfessorAPITestCase(TestCase):
@@ -20,6 +50,7 @@ class ProfessorAPITestCase(TestCase):
         # Patch authentication to simulate user roles
         self.patcher = patch('professorsService.authentication.ExternalJWTAuthentication.authenticate', side_effect=self.fake_auth)
         self.patcher.start()
+        cache.clear()
         # Prepopulate with two professors
         self.prof1 = Professor.objects.create(
             name="Alice Smith", department="CS", email="alice@umass.edu", office="CS101", rating=4.5, creator_id=2
@@ -84,15 +115,41 @@ class ProfessorAPITestCase(TestCase):
         # Precondition assertion
         self.assertEqual(Professor.objects.count(), 2, "Precondition: 2 professors exist.")
         new_prof = {
-            "name": "Carol Lee", "department": "MATH", "email": "carol@umass.edu", "office": "MATH101", "rating": 0.0
+            "name": "Carol Lee", "department": "MATH", "email": "carol@umass.edu", "office": "MATH101", "rating": 5.0
         }
         # Testing assertion
         response = self.client.post('/api/professors/create/', new_prof, format='json', **self.staff_headers)
         self.assertEqual(response.status_code, status.HTTP_201_CREATED, "Testing: Should return 201 Created.")
         self.assertEqual(Professor.objects.count(), 3, "Testing: Should have 3 professors after creation.")
+        self.assertEqual(response.data['rating'], 0.0, "Testing: A posted rating should be ignored.")
         # Postcondition assertion
         created = Professor.objects.get(name="Carol Lee")
         self.assertEqual(created.department, "MATH", "Postcondition: Department should be MATH.")
+        self.assertEqual((created.rating, created.review_count), (0.0, 0), "Postcondition: Carol has no rating without reviews.")
+        self.assertEqual(ratings.recompute([created.id], dry_run=True), [], "Postcondition: Carol is not drifted.")
+
+    def test_create_professor_cannot_set_deleted_at(self):
+        """
+        Test that deleted_at is neither writable nor exposed by the professor endpoints.
+        """
+        # Precondition assertion
+        self.assertEqual(Professor.objects.count(), 2, "Precondition: 2 professors exist.")
+        new_prof = {
+            "name": "Carol Lee", "department": "MATH", "email": "carol@umass.edu", "office": "MATH101",
+            "deleted_at": "2024-01-01T00:00:00Z",
+        }
+        # Testing assertion
+        response = self.client.post('/api/professors/create/', new_prof, format='json', **self.staff_headers)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED, "Testing: Should return 201 Created.")
+        self.assertNotIn('deleted_at', response.data, "Testing: deleted_at is not in the response.")
+        created = Professor.objects.get(name="Carol Lee")
+        self.assertIsNone(created.deleted_at, "Testing: deleted_at is ignored on create.")
+        # Postcondition assertion
+        detail = self.client.get(f'/api/professors/{created.id}/', **self.student_headers)
+        batch = self.client.get(f'/api/professors/batch/?ids={created.id}', **self.student_headers)
+        self.assertNotIn('deleted_at', detail.json(), "Postcondition: The detail body hides deleted_at.")
+        self.assertEqual(batch.status_code, status.HTTP_200_OK, "Postcondition: The batch read succeeds.")
+        self.assertNotIn('deleted_at', batch.json()[str(created.id)], "Postcondition: The batch body hides deleted_at.")
 
     def test_delete_professor(self):
         """
@@ -109,6 +166,95 @@ class ProfessorAPITestCase(TestCase):
         with self.assertRaises(Professor.DoesNotExist):
             Professor.objects.get(id=self.prof1.id)
 
+    def _bulk_reviews(self, prof, count):
+        Review.objects.bulk_create(
+            Review(professor=prof, author=f"S{i}", rating=i % 5 + 1, comment="Review", creator_id=100 + i) for i in range(count)
+        )
+
+    def test_delete_professor_hides_at_once_and_purges_later(self):
+        """
+        Test that a deleted professor leaves every read endpoint at once and the purge command removes the rows.
+        """
+        self._bulk_reviews(self.prof1, 30)
+        detail_url = f'/api/professors/{self.prof1.id}/'
+        # Precondition assertion
+        self.assertEqual(self.client.get(detail_url, **self.student_headers).status_code, 200, "Precondition: The detail is cached.")
+        # Testing assertion
+        with self.captureOnCommitCallbacks() as callbacks:
+            response = self.client.delete(f'/api/professors/{self.prof1.id}/delete/', **self.staff_headers)
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT, "Testing: Should return 204 No Content.")
+        self.assertEqual(len(callbacks), 1, "Testing: The purge is handed to the background worker after the commit.")
+        self.assertEqual(Review.objects.filter(professor_id=self.prof1.id).count(), 30, "Testing: The reviews are not deleted inline.")
+        self.assertEqual(self.client.get(detail_url, **self.student_headers).status_code, 404, "Testing: The cached detail is gone.")
+        for url, key in (
+            ('/api/professors/', 'name'), ('/api/professors/?query=Alice', 'name'), ('/api/professors/top/', 'name'),
+        ):
+            names = [p[key] for p in self.client.get(url, **self.student_headers).data]
+            self.assertNotIn("Alice Smith", names, f"Testing: {url} no longer lists Alice.")
+        response = self.client.get(f'/api/professors/batch/?ids={self.prof1.id},{self.prof2.id}', **self.student_headers)
+        self.assertIsNone(response.json()[str(self.prof1.id)], "Testing: The batch reports Alice as missing.")
+        response = self.client.get(f'{detail_url}reviews/', **self.student_headers)
+        self.assertEqual(response.status_code, 404, "Testing: Her reviews are not readable.")
+        response = self.client.delete(f'/api/professors/{self.prof1.id}/delete/', **self.staff_headers)
+        self.assertEqual(response.status_code, 404, "Testing: Deleting her again is a 404.")
+        # Postcondition assertion
+        out = StringIO()
+        call_command('purge_deleted_professors', '--batch-size', '8', stdout=out)
+        self.assertIn("Purged 1 professor(s) and 30 review(s) in 5 transaction(s)", out.getvalue(),
+                      "Postcondition: Three full batches, the rest and the professor row.")
+        self.assertFalse(Professor.all_objects.filter(pk=self.prof1.id).exists(), "Postcondition: The row is gone.")
+        self.assertFalse(Review.objects.filter(professor_id=self.prof1.id).exists(), "Postcondition: Her reviews are gone.")
+        self.assertEqual(DepartmentStats.objects.get(department='CS').professor_count, 0,
+                         "Postcondition: The soft delete already uncounted her; the purge does not again.")
+
+    def test_purge_bounds_write_transactions(self):
+        """
+        Test that the purge deletes at most one batch per transaction and holds the write lock far shorter than a hard delete.
+        """
+        from base import purge
+        self._bulk_reviews(self.prof1, 3000)
+        self._bulk_reviews(self.prof2, 3000)
+        Professor.objects.filter(pk=self.prof1.id).update(deleted_at=datetime.datetime.now(datetime.timezone.utc))
+        # Precondition assertion
+        start = time.perf_counter()
+        with transaction.atomic():
+            Professor.objects.get(pk=self.prof2.id).delete()
+        hard_delete_seconds = time.perf_counter() - start
+        self.assertFalse(Review.objects.filter(professor_id=self.prof2.id).exists(), "Precondition: One transaction removed 3000 reviews.")
+        # Testing assertion
+        with CaptureQueriesContext(connection) as queries:
+            stats = purge.purge_professor(self.prof1.id, batch_size=100)
+        deletes = [q['sql'] for q in queries.captured_queries if q['sql'].startswith('DELETE FROM "base_review"')]
+        self.assertEqual(len(deletes), 31, "Testing: 30 batches plus the professor's own cascade.")
+        self.assertTrue(all(sql.count(',') < 100 for sql in deletes), "Testing: No statement deletes more than one batch.")
+        self.assertEqual((stats.professors, stats.reviews, stats.transactions), (1, 3000, 32), "Testing: Every batch commits on its own.")
+        self.assertLess(stats.max_transaction_seconds, hard_delete_seconds,
+                        "Testing: The longest purge transaction is shorter than the hard delete.")
+        # Postcondition assertion
+        self.assertEqual(purge.purge_pending().professors, 0, "Postcondition: Nothing is left to purge.")
+        self.assertEqual(Professor.all_objects.count(), 0, "Postcondition: Both professors are gone.")
+
+    @override_settings(PROFESSORS_PURGE_IN_BACKGROUND=True)
+    def test_purge_shutdown_waits_for_background_purges(self):
+        """
+        Test that shutting the purge worker down waits for the purges already handed to it.
+        """
+        from base import purge
+        purged = []
+
+        def slow_purge(pk, using):
+            time.sleep(0.05)
+            purged.append(pk)
+        # Precondition assertion
+        with patch('base.purge._purge_in_background', side_effect=slow_purge), self.captureOnCommitCallbacks(execute=True):
+            purge.schedule(self.prof1.id)
+        self.assertIsNotNone(purge._executor, "Precondition: The worker was started.")
+        # Testing assertion
+        purge.shutdown()
+        self.assertEqual(purged, [self.prof1.id], "Testing: The scheduled purge finished before shutdown returned.")
+        # Postcondition assertion
+        self.assertIsNone(purge._executor, "Postcondition: The worker is stopped.")
+
     def test_create_review(self):
         """
         Test creating a review for a professor (STUDENT only).
@@ -146,7 +292,42 @@ class ProfessorAPITestCase(TestCase):
         # Postcondition assertion
         self.assertEqual(Review.objects.count(), 1, "Postcondition: No new reviews should be created.")
 
+    def test_review_upsert_response_and_constraint(self):
+        """
+        Test that a repeated review is upserted in place and duplicates are rejected by the database.
+        """
+        from django.db import IntegrityError, transaction
+        # Precondition assertion
+        response = self.client.post(f'/api/professors/{self.prof1.id}/review/', {"author": "S", "rating": 2, "comment": "Meh"}, format='json', **self.student_headers)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED, "Precondition: Should return 201 Created.")
+        created = response.data
+        # Testing assertion
+        response = self.client.post(f'/api/professors/{self.prof1.id}/review/', {"rating": 4, "creator_id": 99}, format='json', **self.student_headers)
+        self.assertEqual(response.status_code, status.HTTP_200_OK, "Testing: Should return 200 OK.")
+        self.assertEqual(response.data['id'], created['id'], "Testing: The same review should be updated.")
+        self.assertEqual(response.data['created_at'], created['created_at'], "Testing: created_at should be kept.")
+        self.assertEqual((response.data['comment'], response.data['creator_id']), ("Meh", 1), "Testing: Only sent review fields change.")
+        self.prof1.refresh_from_db()
+        self.assertEqual((self.prof1.review_count, self.prof1.rating_sum), (1, 4), "Testing: Only the rating delta is applied.")
+        # Postcondition assertion
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            Review.objects.create(professor=self.prof1, author="Dup", rating=1, comment="x", creator_id=1)
 
+    def test_create_review_rating_out_of_range(self):
+        """
+        Test that a rating outside 1-5 is rejected with 400 and leaves the counters alone.
+        """
+        # Precondition assertion
+        self.assertEqual(Review.objects.count(), 0, "Precondition: No reviews exist.")
+        # Testing assertion
+        for rating in (-3, 0, 6):
+            response = self.client.post(f'/api/professors/{self.prof1.id}/review/', {"author": "S", "rating": rating, "comment": "x"}, format='json', **self.student_headers)
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST, f"Testing: Rating {rating} should return 400.")
+            self.assertIn('rating', response.data, "Testing: The rating field is reported.")
+        # Postcondition assertion
+        self.prof1.refresh_from_db()
+        self.assertEqual(Review.objects.count(), 0, "Postcondition: No review was written.")
+        self.assertEqual((self.prof1.review_count, self.prof1.rating_sum), (0, 0), "Postcondition: Counters are unchanged.")
 
     def test_filter_by_department(self):
         """
@@ -187,4 +368,1347 @@ class ProfessorAPITestCase(TestCase):
         # Postcondition assertion
         self.assertEqual(Professor.objects.count(), 2, "Postcondition: No professors should be changed.")
 
+    def test_list_professors_paginated(self):
+        """
+        Test walking the professor list with keyset cursors in both directions.
+        """
+        # Precondition assertion
+        for i in range(3):
+            Professor.objects.create(name=f"Carol {i}", department="MATH", email=f"carol{i}@umass.edu", office="MATH101")
+        self.assertEqual(Professor.objects.count(), 5, "Precondition: 5 professors exist.")
+        # Testing assertion
+        response = self.client.get('/api/professors/?limit=2', **self.student_headers)
+        self.assertEqual(response.status_code, status.HTTP_200_OK, "Testing: Should return 200 OK.")
+        self.assertEqual([p['name'] for p in response.data], ["Alice Smith", "Bob Jones"], "Testing: First page should hold 2 professors.")
+        self.assertNotIn('rel="prev"', response['Link'], "Testing: First page should have no prev link.")
+        next_url = response['Link'].split(';')[0].strip('<>')
+        response = self.client.get(next_url, **self.student_headers)
+        self.assertEqual([p['name'] for p in response.data], ["Carol 0", "Carol 1"], "Testing: Second page should continue after the cursor.")
+        links = dict(
+            (part.split(';')[1].strip(), part.split(';')[0].strip(' <>')) for part in response['Link'].split(',')
+        )
+        response = self.client.get(links['rel="prev"'], **self.student_headers)
+        self.assertEqual([p['name'] for p in response.data], ["Alice Smith", "Bob Jones"], "Testing: Prev link should return the first page.")
+        response = self.client.get(links['rel="next"'], **self.student_headers)
+        self.assertEqual([p['name'] for p in response.data], ["Carol 2"], "Testing: Last page should hold the remaining professor.")
+        self.assertNotIn('rel="next"', response['Link'], "Testing: Last page should have no next link.")
+        # Postcondition assertion
+        self.assertEqual(Professor.objects.count(), 5, "Postcondition: No professors should be changed.")
+
+    def test_list_professors_paginated_with_query(self):
+        """
+        Test that cursors keep the query filter applied.
+        """
+        # Precondition assertion
+        for i in range(3):
+            Professor.objects.create(name=f"Carol {i}", department="MATH", email=f"carol{i}@umass.edu", office="MATH101")
+        self.assertEqual(Professor.objects.count(), 5, "Precondition: 5 professors exist.")
+        # Testing assertion
+        response = self.client.get('/api/professors/?query=MATH&limit=2', **self.student_headers)
+        self.assertEqual(len(response.data), 2, "Testing: First page should hold 2 professors.")
+        next_url = response['Link'].split(';')[0].strip('<>')
+        self.assertIn('query=MATH', next_url, "Testing: Next link should keep the query.")
+        response = self.client.get(next_url, **self.student_headers)
+        self.assertEqual([p['name'] for p in response.data], ["Carol 2"], "Testing: Second page should only hold matches.")
+        # Postcondition assertion
+        self.assertEqual(Professor.objects.count(), 5, "Postcondition: No professors should be changed.")
+
+    def test_list_professors_invalid_cursor(self):
+        """
+        Test that a tampered cursor is rejected.
+        """
+        # Precondition assertion
+        self.assertEqual(Professor.objects.count(), 2, "Precondition: 2 professors exist.")
+        # Testing assertion
+        response = self.client.get('/api/professors/?cursor=not-a-cursor', **self.student_headers)
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND, "Testing: Should return 404 Not Found.")
+        encode = KeysetPagination().encode_cursor
+        for path in ('/api/professors/', '/api/professors/top/', f'/api/professors/{self.prof1.id}/reviews/'):
+            for position in ([None, 1], [1, None], [{"a": 1}, 1], ["x", 2 ** 70], [1, "x"], [1], "x"):
+                response = self.client.get(f'{path}?cursor={encode(position, False)}', **self.student_headers)
+                self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND, f"Testing: {path} rejects {position!r}.")
+                self.assertEqual(response.json(), {'detail': 'Invalid cursor'}, "Testing: The cursor error is reported.")
+        # Postcondition assertion
+        self.assertEqual(Professor.objects.count(), 2, "Postcondition: No professors should be changed.")
+
+    def _seed_reviewed_professors(self, count):
+        for i in range(count):
+            prof = Professor.objects.create(name=f"Dana {i}", department="PHYS", email=f"dana{i}@umass.edu", office="PHYS1")
+            Review.objects.create(professor=prof, author="Student1", rating=4, comment="Fine", creator_id=1)
+            Review.objects.create(professor=prof, author="Student2", rating=2, comment="Hard", creator_id=5)
+
+    def test_list_professors_summary(self):
+        """
+        Test that the list returns review counts without embedded reviews.
+        """
+        # Precondition assertion
+        review = {"author": "Student1", "rating": 4, "comment": "Good"}
+        self.client.post(f'/api/professors/{self.prof1.id}/review/', review, format='json', **self.student_headers)
+        self.assertEqual(Review.objects.count(), 1, "Precondition: 1 review exists.")
+        # Testing assertion
+        response = self.client.get('/api/professors/', **self.student_headers)
+        self.assertEqual(response.status_code, status.HTTP_200_OK, "Testing: Should return 200 OK.")
+        alice = response.data[0]
+        self.assertNotIn('reviews', alice, "Testing: Summary should not embed reviews.")
+        self.assertEqual(alice['review_count'], 1, "Testing: Summary should count reviews.")
+        self.assertEqual(alice['rating'], 4.0, "Testing: Summary should return the stored rating.")
+        # Postcondition assertion
+        self.assertEqual(Review.objects.count(), 1, "Postcondition: No reviews should be changed.")
+
+    def test_list_professors_include_reviews(self):
+        """
+        Test that ?include=reviews embeds each professor's reviews.
+        """
+        # Precondition assertion
+        Review.objects.create(professor=self.prof1, author="Student1", rating=4, comment="Good", creator_id=1)
+        self.assertEqual(Review.objects.count(), 1, "Precondition: 1 review exists.")
+        # Testing assertion
+        response = self.client.get('/api/professors/?include=reviews', **self.student_headers)
+        self.assertEqual(response.status_code, status.HTTP_200_OK, "Testing: Should return 200 OK.")
+        self.assertEqual(len(response.data[0]['reviews']), 1, "Testing: Alice should have 1 embedded review.")
+        self.assertEqual(response.data[1]['reviews'], [], "Testing: Bob should have no embedded reviews.")
+        # Postcondition assertion
+        self.assertEqual(Review.objects.count(), 1, "Postcondition: No reviews should be changed.")
+
+    def test_list_professors_constant_queries(self):
+        """
+        Test that listing issues the same number of queries whatever the row count.
+        """
+        for include in ('', 'reviews'):
+            url = f'/api/professors/?include={include}&limit=200'
+            # Precondition assertion
+            self._seed_reviewed_professors(3)
+            cache.clear()
+            with CaptureQueriesContext(connection) as small:
+                self.client.get(url, **self.student_headers)
+            self._seed_reviewed_professors(30)
+            self.assertGreater(Professor.objects.count(), 30, "Precondition: More than 30 professors exist.")
+            # Testing assertion
+            cache.clear()
+            with CaptureQueriesContext(connection) as large:
+                response = self.client.get(url, **self.student_headers)
+            self.assertEqual(response.status_code, status.HTTP_200_OK, "Testing: Should return 200 OK.")
+            self.assertEqual(len(large), len(small), f"Testing: include={include!r} should not issue per-row queries.")
+            # Postcondition assertion
+            self.assertLessEqual(len(large), 2, "Postcondition: At most one list and one prefetch query.")
+            Professor.objects.exclude(pk__in=[self.prof1.pk, self.prof2.pk]).delete()
+
+    def test_search_prefix_and_diacritics(self):
+        """
+        Test that search prefix-matches words and folds case and accents.
+        """
+        # Precondition assertion
+        Professor.objects.create(name="Álvaro Núñez", department="CS", email="alvaro@umass.edu", office="CS102")
+        self.assertTrue(search.is_available(), "Precondition: The search index should be installed.")
+        # Testing assertion
+        response = self.client.get('/api/professors/?query=nunez', **self.student_headers)
+        self.assertEqual([p['name'] for p in response.data], ["Álvaro Núñez"], "Testing: Accents should be folded.")
+        response = self.client.get('/api/professors/?query=alv%20cs', **self.student_headers)
+        self.assertEqual([p['name'] for p in response.data], ["Álvaro Núñez"], "Testing: Every word should be prefix matched.")
+        # Postcondition assertion
+        self.assertEqual(Professor.objects.count(), 3, "Postcondition: No professors should be changed.")
+
+    def test_search_ranks_name_matches_first(self):
+        """
+        Test that a name match ranks above a department match and paginates by rank.
+        """
+        # Precondition assertion
+        Professor.objects.create(name="Eve Biology", department="CS", email="eve@umass.edu", office="CS103")
+        self.assertEqual(Professor.objects.count(), 3, "Precondition: 3 professors exist.")
+        # Testing assertion
+        response = self.client.get('/api/professors/?query=bio&limit=1', **self.student_headers)
+        self.assertEqual([p['name'] for p in response.data], ["Eve Biology"], "Testing: The name match should rank first.")
+        next_url = response['Link'].split(';')[0].strip('<>')
+        response = self.client.get(next_url, **self.student_headers)
+        self.assertEqual([p['name'] for p in response.data], ["Bob Jones"], "Testing: The department match should follow.")
+        # Postcondition assertion
+        self.assertEqual(Professor.objects.count(), 3, "Postcondition: No professors should be changed.")
+
+    def test_search_rejects_foreign_and_tampered_cursors(self):
+        """
+        Test that a list cursor or a tampered rank cursor on a search is rejected with 404.
+        """
+        # Precondition assertion
+        self.assertTrue(search.is_available(), "Precondition: Searches are ranked by the index.")
+        response = self.client.get('/api/professors/?limit=1', **self.student_headers)
+        list_cursor = response['Link'].split('cursor=')[1].split('>')[0]
+        # Testing assertion
+        encode = KeysetPagination().encode_cursor
+        cursors = [list_cursor] + [encode(position, False) for position in (["Bob", 2], [None, 1], [{"a": 1}, 1], [-1.5, "x"])]
+        for cursor in cursors:
+            response = self.client.get(f'/api/professors/?query=bio&cursor={cursor}', **self.student_headers)
+            self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND, f"Testing: Cursor {cursor} should return 404.")
+            self.assertEqual(response.json(), {'detail': 'Invalid cursor'}, "Testing: The cursor error is reported.")
+        # Postcondition assertion
+        response = self.client.get(f'/api/professors/?query=bio&cursor={encode([-1.5, 0], False)}', **self.student_headers)
+        self.assertEqual(response.status_code, status.HTTP_200_OK, "Postcondition: A well-formed rank cursor still works.")
+
+    def test_search_index_follows_writes(self):
+        """
+        Test that renames and deletes are reflected in the search index.
+        """
+        # Precondition assertion
+        self.assertEqual(ProfessorSearchIndex.objects.count(), 2, "Precondition: 2 professors are indexed.")
+        # Testing assertion
+        Professor.objects.filter(pk=self.prof1.pk).update(name="Alicia Wong")
+        self.prof2.delete()
+        response = self.client.get('/api/professors/?query=wong', **self.student_headers)
+        self.assertEqual([p['name'] for p in response.data], ["Alicia Wong"], "Testing: The new name should be indexed.")
+        response = self.client.get('/api/professors/?query=smith', **self.student_headers)
+        self.assertEqual(response.data, [], "Testing: The old name should be gone.")
+        response = self.client.get('/api/professors/?query=bob', **self.student_headers)
+        self.assertEqual(response.data, [], "Testing: Deleted professors should be gone.")
+        # Postcondition assertion
+        self.assertEqual(ProfessorSearchIndex.objects.count(), 1, "Postcondition: 1 professor is indexed.")
+
+    def test_search_falls_back_without_index(self):
+        """
+        Test the substring fallback when the index is unavailable.
+        """
+        # Precondition assertion
+        self.assertEqual(Professor.objects.count(), 2, "Precondition: 2 professors exist.")
+        # Testing assertion
+        with patch('base.search.is_available', return_value=False):
+            response = self.client.get('/api/professors/?query=mith', **self.student_headers)
+        self.assertEqual([p['name'] for p in response.data], ["Alice Smith"], "Testing: Should match a substring.")
+        # Postcondition assertion
+        self.assertEqual(Professor.objects.count(), 2, "Postcondition: No professors should be changed.")
+
+    def test_rebuild_search_index_command(self):
+        """
+        Test that the rebuild command restores a cleared index.
+        """
+        # Precondition assertion
+        with connection.cursor() as cursor:
+            cursor.execute("INSERT INTO base_professor_search(base_professor_search) VALUES ('delete-all')")
+        response = self.client.get('/api/professors/?query=alice', **self.student_headers)
+        self.assertEqual(response.data, [], "Precondition: The index is empty.")
+        # Testing assertion
+        call_command('rebuild_search_index', stdout=StringIO())
+        cache.clear()
+        response = self.client.get('/api/professors/?query=alice', **self.student_headers)
+        self.assertEqual([p['name'] for p in response.data], ["Alice Smith"], "Testing: The index should be rebuilt.")
+        # Postcondition assertion
+        self.assertEqual(Professor.objects.count(), 2, "Postcondition: No professors should be changed.")
+
+    def test_review_search_ranks_filters_and_highlights(self):
+        """
+        Test that review search ranks by bm25, filters by professor and department and highlights hits.
+        """
+        # Precondition assertion
+        fair = Review.objects.create(professor=self.prof1, author="A", rating=4, comment="The exams were curved & fair.")
+        curved = Review.objects.create(professor=self.prof2, author="B", rating=5, comment="Curved exams, curved quizzes, curved everything.")
+        Review.objects.create(professor=self.prof1, author="C", rating=3, comment="Office hours were great, hours long.")
+        self.assertTrue(review_search.is_available(), "Precondition: The review search index should be installed.")
+        # Testing assertion
+        response = self.client.get('/api/reviews/search/?query=curving%20exam', **self.student_headers)
+        self.assertEqual([r['id'] for r in response.data], [curved.id, fair.id], "Testing: Stemmed matches should be ranked by bm25.")
+        self.assertEqual(response.data[1]['snippet'], "The <mark>exams</mark> were <mark>curved</mark> &amp; fair.", "Testing: Hits should be marked and the rest escaped.")
+        self.assertEqual((response.data[0]['professor_name'], response.data[0]['department']), ("Bob Jones", "BIO"), "Testing: Results should name their professor.")
+        response = self.client.get(f'/api/reviews/search/?query=curved&professor={self.prof1.id}', **self.student_headers)
+        self.assertEqual([r['id'] for r in response.data], [fair.id], "Testing: Should filter by professor.")
+        response = self.client.get('/api/reviews/search/?query=curved&department=BIO', **self.student_headers)
+        self.assertEqual([r['id'] for r in response.data], [curved.id], "Testing: Should filter by department.")
+        with patch('base.review_search.RANK_WINDOW', 1):
+            response = self.client.get('/api/reviews/search/?query=curved&limit=5', **self.student_headers)
+        self.assertEqual([r['id'] for r in response.data], [curved.id], "Testing: Only the newest matches beyond the window should be ranked.")
+        response = self.client.get('/api/reviews/search/?query=%22hours%20were%22', **self.student_headers)
+        self.assertEqual(len(response.data), 1, "Testing: Quoted words should match as a phrase.")
+        response = self.client.get('/api/reviews/search/?query=%22great%20office%22', **self.student_headers)
+        self.assertEqual(response.data, [], "Testing: Words out of phrase order should not match.")
+        response = self.client.get('/api/reviews/search/?query=%20!', **self.student_headers)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST, "Testing: A query without words should be rejected.")
+        response = self.client.get('/api/reviews/search/?query=curved&professor=x', **self.student_headers)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST, "Testing: A non-integer professor should be rejected.")
+        with patch('base.review_search.is_available', return_value=False):
+            response = self.client.get('/api/reviews/search/?query=fair', **self.student_headers)
+        self.assertEqual(response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE, "Testing: Without the index there is no LIKE fallback.")
+        # Postcondition assertion
+        self.assertEqual(Review.objects.count(), 3, "Postcondition: No reviews should be changed.")
+
+    def test_review_search_rejects_tampered_cursors(self):
+        """
+        Test that review search answers tampered rank cursors with 404 and still follows its own.
+        """
+        # Precondition assertion
+        for author in ("A", "B"):
+            Review.objects.create(professor=self.prof1, author=author, rating=4, comment="Curved exams.")
+        response = self.client.get('/api/reviews/search/?query=curved&limit=1', **self.student_headers)
+        next_url = response['Link'].split(';')[0].strip('<>')
+        self.assertEqual(len(response.data), 1, "Precondition: The first page holds one result.")
+        # Testing assertion
+        encode = KeysetPagination().encode_cursor
+        for position in ([None, 1], ["x", 1], [{"a": 1}, 1], [-1.0, None], [-1.0, 2 ** 70]):
+            response = self.client.get(f'/api/reviews/search/?query=curved&cursor={encode(position, False)}', **self.student_headers)
+            self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND, f"Testing: Cursor {position!r} should return 404.")
+            self.assertEqual(response.json(), {'detail': 'Invalid cursor'}, "Testing: The cursor error is reported.")
+        # Postcondition assertion
+        response = self.client.get(next_url, **self.student_headers)
+        self.assertEqual(len(response.data), 1, "Postcondition: The real next cursor still pages.")
+
+    def test_review_search_index_follows_writes(self):
+        """
+        Test that review writes and professor department changes and soft deletes reach the search results.
+        """
+        # Precondition assertion
+        response = self.client.get('/api/reviews/search/?query=lenient', **self.student_headers)
+        self.assertEqual(response.data, [], "Precondition: Nothing matches yet.")
+        # Testing assertion
+        self.client.post(f'/api/professors/{self.prof1.id}/review/', {"author": "S", "rating": 4, "comment": "Lenient grader"}, format='json', **self.student_headers)
+        response = self.client.get('/api/reviews/search/?query=lenient', **self.student_headers)
+        self.assertEqual(len(response.data), 1, "Testing: A new review should be indexed.")
+        self.client.post(f'/api/professors/{self.prof1.id}/review/', {"author": "S", "rating": 4, "comment": "Harsh grader"}, format='json', **self.student_headers)
+        response = self.client.get('/api/reviews/search/?query=lenient', **self.student_headers)
+        self.assertEqual(response.data, [], "Testing: The old comment should be gone after an update.")
+        response = self.client.get('/api/reviews/search/?query=harsh', **self.student_headers)
+        self.assertEqual(len(response.data), 1, "Testing: The new comment should be indexed.")
+        Professor.objects.filter(pk=self.prof1.pk).update(department="MATH")
+        response = self.client.get('/api/reviews/search/?query=harsh&department=MATH', **self.student_headers)
+        self.assertEqual(len(response.data), 1, "Testing: A department change should be indexed.")
+        response = self.client.get('/api/reviews/search/?query=harsh&department=CS', **self.student_headers)
+        self.assertEqual(response.data, [], "Testing: The old department should be gone.")
+        with patch('base.purge.schedule'):
+            self.client.delete(f'/api/professors/{self.prof1.id}/delete/', **self.staff_headers)
+        response = self.client.get('/api/reviews/search/?query=harsh', **self.student_headers)
+        self.assertEqual(response.data, [], "Testing: Reviews of deleted professors should be hidden.")
+        Review.objects.filter(professor=self.prof1).delete()
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT rowid FROM base_review_search WHERE base_review_search MATCH 'harsh'")
+            self.assertEqual(cursor.fetchall(), [], "Testing: A deleted review should leave the index.")
+        # Postcondition assertion
+        self.assertEqual(Review.objects.count(), 0, "Postcondition: No reviews should remain.")
+
+    def test_rebuild_review_search_index_command(self):
+        """
+        Test that the rebuild command restores a cleared review search index.
+        """
+        # Precondition assertion
+        Review.objects.create(professor=self.prof1, author="A", rating=4, comment="Curved exams")
+        with connection.cursor() as cursor:
+            cursor.execute("DELETE FROM base_review_search")
+        response = self.client.get('/api/reviews/search/?query=curved', **self.student_headers)
+        self.assertEqual(response.data, [], "Precondition: The index is empty.")
+        # Testing assertion
+        call_command('rebuild_review_search_index', stdout=StringIO())
+        cache.clear()
+        response = self.client.get('/api/reviews/search/?query=curved', **self.student_headers)
+        self.assertEqual(len(response.data), 1, "Testing: The index should be rebuilt.")
+        # Postcondition assertion
+        self.assertEqual(Review.objects.count(), 1, "Postcondition: No reviews should be changed.")
+
+    def _post_review(self, prof, headers, rating):
+        data = {"author": "Student", "rating": rating, "comment": "Review"}
+        return self.client.post(f'/api/professors/{prof.id}/review/', data, format='json', **headers)
+
+    def test_rating_counters_follow_review_writes(self):
+        """
+        Test that create, update and delete apply only their delta to the counters.
+        """
+        # Precondition assertion
+        self.assertEqual(self.prof1.review_count, 0, "Precondition: No reviews counted.")
+        # Testing assertion
+        self._post_review(self.prof1, self.student_headers, 5)
+        self._post_review(self.prof1, self.staff_headers, 2)
+        self.prof1.refresh_from_db()
+        self.assertEqual((self.prof1.review_count, self.prof1.rating_sum, self.prof1.rating), (2, 7, 3.5), "Testing: Two reviews should be counted.")
+        self._post_review(self.prof1, self.student_headers, 3)
+        self.prof1.refresh_from_db()
+        self.assertEqual((self.prof1.review_count, self.prof1.rating_sum, self.prof1.rating), (2, 5, 2.5), "Testing: An update should only shift the sum.")
+        review = Review.objects.get(professor=self.prof1, creator_id=2)
+        response = self.client.delete(f'/api/professors/{self.prof1.id}/review/{review.id}/delete/', **self.staff_headers)
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT, "Testing: Should return 204 No Content.")
+        self.prof1.refresh_from_db()
+        self.assertEqual((self.prof1.review_count, self.prof1.rating_sum, self.prof1.rating), (1, 3, 3.0), "Testing: A delete should subtract the review.")
+        # Postcondition assertion
+        self.assertEqual(ratings.recompute([self.prof1.id], dry_run=True), [], "Postcondition: Counters should match the reviews.")
+
+    def test_reconcile_ratings_command(self):
+        """
+        Test that reconcile_ratings repairs drifted counters.
+        """
+        # Precondition assertion
+        Review.objects.create(professor=self.prof2, author="Student1", rating=4, comment="Good", creator_id=1)
+        Review.objects.create(professor=self.prof2, author="Student2", rating=1, comment="Bad", creator_id=5)
+        drifted = {p.id for p in ratings.recompute(dry_run=True)}
+        self.assertEqual(drifted, {self.prof1.id, self.prof2.id}, "Precondition: Both professors have drifted.")
+        # Testing assertion
+        out = StringIO()
+        call_command('reconcile_ratings', stdout=out)
+        self.assertIn("2 drifted professor(s) repaired", out.getvalue(), "Testing: Should report the repairs.")
+        self.prof1.refresh_from_db()
+        self.prof2.refresh_from_db()
+        self.assertEqual((self.prof1.review_count, self.prof1.rating), (0, 0.0), "Testing: Alice has no reviews.")
+        self.assertEqual((self.prof2.review_count, self.prof2.rating_sum, self.prof2.rating), (2, 5, 2.5), "Testing: Bob's counters are rebuilt.")
+        # Postcondition assertion
+        self.assertEqual(ratings.recompute(dry_run=True), [], "Postcondition: Nothing left to repair.")
+
+    def test_reconcile_ratings_invalidates_cached_reads(self):
+        """
+        Test that repairing drift bumps the versions, so old ETags and cached bodies are not served.
+        """
+        # Precondition assertion
+        Review.objects.create(professor=self.prof2, author="Student1", rating=5, comment="Great", creator_id=1)
+        response = self.client.get(f'/api/professors/{self.prof2.id}/', **self.student_headers)
+        etag = response['ETag']
+        self.assertEqual(response.data['rating'], 3.8, "Precondition: The drifted rating is cached.")
+        # Testing assertion
+        call_command('reconcile_ratings', '--dry-run', stdout=StringIO(), stderr=StringIO())
+        response = self.client.get(f'/api/professors/{self.prof2.id}/', HTTP_IF_NONE_MATCH=etag, **self.student_headers)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED, "Testing: A dry run changes nothing.")
+        err = StringIO()
+        call_command('reconcile_ratings', stdout=StringIO(), stderr=err)
+        self.assertIn("local to this process", err.getvalue(), "Testing: The locmem cache is warned about.")
+        response = self.client.get(f'/api/professors/{self.prof2.id}/', HTTP_IF_NONE_MATCH=etag, **self.student_headers)
+        self.assertEqual(response.status_code, status.HTTP_200_OK, "Testing: The old ETag no longer matches.")
+        self.assertEqual(response.data['rating'], 5.0, "Testing: The repaired rating is served.")
+        # Postcondition assertion
+        response = self.client.get(f'/api/professors/{self.prof2.id}/', **self.student_headers)
+        self.assertNotEqual(response['ETag'], etag, "Postcondition: A fresh GET gets the new ETag.")
+
+    def test_get_professor_not_modified(self):
+        """
+        Test that a matching If-None-Match gets 304 without any query.
+        """
+        # Precondition assertion
+        response = self.client.get(f'/api/professors/{self.prof1.id}/', **self.student_headers)
+        etag = response['ETag']
+        self.assertTrue(etag.startswith('"'), "Precondition: A strong ETag is returned.")
+        # Testing assertion
+        with self.assertNumQueries(0):
+            response = self.client.get(f'/api/professors/{self.prof1.id}/', HTTP_IF_NONE_MATCH=etag, **self.student_headers)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED, "Testing: Should return 304 Not Modified.")
+        self.assertEqual(response['ETag'], etag, "Testing: The ETag should be repeated.")
+        # Postcondition assertion
+        with self.assertNumQueries(0):
+            response = self.client.get(f'/api/professors/{self.prof1.id}/', **self.student_headers)
+        self.assertEqual(response.data['name'], 'Alice Smith', "Postcondition: The cached body is served.")
+
+    def test_review_write_changes_etags(self):
+        """
+        Test that a review write invalidates the professor and list ETags.
+        """
+        # Precondition assertion
+        detail = self.client.get(f'/api/professors/{self.prof1.id}/', **self.student_headers)
+        listing = self.client.get('/api/professors/', **self.student_headers)
+        other = self.client.get(f'/api/professors/{self.prof2.id}/', **self.student_headers)
+        self.assertEqual(detail.data['reviews'], [], "Precondition: Alice has no reviews.")
+        # Testing assertion
+        self._post_review(self.prof1, self.student_headers, 5)
+        response = self.client.get(f'/api/professors/{self.prof1.id}/', HTTP_IF_NONE_MATCH=detail['ETag'], **self.student_headers)
+        self.assertEqual(response.status_code, status.HTTP_200_OK, "Testing: The detail should be re-rendered.")
+        self.assertEqual(len(response.data['reviews']), 1, "Testing: The new review should be included.")
+        response = self.client.get('/api/professors/', HTTP_IF_NONE_MATCH=listing['ETag'], **self.student_headers)
+        self.assertEqual(response.status_code, status.HTTP_200_OK, "Testing: The list should be re-rendered.")
+        self.assertEqual(response.data[0]['review_count'], 1, "Testing: The list should show the new count.")
+        # Postcondition assertion
+        response = self.client.get(f'/api/professors/{self.prof2.id}/', HTTP_IF_NONE_MATCH=other['ETag'], **self.student_headers)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED, "Postcondition: Other professors are still fresh.")
+
+    def test_list_etag_depends_on_query(self):
+        """
+        Test that different list queries get different ETags and cached pages keep their links.
+        """
+        # Precondition assertion
+        first = self.client.get('/api/professors/?limit=1', **self.student_headers)
+        self.assertIn('rel="next"', first['Link'], "Precondition: The first page links to the next.")
+        # Testing assertion
+        second = self.client.get('/api/professors/?query=bob', **self.student_headers)
+        self.assertNotEqual(first['ETag'], second['ETag'], "Testing: ETags should differ per query.")
+        with self.assertNumQueries(0):
+            cached = self.client.get('/api/professors/?limit=1', **self.student_headers)
+        self.assertEqual(cached['Link'], first['Link'], "Testing: Cached pages should keep their Link header.")
+        # Postcondition assertion
+        self.assertEqual(cached.data, first.data, "Postcondition: The cached body is unchanged.")
+
+    def test_bulk_create_professors_json(self):
+        """
+        Test importing a JSON array, keeping valid rows and reporting invalid ones.
+        """
+        # Precondition assertion
+        self.assertEqual(Professor.objects.count(), 2, "Precondition: 2 professors exist.")
+        rows = [
+            {"name": "Carol Lee", "department": "MATH", "email": "carol@umass.edu", "office": "MATH101"},
+            {"name": "Dan Wu", "department": "CS", "email": "not-an-email", "office": "CS104"},
+            {"name": "Erin Fox", "department": "BIO", "email": "erin@umass.edu", "office": "BIO202"},
+        ]
+        # Testing assertion
+        with self.assertNumQueries(3):
+            response = self.client.post('/api/professors/bulk/', rows, format='json', **self.staff_headers)
+        self.assertEqual(response.status_code, status.HTTP_200_OK, "Testing: Should return 200 OK.")
+        self.assertEqual(response.data['created'], 2, "Testing: Two valid rows should be created.")
+        self.assertEqual([e['row'] for e in response.data['errors']], [1], "Testing: Row 1 should be reported.")
+        self.assertIn('email', response.data['errors'][0]['errors'], "Testing: The email error should be reported.")
+        # Postcondition assertion
+        self.assertEqual(Professor.objects.filter(creator_id=2).count(), 4, "Postcondition: Imported rows belong to the staff user.")
+
+    def test_bulk_create_professors_csv_upsert(self):
+        """
+        Test that a CSV upload in upsert mode updates by email and is idempotent.
+        """
+        # Precondition assertion
+        self.assertEqual(Professor.objects.count(), 2, "Precondition: 2 professors exist.")
+        content = "name,department,email,office\nAlice Smith,CS,alice@umass.edu,LGRC200\nCarol Lee,MATH,carol@umass.edu,MATH101\n"
+        # Testing assertion
+        for expected in ({'created': 1, 'updated': 1, 'unchanged': 0}, {'created': 0, 'updated': 0, 'unchanged': 2}):
+            upload = SimpleUploadedFile('faculty.csv', content.encode(), content_type='text/csv')
+            response = self.client.post('/api/professors/bulk/?mode=upsert', {'file': upload}, format='multipart', **self.staff_headers)
+            self.assertEqual(response.status_code, status.HTTP_200_OK, "Testing: Should return 200 OK.")
+            self.assertEqual({k: response.data[k] for k in expected}, expected, "Testing: Should create or update by email.")
+        self.prof1.refresh_from_db()
+        self.assertEqual(self.prof1.office, "LGRC200", "Testing: Alice's office should be updated.")
+        # Postcondition assertion
+        self.assertEqual(Professor.objects.count(), 3, "Postcondition: Re-importing should not duplicate professors.")
+
+    def test_bulk_create_professors_ignores_rating(self):
+        """
+        Test that an imported rating cannot override the rating derived from reviews.
+        """
+        # Precondition assertion
+        self._post_review(self.prof1, self.student_headers, 2)
+        self.prof1.refresh_from_db()
+        self.assertEqual(self.prof1.rating, 2.0, "Precondition: Alice's rating comes from one review.")
+        rows = [
+            {"name": "Alice Smith", "department": "CS", "email": "alice@umass.edu", "office": "CS101", "rating": 5},
+            {"name": "Carol Lee", "department": "MATH", "email": "carol@umass.edu", "office": "MATH101", "rating": 4.5},
+        ]
+        # Testing assertion
+        response = self.client.post('/api/professors/bulk/?mode=upsert', rows, format='json', **self.staff_headers)
+        self.assertEqual((response.data['created'], response.data['unchanged']), (1, 1), "Testing: The rating is not an update.")
+        self.prof1.refresh_from_db()
+        self.assertEqual(self.prof1.rating, 2.0, "Testing: Alice keeps her derived rating.")
+        self.assertEqual(Professor.objects.get(email="carol@umass.edu").rating, 0.0, "Testing: Carol starts without a rating.")
+        # Postcondition assertion
+        imported = Professor.objects.filter(email__in=["alice@umass.edu", "carol@umass.edu"]).values_list('id', flat=True)
+        self.assertEqual(ratings.recompute(imported, dry_run=True), [], "Postcondition: No imported professor has drifted.")
+
+    def test_bulk_create_professors_staff_only(self):
+        """
+        Test that students cannot bulk import.
+        """
+        # Precondition assertion
+        self.assertEqual(Professor.objects.count(), 2, "Precondition: 2 professors exist.")
+        # Testing assertion
+        response = self.client.post('/api/professors/bulk/', [], format='json', **self.student_headers)
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN, "Testing: Should return 403 Forbidden.")
+        # Postcondition assertion
+        self.assertEqual(Professor.objects.count(), 2, "Postcondition: No professors should be changed.")
+
+    def _write_export(self, name, content):
+        path = os.path.join(self.tmpdir, name)
+        with open(path, 'w', encoding='utf-8') as export:
+            export.write(content)
+        return path
+
+    def test_import_reviews_command(self):
+        """
+        Test streaming an NDJSON export in batches with one rating recompute at the end.
+        """
+        # Precondition assertion
+        self.tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmpdir)
+        lines = [
+            {"professor": self.prof1.id, "author": "A", "rating": 5, "comment": "x", "creator_id": 11, "created_at": "2021-09-01T10:00:00Z"},
+            {"professor_email": "bob@umass.edu", "author": "B", "rating": 2, "comment": "y"},
+            {"professor": 999999, "author": "C", "rating": 4, "comment": "z"},
+            {"professor": self.prof1.id, "author": "D", "rating": 3, "comment": "w"},
+        ]
+        path = self._write_export('reviews.ndjson', "\n".join(json.dumps(line) for line in lines) + "\nnot json\n")
+        self.assertEqual(Review.objects.count(), 0, "Precondition: No reviews exist.")
+        etags = [self.client.get(f'/api/professors/{prof.id}/', **self.student_headers)['ETag'] for prof in (self.prof1, self.prof2)]
+        # Testing assertion
+        out, err = StringIO(), StringIO()
+        with patch('django.core.cache.cache.set_many', wraps=cache.set_many) as set_many:
+            call_command('import_reviews', path, '--batch-size', '2', stdout=out, stderr=err)
+        self.assertEqual(set_many.call_count, 1, "Testing: Versions are bumped in one round-trip.")
+        self.assertEqual(Review.objects.count(), 3, "Testing: Three valid records should be imported.")
+        self.assertIn("committed through offset 4", out.getvalue(), "Testing: Progress should report committed offsets.")
+        self.assertIn("record 2: skipped", err.getvalue(), "Testing: The unknown professor should be reported.")
+        self.assertIn("record 4: skipped", err.getvalue(), "Testing: The malformed line should be reported.")
+        historical = Review.objects.get(creator_id=11)
+        self.assertEqual(historical.created_at.year, 2021, "Testing: Exported timestamps should be kept.")
+        # Postcondition assertion
+        self.prof1.refresh_from_db()
+        self.prof2.refresh_from_db()
+        self.assertEqual((self.prof1.review_count, self.prof1.rating), (2, 4.0), "Postcondition: Alice's rating is recomputed.")
+        self.assertEqual((self.prof2.review_count, self.prof2.rating), (1, 2.0), "Postcondition: Bob's rating is recomputed.")
+        for prof, etag in zip((self.prof1, self.prof2), etags):
+            response = self.client.get(f'/api/professors/{prof.id}/', HTTP_IF_NONE_MATCH=etag, **self.student_headers)
+            self.assertEqual(response.status_code, status.HTTP_200_OK, "Postcondition: Old ETags no longer match.")
+
+    def test_import_reviews_resume_from_offset(self):
+        """
+        Test that --offset skips records an interrupted run already committed.
+        """
+        # Precondition assertion
+        self.tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmpdir)
+        path = self._write_export('reviews.csv', "professor_email,author,rating,comment\nalice@umass.edu,A,5,x\nalice@umass.edu,B,1,y\n")
+        Review.objects.create(professor=self.prof1, author="A", rating=5, comment="x")
+        self.assertEqual(Review.objects.count(), 1, "Precondition: The first record was committed earlier.")
+        # Testing assertion
+        call_command('import_reviews', path, '--offset', '1', stdout=StringIO())
+        self.assertEqual(list(Review.objects.order_by('id').values_list('author', flat=True)), ["A", "B"], "Testing: Only the second record is imported.")
+        # Postcondition assertion
+        self.prof1.refresh_from_db()
+        self.assertEqual((self.prof1.review_count, self.prof1.rating_sum), (2, 6), "Postcondition: Both runs are counted.")
+
+    def test_import_reviews_replaces_conflicting_reviews(self):
+        """
+        Test that importing a user's review of a professor again replaces it.
+        """
+        # Precondition assertion
+        self.tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmpdir)
+        Review.objects.create(professor=self.prof1, author="Old", rating=1, comment="x", creator_id=7)
+        path = self._write_export('reviews.csv', (
+            "professor_email,author,rating,comment,creator_id\n"
+            "alice@umass.edu,First,2,y,7\nalice@umass.edu,Last,5,z,7\nalice@umass.edu,Anon,3,w,\n"
+        ))
+        self.assertEqual(Review.objects.count(), 1, "Precondition: User 7 already reviewed Alice.")
+        # Testing assertion
+        call_command('import_reviews', path, stdout=StringIO())
+        self.assertEqual(Review.objects.filter(creator_id=7).get().author, "Last", "Testing: The last record should win.")
+        # Postcondition assertion
+        self.prof1.refresh_from_db()
+        self.assertEqual((self.prof1.review_count, self.prof1.rating_sum), (2, 8), "Postcondition: Counters match the table.")
+
+    def test_delete_user_reviews(self):
+        """
+        Test that moderation removes a user's reviews with one DELETE and recomputes only the affected professors.
+        """
+        old = datetime.datetime(2025, 1, 1, tzinfo=datetime.timezone.utc)
+        Review.objects.bulk_create([
+            Review(professor=self.prof1, author="Spam", rating=1, comment="Spam", creator_id=9),
+            Review(professor=self.prof2, author="Spam", rating=1, comment="Spam", creator_id=9),
+            Review(professor=self.prof1, author="Real", rating=5, comment="Great", creator_id=10),
+        ])
+        Review.objects.filter(professor=self.prof2, creator_id=9).update(created_at=old)
+        ratings.recompute()
+        detail_url = f'/api/professors/{self.prof1.id}/'
+        # Precondition assertion
+        self.assertEqual(self.client.get(detail_url, **self.student_headers).data['rating'], 3.0, "Precondition: Spam drags Alice down.")
+        url = '/api/reviews/by-user/9/delete/'
+        self.assertEqual(self.client.delete(url, **self.student_headers).status_code, 403, "Precondition: Students cannot moderate.")
+        self.assertEqual(self.client.delete(f'{url}?since=soon', **self.staff_headers).status_code, 400, "Precondition: Bad dates are rejected.")
+        # Testing assertion
+        response = self.client.delete(f'{url}?until=2025-06-01', **self.staff_headers)
+        self.assertEqual(response.data, {'deleted': 1, 'professors': 1}, "Testing: Only the old review is in range.")
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.delete(url, **self.admin_headers)
+        self.assertEqual(response.data, {'deleted': 1, 'professors': 1}, "Testing: The rest of the user's reviews go.")
+        deletes = [q['sql'] for q in queries.captured_queries if q['sql'].startswith('DELETE')]
+        self.assertEqual(len(deletes), 1, "Testing: One set-based DELETE.")
+        # Postcondition assertion
+        self.assertFalse(Review.objects.filter(creator_id=9).exists(), "Postcondition: No spam is left.")
+        self.prof1.refresh_from_db()
+        self.prof2.refresh_from_db()
+        self.assertEqual((self.prof1.review_count, self.prof1.rating_sum, self.prof1.rating), (1, 5, 5.0), "Postcondition: Alice is recomputed.")
+        self.assertEqual((self.prof2.review_count, self.prof2.rating), (0, 0.0), "Postcondition: Bob is recomputed.")
+        self.assertEqual(self.client.get(detail_url, **self.student_headers).data['rating'], 5.0, "Postcondition: The cached detail is fresh.")
+
+    def _neighbour_lists(self):
+        from base.models import ProfessorNeighbour
+        return sorted(
+            (n.professor_id, n.neighbour_id, round(n.similarity, 9), n.co_raters) for n in ProfessorNeighbour.objects.all()
+        )
+
+    def test_similar_professors(self):
+        """
+        Test that the similarity build finds co-rated professors, refreshes incrementally and is served with one query.
+        """
+        from base.models import SimilarityChange
+        carol = Professor.objects.create(name="Carol Lee", department="MATH", email="carol@umass.edu", office="LGRT")
+        Review.objects.bulk_create(
+            Review(professor=prof, author="S", rating=rating, comment="Review", creator_id=student)
+            for student in range(10, 14)
+            for prof, rating in ((self.prof1, 5), (self.prof2, 5), (carol, 1))
+        )
+        dan = Professor.objects.create(name="Dan Wu", department="CS", email="dan@umass.edu", office="CS202")
+        Review.objects.bulk_create(
+            Review(professor=dan, author="S", rating=5, comment="Review", creator_id=student) for student in range(11, 14)
+        )
+        url = f'/api/professors/{self.prof1.id}/similar/'
+        # Precondition assertion
+        self.assertEqual(SimilarityChange.objects.count(), 15, "Precondition: Every review write is logged.")
+        self.assertEqual(self.client.get(url, **self.student_headers).data, [], "Precondition: Nothing is built yet.")
+        # Testing assertion
+        out = StringIO()
+        call_command('build_similarity', stdout=out)
+        self.assertIn("Refreshed 4 professor(s), 6 neighbour(s)", out.getvalue(), "Testing: Alice, Bob and Dan list each other.")
+        self.assertFalse(SimilarityChange.objects.exists(), "Testing: The change log is consumed.")
+        with self.assertNumQueries(1):
+            response = self.client.get(url, **self.student_headers)
+        self.assertEqual([(p['name'], p['co_raters']) for p in response.data], [("Bob Jones", 4), ("Dan Wu", 3)],
+                         "Testing: Bob and Dan are similar and Carol, rated the opposite way, is not.")
+        self.assertAlmostEqual(response.data[0]['similarity'], 0.4, msg="Testing: Identical tastes damped for 4 of 10 co-raters.")
+        self.assertEqual(self.client.get('/api/professors/999/similar/', **self.student_headers).status_code, 404,
+                         "Testing: Unknown professors are a 404.")
+        Review.objects.bulk_create(
+            Review(professor=prof, author="S", rating=rating, comment="Review", creator_id=student)
+            for student in range(20, 30)
+            for prof, rating in ((self.prof2, 5), (carol, 5), (self.prof1, 1))
+        )
+        Review.objects.filter(creator_id=10, professor=carol).update(rating=4)
+        out = StringIO()
+        call_command('build_similarity', stdout=out)
+        self.assertIn("Refreshed 4 professor(s)", out.getvalue(), "Testing: The touched three are recomputed and Dan's list is patched.")
+        incremental = self._neighbour_lists()
+        call_command('build_similarity', '--full', stdout=StringIO())
+        # Postcondition assertion
+        self.assertEqual(incremental, self._neighbour_lists(), "Postcondition: The incremental refresh matches a full build.")
+        self.assertIn((self.prof2.id, carol.id), [row[:2] for row in incremental], "Postcondition: Bob and Carol are now alike.")
+        self.assertNotIn((self.prof1.id, self.prof2.id), [row[:2] for row in incremental], "Postcondition: Alice and Bob no longer are.")
+        self.client.delete(f'/api/professors/{self.prof2.id}/delete/', **self.staff_headers)
+        response = self.client.get(f'/api/professors/{carol.id}/similar/', **self.student_headers)
+        self.assertNotIn("Bob Jones", [p['name'] for p in response.data], "Postcondition: Deleted professors are not suggested.")
+
+    def test_departments_follow_professor_and_review_writes(self):
+        """
+        Test that the department totals track professor and review writes.
+        """
+        # Precondition assertion
+        response = self.client.get('/api/departments/', **self.student_headers)
+        self.assertEqual(response.data, [
+            {'department': 'BIO', 'professor_count': 1, 'review_count': 0, 'rating': 0.0},
+            {'department': 'CS', 'professor_count': 1, 'review_count': 0, 'rating': 0.0},
+        ], "Precondition: Each department has one professor and no reviews.")
+        # Testing assertion
+        self._post_review(self.prof1, self.student_headers, 5)
+        self._post_review(self.prof1, self.staff_headers, 4)
+        self._post_review(self.prof2, self.student_headers, 1)
+        self.client.post('/api/professors/bulk/?mode=upsert', [
+            {'name': 'Bob Jones', 'department': 'CS', 'email': 'bob@umass.edu', 'office': 'BIO201'},
+            {'name': 'Carol White', 'department': 'MATH', 'email': 'carol@umass.edu', 'office': 'LGRT'},
+        ], format='json', **self.staff_headers)
+        response = self.client.get('/api/departments/', **self.student_headers)
+        self.assertEqual(response.data, [
+            {'department': 'CS', 'professor_count': 2, 'review_count': 3, 'rating': 3.3},
+            {'department': 'MATH', 'professor_count': 1, 'review_count': 0, 'rating': 0.0},
+        ], "Testing: Reviews are counted and Bob moved to CS with his review.")
+        # Postcondition assertion
+        self.client.delete(f'/api/professors/{self.prof1.id}/delete/', **self.staff_headers)
+        response = self.client.get('/api/departments/', **self.student_headers)
+        self.assertEqual(response.data[0], {'department': 'CS', 'professor_count': 1, 'review_count': 1, 'rating': 1.0},
+                         "Postcondition: Deleting Alice removes her and her reviews.")
+
+    def test_departments_constant_queries_and_rebuild(self):
+        """
+        Test that the directory is one query at any size and that the rebuild command repairs drift.
+        """
+        from base.models import DepartmentStats
+        Professor.objects.bulk_create(
+            Professor(name=f'P{i}', department=f'D{i % 5}', email=f'p{i}@umass.edu', office='X') for i in range(200)
+        )
+        # Precondition assertion
+        with self.assertNumQueries(1):
+            response = self.client.get('/api/departments/', **self.student_headers)
+        self.assertEqual(sum(row['professor_count'] for row in response.data), 202, "Precondition: Every professor is counted once.")
+        # Testing assertion
+        DepartmentStats.objects.update(professor_count=0, review_count=7)
+        self.assertEqual(DepartmentStats.objects.filter(professor_count__gt=0).count(), 0, "Testing: The totals are corrupted.")
+        call_command('rebuild_department_stats', stdout=StringIO())
+        # Postcondition assertion
+        response = self.client.get('/api/departments/', **self.student_headers)
+        self.assertEqual(sum(row['professor_count'] for row in response.data), 202, "Postcondition: The totals are rebuilt.")
+        self.assertEqual(sum(row['review_count'] for row in response.data), 0, "Postcondition: Review counts are rebuilt.")
+
+    def test_leaderboard_bayesian_ranking(self):
+        """
+        Test that many good reviews outrank one perfect review, per department and across pages.
+        """
+        carol = Professor.objects.create(name="Carol White", department="CS", email="carol@umass.edu", office="CS102")
+        Review.objects.bulk_create(
+            [Review(professor=self.prof1, author="S", rating=5 if i < 16 else 4, comment="x", creator_id=100 + i) for i in range(20)]
+            + [Review(professor=carol, author="S", rating=5, comment="x", creator_id=1)]
+        )
+        ratings.recompute()
+        # Precondition assertion
+        carol.refresh_from_db()
+        self.assertEqual(carol.rating, 5.0, "Precondition: Carol has a perfect raw rating.")
+        # Testing assertion
+        response = self.client.get('/api/professors/top/?department=CS', **self.student_headers)
+        self.assertEqual(response.status_code, status.HTTP_200_OK, "Testing: Should return 200 OK.")
+        self.assertEqual([row['name'] for row in response.data], ["Alice Smith", "Carol White"], "Testing: 20 reviews at 4.8 beat one 5.")
+        self.assertAlmostEqual(response.data[0]['score'], (10 * 3.5 + 96) / 30, msg="Testing: The score is smoothed toward the prior.")
+        # Postcondition assertion
+        names = []
+        url = '/api/professors/top/?limit=1'
+        while url:
+            response = self.client.get(url, **self.student_headers)
+            names += [row['name'] for row in response.data]
+            links = dict(
+                (part.split(';')[1].strip(), part.split(';')[0].strip(' <>')) for part in response['Link'].split(',')
+            )
+            url = links.get('rel="next"')
+        self.assertEqual(names, ["Alice Smith", "Carol White", "Bob Jones"], "Postcondition: Keyset pages cover every professor once.")
+
+    def test_leaderboard_score_maintenance_and_index(self):
+        """
+        Test that review writes keep the score current, reconcile rescores after a prior change, and pages use the index.
+        """
+        # Precondition assertion
+        self.assertEqual(self.prof1.score, 3.5, "Precondition: Without reviews the score is the prior mean.")
+        # Testing assertion
+        self._post_review(self.prof1, self.student_headers, 5)
+        self.prof1.refresh_from_db()
+        self.assertAlmostEqual(self.prof1.score, (10 * 3.5 + 5) / 11, msg="Testing: A review write updates the score.")
+        with override_settings(RATING_PRIOR_MEAN=3.0):
+            out = StringIO()
+            call_command('reconcile_ratings', stdout=out)
+            self.assertIn("2 drifted professor(s) repaired", out.getvalue(), "Testing: Changing the prior rescores everyone.")
+        self.prof1.refresh_from_db()
+        self.assertAlmostEqual(self.prof1.score, (10 * 3.0 + 5) / 11, msg="Testing: The score uses the new prior.")
+        # Postcondition assertion
+        plan = str(Professor.objects.filter(department='CS').order_by('-score', 'id')[:10].explain())
+        self.assertIn('professor_dept_score_idx', plan, "Postcondition: Department pages use the score index.")
+        self.assertNotIn('TEMP B-TREE', plan, "Postcondition: No sort over the table.")
+
+    def _review_pages(self, url):
+        ids = []
+        while url:
+            response = self.client.get(url, **self.student_headers)
+            self.assertEqual(response.status_code, status.HTTP_200_OK, f"{url} should return 200 OK.")
+            ids += [row['id'] for row in response.data]
+            links = dict(
+                (part.split(';')[1].strip(), part.split(';')[0].strip(' <>')) for part in response['Link'].split(',') if part
+            )
+            url = links.get('rel="next"')
+        return ids
+
+    def test_professor_reviews_keyset_sorts(self):
+        """
+        Test paging a professor's reviews newest first and by rating, with sub-millisecond timestamp ties.
+        """
+        base = datetime.datetime(2024, 1, 1, 10, 0, 0, 123456, tzinfo=datetime.timezone.utc)
+        offsets = [0, 300, 300, 2_000_000, 5, 300, 0]
+        reviews = Review.objects.bulk_create(
+            [Review(professor=self.prof1, author="S", rating=i % 3 + 2, comment="x", creator_id=100 + i) for i in range(7)]
+        )
+        for review, offset in zip(reviews, offsets):
+            review.created_at = base + datetime.timedelta(microseconds=offset)
+        Review.objects.bulk_update(reviews, ['created_at'])
+        Review.objects.create(professor=self.prof2, author="S", rating=1, comment="other", creator_id=1)
+        # Precondition assertion
+        self.assertEqual(self.prof1.reviews.count(), 7, "Precondition: Alice has 7 reviews.")
+        # Testing assertion
+        newest = [r.id for r in sorted(reviews, key=lambda r: (r.created_at, r.id), reverse=True)]
+        highest = [r.id for r in sorted(reviews, key=lambda r: (r.rating, r.created_at, r.id), reverse=True)]
+        self.assertEqual(self._review_pages(f'/api/professors/{self.prof1.id}/reviews/?limit=2'), newest, "Testing: Newest first across pages.")
+        self.assertEqual(self._review_pages(f'/api/professors/{self.prof1.id}/reviews/?sort=highest&limit=3'), highest, "Testing: Highest rating first across pages.")
+        self.assertEqual(self._review_pages(f'/api/professors/{self.prof1.id}/reviews/?sort=lowest&limit=2'), highest[::-1], "Testing: Lowest rating first across pages.")
+        # Postcondition assertion
+        response = self.client.get(f'/api/professors/{self.prof1.id}/reviews/?sort=oldest', **self.student_headers)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST, "Postcondition: An unknown sort is rejected.")
+        response = self.client.get('/api/professors/999999/reviews/', **self.student_headers)
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND, "Postcondition: An unknown professor is 404.")
+
+    def test_professor_detail_recent_reviews(self):
+        """
+        Test that the detail view embeds only the newest reviews and review pages seek on the index.
+        """
+        Review.objects.bulk_create(
+            [Review(professor=self.prof1, author="S", rating=i % 5 + 1, comment="x", creator_id=100 + i) for i in range(12)]
+        )
+        ratings.recompute()
+        # Precondition assertion
+        self.assertEqual(Review.objects.filter(professor=self.prof1).count(), 12, "Precondition: Alice has 12 reviews.")
+        # Testing assertion
+        newest = list(Review.objects.filter(professor=self.prof1).order_by('-created_at', '-id').values_list('id', flat=True))
+        response = self.client.get(f'/api/professors/{self.prof1.id}/', **self.student_headers)
+        self.assertEqual([row['id'] for row in response.data['reviews']], newest[:10], "Testing: The 10 newest reviews are embedded.")
+        self.assertEqual(response.data['review_count'], 12, "Testing: review_count is the total.")
+        limited = self.client.get(f'/api/professors/{self.prof1.id}/?reviews=3', **self.student_headers)
+        self.assertEqual([row['id'] for row in limited.data['reviews']], newest[:3], "Testing: ?reviews= sets how many.")
+        self.assertNotEqual(limited['ETag'], response['ETag'], "Testing: The ETag varies with the query string.")
+        # Postcondition assertion
+        last = Review.objects.get(pk=newest[4])
+        page = Review.objects.filter(professor=self.prof1).filter(
+            KeysetPagination._seek(('-created_at', '-id'), [last.created_at, last.id])
+        ).order_by('-created_at', '-id')[:20]
+        plan = str(page.explain())
+        self.assertIn('review_professor_created_idx', plan, "Postcondition: Review pages use the (professor, created_at) index.")
+        self.assertNotIn('TEMP B-TREE', plan, "Postcondition: No sort over the reviews.")
+
+    def test_professors_batch(self):
+        """
+        Test fetching several professors keyed by id with null for unknown ids, in two queries.
+        """
+        Review.objects.bulk_create(
+            [Review(professor=self.prof1, author="S", rating=4, comment="x", creator_id=100 + i) for i in range(12)]
+            + [Review(professor=self.prof2, author="S", rating=2, comment="y", creator_id=1)]
+        )
+        ratings.recompute()
+        # Precondition assertion
+        self.assertEqual(Review.objects.count(), 13, "Precondition: 13 reviews exist.")
+        # Testing assertion
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(f'/api/professors/batch/?ids={self.prof2.id},999999,{self.prof1.id},{self.prof2.id}', **self.student_headers)
+        self.assertEqual(response.status_code, status.HTTP_200_OK, "Testing: Should return 200 OK.")
+        self.assertEqual(len(queries), 2, "Testing: One pk__in query and one review prefetch.")
+        self.assertEqual(list(response.data), [str(self.prof2.id), '999999', str(self.prof1.id)], "Testing: Keyed by id in request order, once each.")
+        self.assertIsNone(response.data['999999'], "Testing: Unknown ids are null.")
+        self.assertEqual(len(response.data[str(self.prof1.id)]['reviews']), 10, "Testing: Like the detail view, only recent reviews are embedded.")
+        cache.clear()
+        detail = self.client.get(f'/api/professors/{self.prof1.id}/', **self.student_headers)
+        self.assertEqual(response.data[str(self.prof1.id)], detail.data, "Testing: Entries match the detail body.")
+        # Postcondition assertion
+        for ids in ('', 'a,b', '99999999999999999999999', f'{self.prof1.id},{2 ** 63}', '0', '-1', ','.join(str(i) for i in range(1, 52))):
+            response = self.client.get(f'/api/professors/batch/?ids={ids}', **self.student_headers)
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST, f"Postcondition: ids={ids[:10]} is rejected.")
+
+    def test_professors_batch_shares_detail_cache(self):
+        """
+        Test that batch reads reuse and fill the per-professor cache and follow review writes.
+        """
+        # Precondition assertion
+        self.client.get(f'/api/professors/{self.prof1.id}/', **self.student_headers)
+        url = f'/api/professors/batch/?ids={self.prof1.id},{self.prof2.id}'
+        # Testing assertion
+        with CaptureQueriesContext(connection) as queries:
+            first = self.client.get(url, **self.student_headers)
+        self.assertEqual(len(queries), 2, "Testing: Only the uncached professor is loaded.")
+        self.assertIn(f'IN ({self.prof2.id})', queries[0]['sql'], "Testing: The query asks for Bob only.")
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(f'/api/professors/{self.prof2.id}/', **self.student_headers)
+            again = self.client.get(url, **self.student_headers)
+        self.assertEqual(len(queries), 0, "Testing: Batch-loaded bodies serve detail and batch reads.")
+        self.assertEqual(again.data, first.data, "Testing: The cached batch body is unchanged.")
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=first['ETag'], **self.student_headers)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED, "Testing: A matching ETag gets 304.")
+        # Postcondition assertion
+        self._post_review(self.prof2, self.student_headers, 1)
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=first['ETag'], **self.student_headers)
+        self.assertEqual(response.status_code, status.HTTP_200_OK, "Postcondition: A review write changes the batch ETag.")
+        self.assertEqual(response.data[str(self.prof2.id)]['review_count'], 1, "Postcondition: The new review is visible.")
+
+    def test_fast_read_path_matches_serializers(self):
+        """
+        Test that the values()-based list, detail and leaderboard bodies are byte-identical to the DRF serializers'.
+        """
+        Professor.objects.create(name="José Núñez", department="CS", email="jose@umass.edu", office="CS\u2028103")
+        Review.objects.bulk_create(
+            [Review(professor=self.prof1, author="Zoë", rating=i % 5 + 1, comment=f"Great \u2029 lectures {i} ✓", creator_id=100 + i) for i in range(12)]
+            + [Review(professor=self.prof2, author="S", rating=2, comment="y", creator_id=None)]
+        )
+        ratings.recompute()
+        professors = Professor.objects.order_by('name', 'id')
+        # Precondition assertion
+        self.assertEqual(professors.count(), 3, "Precondition: 3 professors exist.")
+        # Testing assertion
+        render = JSONRenderer().render
+        response = self.client.get('/api/professors/', **self.student_headers)
+        self.assertEqual(response.content, render(ProfessorSummarySerializer(professors, many=True).data), "Testing: Summaries match.")
+        response = self.client.get('/api/professors/?include=reviews', **self.student_headers)
+        expected = render(ProfessorSerializer(professors.prefetch_related('reviews'), many=True).data)
+        self.assertEqual(response.content, expected, "Testing: Professors with reviews match.")
+        response = self.client.get('/api/professors/top/', **self.student_headers)
+        expected = render(LeaderboardSerializer(Professor.objects.order_by('-score', 'id'), many=True).data)
+        self.assertEqual(response.content, expected, "Testing: The leaderboard matches.")
+        response = self.client.get(f'/api/professors/{self.prof1.id}/', **self.student_headers)
+        self.prof1.refresh_from_db()
+        expected = ProfessorSerializer(self.prof1).data
+        expected['reviews'] = ReviewSerializer(self.prof1.reviews.order_by('-created_at', '-id')[:10], many=True).data
+        self.assertEqual(response.content, render(expected), "Testing: The detail body matches.")
+        self.assertEqual(response['Content-Type'], 'application/json', "Testing: The content type is unchanged.")
+        cached = self.client.get(f'/api/professors/{self.prof1.id}/', **self.student_headers)
+        self.assertEqual(cached.content, response.content, "Testing: Cached bodies render the same bytes.")
+        # Postcondition assertion
+        response = self.client.get('/api/professors/', HTTP_ACCEPT='application/json; indent=2', **self.student_headers)
+        self.assertEqual(
+            response.content, JSONRenderer().render(json.loads(response.content), 'application/json; indent=2'),
+            "Postcondition: Other media types still go through DRF's renderer.",
+        )
+        self.assertIn(b'\n  ', response.content, "Postcondition: Indented output is honoured.")
+
+    def _stream_lines(self, response):
+        return [json.loads(line) for line in b''.join(response.streaming_content).decode().splitlines()]
+
+    def test_export_professors_resumable(self):
+        """
+        Test streaming professors as NDJSON and resuming after an id.
+        """
+        # Precondition assertion
+        self.assertEqual(Professor.objects.count(), 2, "Precondition: 2 professors exist.")
+        # Testing assertion
+        response = self.client.get('/api/export/professors/', **self.staff_headers)
+        self.assertEqual(response.status_code, status.HTTP_200_OK, "Testing: Should return 200 OK.")
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson', "Testing: Should stream NDJSON.")
+        rows = self._stream_lines(response)
+        self.assertEqual([row['name'] for row in rows], ["Alice Smith", "Bob Jones"], "Testing: Rows should be in id order.")
+        response = self.client.get(f'/api/export/professors/?after={rows[0]["id"]}', **self.staff_headers)
+        self.assertEqual([row['name'] for row in self._stream_lines(response)], ["Bob Jones"], "Testing: Should resume after the id.")
+        # Postcondition assertion
+        response = self.client.get('/api/export/professors/', **self.student_headers)
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN, "Postcondition: Students cannot export.")
+
+    def test_export_reviews_since_gzip(self):
+        """
+        Test the review export with a created_at filter and gzip.
+        """
+        # Precondition assertion
+        old = Review.objects.create(professor=self.prof1, author="A", rating=4, comment="old", creator_id=1)
+        Review.objects.filter(pk=old.pk).update(created_at=datetime.datetime(2020, 1, 1, tzinfo=datetime.timezone.utc))
+        Review.objects.create(professor=self.prof1, author="B", rating=5, comment="new", creator_id=5)
+        self.assertEqual(Review.objects.count(), 2, "Precondition: 2 reviews exist.")
+        # Testing assertion
+        response = self.client.get('/api/export/reviews/?since=2024-01-01&gzip=1', **self.staff_headers)
+        self.assertEqual(response['Content-Encoding'], 'gzip', "Testing: The stream should be gzipped.")
+        lines = gzip.decompress(b''.join(response.streaming_content)).decode().splitlines()
+        self.assertEqual([json.loads(line)['comment'] for line in lines], ["new"], "Testing: Only recent reviews should be exported.")
+        # Postcondition assertion
+        response = self.client.get('/api/export/reviews/?since=yesterday', **self.staff_headers)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST, "Postcondition: An invalid since is rejected.")
+
+    def test_export_ndjson_command(self):
+        """
+        Test the export command writing gzipped NDJSON to a file.
+        """
+        # Precondition assertion
+        self.tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmpdir)
+        path = os.path.join(self.tmpdir, 'professors.ndjson.gz')
+        self.assertFalse(os.path.exists(path), "Precondition: No export file exists.")
+        # Testing assertion
+        call_command('export_ndjson', 'professors', '--gzip', '-o', path)
+        with gzip.open(path, 'rt') as export:
+            rows = [json.loads(line) for line in export]
+        self.assertEqual([row['email'] for row in rows], ["alice@umass.edu", "bob@umass.edu"], "Testing: Every professor should be exported.")
+        # Postcondition assertion
+        self.assertEqual(Professor.objects.count(), 2, "Postcondition: No professors should be changed.")
+
+    def test_async_read_endpoints_match_sync(self):
+        """
+        Test that the async list and detail views return the sync views' bodies and headers.
+        """
+        # Precondition assertion
+        self._post_review(self.prof1, self.student_headers, 4)
+        self.assertEqual(Review.objects.count(), 1, "Precondition: 1 review exists.")
+        # Testing assertion
+        for path in ('professors/?limit=1', 'professors/?query=alice&include=reviews', f'professors/{self.prof1.id}/'):
+            sync_response = self.client.get(f'/api/{path}', **self.student_headers)
+            cache.delete(BODY_KEY.format(etag=sync_response['ETag']))
+            async_response = self.client.get(f'/api/async/{path}', **self.student_headers)
+            self.assertEqual(async_response.status_code, status.HTTP_200_OK, f"Testing: {path} should return 200 OK.")
+            self.assertEqual(async_response.content, sync_response.content, f"Testing: {path} bodies should match.")
+            self.assertEqual(async_response['ETag'], sync_response['ETag'], f"Testing: {path} ETags should match.")
+            self.assertEqual(
+                async_response.get('Link', '').replace('/async', ''), sync_response.get('Link', ''),
+                f"Testing: {path} links should match.",
+            )
+        # Postcondition assertion
+        response = self.client.get('/api/async/professors/999999/', **self.student_headers)
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND, "Postcondition: Unknown professors are 404.")
+
+    def test_async_read_endpoints_report_api_errors_like_sync(self):
+        """
+        Test that an invalid cursor gets the same JSON 404 from the async list as from the sync one.
+        """
+        # Precondition assertion
+        sync_response = self.client.get('/api/professors/?cursor=zzz', **self.student_headers)
+        self.assertEqual(sync_response.status_code, status.HTTP_404_NOT_FOUND, "Precondition: The sync list rejects the cursor.")
+        # Testing assertion
+        cursor = KeysetPagination().encode_cursor([None, 1], False)
+        for query in ('cursor=zzz', f'cursor={cursor}', f'query=smith&cursor={cursor}'):
+            response = self.client.get(f'/api/async/professors/?{query}', **self.student_headers)
+            self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND, f"Testing: {query} should return 404.")
+            self.assertEqual(response.content, sync_response.content, f"Testing: {query} body matches the sync view.")
+        # Postcondition assertion
+        self.assertEqual(response['Content-Type'], 'application/json', "Postcondition: The error is rendered as JSON.")
+
+    def test_async_read_endpoints_require_authentication(self):
+        """
+        Test that the async views reject requests without credentials.
+        """
+        # Precondition assertion
+        self.assertEqual(Professor.objects.count(), 2, "Precondition: 2 professors exist.")
+        # Testing assertion
+        with patch.object(ExternalJWTAuthentication, 'authenticate', REAL_AUTHENTICATE):
+            response = self.client.get('/api/async/professors/')
+            self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN, "Testing: Should return 403 Forbidden.")
+            response = self.client.get('/api/async/professors/', HTTP_AUTHORIZATION='Bearer not-a-token')
+            self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN, "Testing: Invalid tokens should return 403 like the sync views.")
+        # Postcondition assertion
+        self.assertEqual(response.json(), {'detail': 'Invalid or expired token'}, "Postcondition: The error is reported.")
+
+    async def test_async_detail_not_modified(self):
+        """
+        Test conditional GET on the async detail view through the async client.
+        """
+        # Precondition assertion
+        client = AsyncClient()
+        url = f'/api/async/professors/{self.prof1.id}/'
+        response = await client.get(url, headers={'Authorization': 'bearer student'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK, "Precondition: Should return 200 OK.")
+        # Testing assertion
+        response = await client.get(url, headers={'Authorization': 'bearer student', 'If-None-Match': response['ETag']})
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED, "Testing: Should return 304 Not Modified.")
+        # Postcondition assertion
+        self.assertEqual(response.content, b'', "Postcondition: A 304 has no body.")
+
+
+    @override_settings(PROFESSORS_THROTTLE_RATES={'STUDENT': {'read': '100/min', 'search': '2/min', 'write': '2/min'}})
+    def test_throttling_budgets_per_scope(self):
+        """
+        Test separate read, search and write buckets per user, with 429, Retry-After and rate-limit headers.
+        """
+        # Precondition assertion
+        response = self.client.get('/api/professors/', **self.student_headers)
+        self.assertEqual(response['RateLimit-Limit'], '100', "Precondition: Reads report their budget.")
+        self.assertEqual(response['RateLimit-Remaining'], '99', "Precondition: One read token was spent.")
+        # Testing assertion
+        self.assertEqual(self._post_review(self.prof1, self.student_headers, 4).status_code, status.HTTP_201_CREATED, "Testing: First write allowed.")
+        self.assertEqual(self._post_review(self.prof2, self.student_headers, 4).status_code, status.HTTP_201_CREATED, "Testing: Second write allowed.")
+        response = self._post_review(self.prof1, self.student_headers, 5)
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS, "Testing: The third write is throttled.")
+        self.assertEqual(response['Retry-After'], '30', "Testing: One token refills in 30 seconds.")
+        self.assertEqual(response['RateLimit-Remaining'], '0', "Testing: The write bucket is empty.")
+        self.assertEqual(Review.objects.get(professor=self.prof1, creator_id=1).rating, 4, "Testing: The throttled write did nothing.")
+        for expected in (status.HTTP_200_OK, status.HTTP_200_OK, status.HTTP_429_TOO_MANY_REQUESTS):
+            response = self.client.get('/api/professors/?query=smith', **self.student_headers)
+            self.assertEqual(response.status_code, expected, f"Testing: Searches have their own budget ({expected}).")
+        # Postcondition assertion
+        response = self.client.get('/api/professors/', **self.student_headers)
+        self.assertEqual(response.status_code, status.HTTP_200_OK, "Postcondition: Plain reads still pass.")
+        self.assertEqual(response['RateLimit-Remaining'], '96', "Postcondition: The rejected search was refunded its read token.")
+        self.assertEqual(self._post_review(self.prof1, {'HTTP_AUTHORIZATION': 'bearer other'}, 3).status_code, status.HTTP_201_CREATED, "Postcondition: Other users have their own buckets.")
+        self.assertEqual(self._post_review(self.prof1, self.staff_headers, 3).status_code, status.HTTP_201_CREATED, "Postcondition: Roles without a rate are not throttled.")
+
+    @override_settings(PROFESSORS_THROTTLE_RATES={'STUDENT': {'read': '2/min'}})
+    async def test_throttling_refills_and_covers_async_views(self):
+        """
+        Test that an empty bucket refills over time and that the async views share the buckets.
+        """
+        client = AsyncClient()
+        headers = {'Authorization': 'bearer student'}
+        url = f'/api/async/professors/{self.prof1.id}/'
+        with patch('api.throttling.time') as clock:
+            clock.time.return_value = 1000.0
+            # Precondition assertion
+            self.assertEqual((await client.get(url, headers=headers)).status_code, status.HTTP_200_OK, "Precondition: First read allowed.")
+            await sync_to_async(self.client.get)(f'/api/professors/{self.prof1.id}/', **self.student_headers)
+            # Testing assertion
+            response = await client.get(url, headers=headers)
+            self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS, "Testing: Sync and async reads share a bucket.")
+            self.assertEqual(response['Retry-After'], '30', "Testing: Retry-After is reported by the async view.")
+            clock.time.return_value = 1030.0
+            response = await client.get(url, headers=headers)
+            self.assertEqual(response.status_code, status.HTTP_200_OK, "Testing: A token refilled after 30 seconds.")
+            # Postcondition assertion
+            self.assertEqual(response['RateLimit-Remaining'], '0', "Postcondition: The refilled token was spent.")
+            self.assertEqual(response['RateLimit-Reset'], '60', "Postcondition: The bucket is full again in a minute.")
+
+    @override_settings(PROFESSORS_THROTTLE_RATES={'STUDENT': {'read': '5/min'}})
+    async def test_async_views_throttle_without_sync_adapters(self):
+        """
+        Test that under ASGI the rate-limit middleware runs natively and the async views use the async cache API.
+        """
+        from django.core.handlers.asgi import ASGIHandler
+        # Precondition assertion
+        with self.assertLogs('django.request', 'DEBUG') as logs:
+            ASGIHandler()
+            logging.getLogger('django.request').debug("middleware loaded")
+        self.assertFalse([line for line in logs.output if 'adapted' in line], "Precondition: No middleware is adapted to sync.")
+        # Testing assertion
+        with patch('api.throttling.TokenBucketThrottle.allow_request', side_effect=AssertionError("sync throttle")):
+            response = await AsyncClient().get(f'/api/async/professors/{self.prof1.id}/', headers={'Authorization': 'bearer student'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK, "Testing: The async throttle path allows the read.")
+        # Postcondition assertion
+        self.assertEqual(response['RateLimit-Remaining'], '4', "Postcondition: The headers come from the async middleware.")
+
+    def test_api_only_settings_profile(self):
+        """
+        Test that the API-only profile strips session, CSRF and admin machinery but keeps the API routes.
+        """
+        from importlib import import_module
+        from django.urls import Resolver404, resolve
+        api_settings = import_module('professorsService.settings_api')
+        # Precondition assertion
+        self.assertIn('django.contrib.sessions.middleware.SessionMiddleware', settings.MIDDLEWARE, "Precondition: The default profile runs sessions.")
+        # Testing assertion
+        for name in ('SessionMiddleware', 'CsrfViewMiddleware', 'AuthenticationMiddleware', 'MessageMiddleware'):
+            self.assertFalse(any(name in entry for entry in api_settings.MIDDLEWARE), f"Testing: {name} is stripped.")
+        self.assertIn('api.throttling.RateLimitHeadersMiddleware', api_settings.MIDDLEWARE, "Testing: API middleware is kept.")
+        self.assertNotIn('django.contrib.admin', api_settings.INSTALLED_APPS, "Testing: The admin app is not loaded.")
+        self.assertEqual(resolve('/api/professors/', urlconf=api_settings.ROOT_URLCONF).url_name, 'getProfessors', "Testing: The API routes resolve.")
+        # Postcondition assertion
+        with self.assertRaises(Resolver404, msg="Postcondition: The admin is only served by the default profile."):
+            resolve('/admin/', urlconf=api_settings.ROOT_URLCONF)
+
+    def test_production_database_profile(self):
+        """
+        Test that the production SQLite profile applies its pragmas on connect.
+        """
+        from django.db.backends.sqlite3.base import DatabaseWrapper
+        self.tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmpdir)
+        # Precondition assertion
+        self.assertEqual(settings.SQLITE_PRODUCTION['OPTIONS']['transaction_mode'], 'IMMEDIATE', "Precondition: Writes lock up front.")
+        # Testing assertion
+        wrapper = DatabaseWrapper({
+            **connection.settings_dict,
+            **settings.SQLITE_PRODUCTION,
+            'NAME': os.path.join(self.tmpdir, 'profile.sqlite3'),
+        }, alias='profile')
+        self.addCleanup(wrapper.close)
+        with wrapper.cursor() as cursor:
+            pragmas = {}
+            for name in ('journal_mode', 'synchronous', 'busy_timeout', 'cache_size'):
+                cursor.execute(f'PRAGMA {name}')
+                pragmas[name] = cursor.fetchone()[0]
+        self.assertEqual(pragmas['journal_mode'], 'wal', "Testing: WAL should be enabled.")
+        self.assertEqual(pragmas['synchronous'], 1, "Testing: synchronous should be NORMAL.")
+        self.assertEqual(pragmas['busy_timeout'], 20000, "Testing: Writers should wait 20 s for the lock.")
+        # Postcondition assertion
+        self.assertEqual(pragmas['cache_size'], -65536, "Postcondition: The page cache should be 64 MiB.")
+
+    @override_settings(MIDDLEWARE=['professorsService.profiling.ProfilingMiddleware', *settings.MIDDLEWARE])
+    def test_profiling_server_timing(self):
+        """
+        Test that the profiling middleware reports SQL, auth and serialization time.
+        """
+        token = jwt.encode({'user_id': 1, 'role': 'STUDENT', 'exp': int(time.time()) + 60}, settings.SECRET_KEY, algorithm='HS256')
+        # Precondition assertion
+        response = self.client.get('/api/professors/', **self.student_headers)
+        self.assertIn('Server-Timing', response, "Precondition: The header should be set.")
+        # Testing assertion
+        cache.clear()
+        with patch.object(ExternalJWTAuthentication, 'authenticate', REAL_AUTHENTICATE):
+            response = self.client.get('/api/professors/?include=reviews', HTTP_AUTHORIZATION=f'Bearer {token}')
+        metrics = {metric.split(';')[0]: metric for metric in response['Server-Timing'].split(', ')}
+        self.assertEqual(set(metrics), {'db', 'auth', 'serialize', 'total'}, "Testing: Every phase should be reported.")
+        self.assertIn('desc="2 queries"', metrics['db'], "Testing: The page and its reviews take 2 queries.")
+        # Postcondition assertion
+        response = self.client.get('/api/professors/?include=reviews', **self.student_headers)
+        self.assertIn('desc="0 queries"', response['Server-Timing'], "Postcondition: Cached responses run no SQL.")
+
+    @override_settings(
+        MIDDLEWARE=['professorsService.profiling.ProfilingMiddleware', *settings.MIDDLEWARE],
+        PROFILING_SLOW_REQUEST_MS=0,
+        PROFILING_N_PLUS_ONE_THRESHOLD=3,
+    )
+    def test_profiling_logs_slow_requests_and_n_plus_one(self):
+        """
+        Test the structured slow-request and N+1 log entries.
+        """
+        # Precondition assertion
+        self.assertEqual(Professor.objects.count(), 2, "Precondition: 2 professors exist.")
+        # Testing assertion
+        with self.assertLogs('professorsService.profiling', 'WARNING') as logs:
+            self.client.post(f'/api/professors/{self.prof1.id}/review/', {'author': 'A', 'rating': 5, 'comment': 'Good'}, format='json', **self.student_headers)
+        entries = [json.loads(line.split(':', 2)[2]) for line in logs.output]
+        slow = [entry for entry in entries if entry['event'] == 'slow_request']
+        self.assertEqual(len(slow), 1, "Testing: The request should be logged as slow.")
+        self.assertEqual(slow[0]['status'], 201, "Testing: The entry should carry the status.")
+        self.assertGreater(slow[0]['queries'], 0, "Testing: The entry should count queries.")
+        # Postcondition assertion
+        n_plus_one = [entry for entry in entries if entry['event'] == 'n_plus_one']
+        self.assertEqual(n_plus_one, [], "Postcondition: A review write repeats no query shape.")
+
+    def test_assert_no_n_plus_one(self):
+        """
+        Test the N+1 assertion helper on a prefetched and a per-row lookup.
+        """
+        from professorsService.profiling import assert_no_n_plus_one
+        for i in range(3):
+            Review.objects.create(professor=self.prof1 if i % 2 else self.prof2, author='A', rating=4, comment='Ok', creator_id=i)
+        # Precondition assertion
+        with assert_no_n_plus_one(threshold=2) as profile:
+            for professor in Professor.objects.prefetch_related('reviews'):
+                list(professor.reviews.all())
+        self.assertEqual(profile.queries, 2, "Precondition: Prefetching takes 2 queries.")
+        # Testing assertion
+        with self.assertRaisesMessage(AssertionError, 'Possible N+1 queries'):
+            with assert_no_n_plus_one(threshold=2):
+                for professor in Professor.objects.all():
+                    list(professor.reviews.all())
+        # Postcondition assertion
+        with assert_no_n_plus_one(threshold=2):
+            response = self.client.get('/api/professors/?include=reviews', **self.student_headers)
+        self.assertEqual(response.status_code, status.HTTP_200_OK, "Postcondition: The list endpoint has no N+1.")
+
+class ExternalJWTAuthenticationTestCase(TestCase):
+    """
+    Unit tests for ExternalJWTAuthentication and its verified-token cache.
+    """
 
+    def setUp(self):
+        self.factory = APIRequestFactory()
+        self.auth = ExternalJWTAuthentication()
+        token_cache.clear()
+
+    def tearDown(self):
+        token_cache.clear()
+
+    def make_token(self, user_id=1, role='STUDENT', expires_in=300):
+        payload = {'user_id': user_id, 'role': role, 'exp': int(time.time()) + expires_in}
+        return jwt.encode(payload, settings.SECRET_KEY, algorithm='HS256')
+
+    def authenticate(self, token):
+        request = Request(self.factory.get('/api/professors/', HTTP_AUTHORIZATION=f'Bearer {token}'))
+        return self.auth.authenticate(request)
+
+    def test_cache_hit_skips_verification(self):
+        """
+        Test that a repeated token is served from the cache.
+        """
+        # Precondition assertion
+        token = self.make_token(user_id=7, role='STAFF')
+        self.assertEqual(ExternalJWTAuthentication.cache_info()['size'], 0, "Precondition: The cache is empty.")
+        # Testing assertion
+        user, payload = self.authenticate(token)
+        with patch.object(self.auth.token_backend, 'decode') as decode:
+            cached_user, _ = self.authenticate(token)
+        decode.assert_not_called()
+        self.assertEqual((cached_user.id, cached_user.role), (7, 'STAFF'), "Testing: The cached user should be returned.")
+        # Postcondition assertion
+        info = ExternalJWTAuthentication.cache_info()
+        self.assertEqual((info['hits'], info['misses'], info['size']), (1, 1, 1), "Postcondition: One miss then one hit.")
+
+    def test_cache_entry_expires_with_token(self):
+        """
+        Test that a cached token is re-verified (and rejected) once expired.
+        """
+        # Precondition assertion
+        token = self.make_token(expires_in=60)
+        self.authenticate(token)
+        self.assertEqual(ExternalJWTAuthentication.cache_info()['size'], 1, "Precondition: The token is cached.")
+        # Testing assertion
+        with patch('professorsService.authentication.time.time', return_value=time.time() + 120):
+            with patch.object(self.auth.token_backend, 'decode', side_effect=TokenBackendError("Token is expired")) as decode:
+                with self.assertRaises(AuthenticationFailed):
+                    self.authenticate(token)
+        decode.assert_called_once()
+        # Postcondition assertion
+        self.assertEqual(ExternalJWTAuthentication.cache_info()['size'], 0, "Postcondition: The expired entry is dropped.")
+
+    def test_cache_is_bounded(self):
+        """
+        Test that the least recently used token is evicted at capacity.
+        """
+        # Precondition assertion
+        cache = VerifiedTokenCache(maxsize=2)
+        tokens = [self.make_token(user_id=i) for i in range(3)]
+        user = ExternalJWTUser(id=1)
+        payload = {'exp': time.time() + 60}
+        # Testing assertion
+        cache.set(tokens[0], user, payload)
+        cache.set(tokens[1], user, payload)
+        cache.get(tokens[0])
+        cache.set(tokens[2], user, payload)
+        self.assertIsNone(cache.get(tokens[1]), "Testing: The least recently used token should be evicted.")
+        self.assertIsNotNone(cache.get(tokens[0]), "Testing: The recently used token should remain.")
+        # Postcondition assertion
+        self.assertEqual(cache.info()['size'], 2, "Postcondition: The cache holds at most 2 tokens.")
+
+    def test_invalid_token_is_not_cached(self):
+        """
+        Test that a token with a bad signature is rejected and never cached.
+        """
+        # Precondition assertion
+        token = jwt.encode({'user_id': 1, 'exp': int(time.time()) + 60}, 'a-different-signing-key-of-32-bytes', algorithm='HS256')
+        # Testing assertion
+        for _ in range(2):
+            with self.assertRaises(AuthenticationFailed):
+                self.authenticate(token)
+        # Postcondition assertion
+        self.assertEqual(ExternalJWTAuthentication.cache_info()['size'], 0, "Postcondition: Nothing is cached.")
@@ -0,0 +1,85 @@
+"""
+Ad-hoc benchmarks. Run from the ``professorsService`` directory, e.g.::
+
+    python -m benchmarks.bench_search
+
+Each script builds a throwaway test database, so the real ``db.sqlite3``
+is never touched. Throttling is off unless ``PROFESSORS_THROTTLING`` is set.
+Deleted professors are not purged in the background: the worker thread
+would hold its own connection to the in-memory scratch database.
+"""
+import os
+import statistics
+import time
+from contextlib import contextmanager
+
+import django
+
+
+def setup():
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'professorsService.settings')
+    # Benchmarks send every request as one user; don't let the throttles reject them
+    os.environ.setdefault('PROFESSORS_THROTTLING', '0')
+    os.environ['PROFESSORS_PURGE_IN_BACKGROUND'] = '0'
+    django.setup()
+
+
+@contextmanager
+def scratch_database():
+    from django.test.utils import setup_databases, setup_test_environment, teardown_databases, teardown_test_environment
+
+    setup_test_environment()
+    old_config = setup_databases(verbosity=0, interactive=False)
+    try:
+        yield
+    finally:
+        from base import purge
+
+        # No purge may outlive the scratch database and reach the real one
+        purge.shutdown()
+        teardown_databases(old_config, verbosity=0)
+        teardown_test_environment()
+
+
+def auth_headers(role='STUDENT', user_id=1):
+    """Test-client headers carrying a real token, so authentication is measured too."""
+    import jwt
+    from django.conf import settings
+
+    token = jwt.encode(
+        {'user_id': user_id, 'role': role, 'exp': int(time.time()) + 3600},
+        settings.SIMPLE_JWT['SIGNING_KEY'],
+        algorithm=settings.SIMPLE_JWT['ALGORITHM'],
+    )
+    return {'HTTP_AUTHORIZATION': f'Bearer {token}'}
+
+
+def measure(fn, repeat=20, warmup=2):
+    """Call ``fn`` repeatedly and return the wall-clock durations in seconds."""
+    for _ in range(warmup):
+        fn()
+    durations = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        durations.append(time.perf_counter() - start)
+    return durations
+
+
+def percentile(ordered, q):
+    """Nearest-rank percentile of an already sorted list."""
+    return ordered[min(len(ordered) - 1, max(0, round(q / 100 * len(ordered)) - 1))]
+
+
+def summarize(durations):
+    ordered = sorted(durations)
+    return {
+        'mean_ms': statistics.fmean(ordered) * 1000,
+        'p50_ms': ordered[len(ordered) // 2] * 1000,
+        'max_ms': ordered[-1] * 1000,
+    }
+
+
+def report(label, durations):
+    stats = summarize(durations)
+    print(f"{label:<40} mean {stats['mean_ms']:9.3f} ms   p50 {stats['p50_ms']:9.3f} ms   max {stats['max_ms']:9.3f} ms")
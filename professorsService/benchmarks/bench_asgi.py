@@ -0,0 +1,144 @@
+"""
+Throughput of the sync (DRF ``@api_view``) and native async read endpoints
+under uvicorn.
+
+    python -m benchmarks.bench_asgi [--professors 5000] [--concurrency 50] [--duration 10]
+
+A scratch SQLite file is migrated and seeded, then for each stack a fresh
+uvicorn worker is started (so neither run warms the other's cache) and
+loaded by keep-alive HTTP/1.1 clients. Detail requests pick a random
+professor, so most of them miss the response cache.
+"""
+import argparse
+import asyncio
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks import auth_headers, setup
+
+HOST = 'georgesweb.pythonanywhere.com'  # must be in ALLOWED_HOSTS
+
+STACKS = {
+    'sync': ('/api/professors/', '/api/professors/{pk}/'),
+    'async': ('/api/async/professors/', '/api/async/professors/{pk}/'),
+}
+
+
+def seed(professors, reviews_per_professor):
+    from django.core.management import call_command
+
+    from base import ratings
+    from base.models import Professor, Review
+    from benchmarks.data import create_professors
+
+    call_command('migrate', verbosity=0)
+    create_professors(professors)
+    rng = random.Random(0)
+    batch = []
+    for pk in Professor.objects.values_list('id', flat=True).iterator():
+        for n in range(reviews_per_professor):
+            batch.append(Review(professor_id=pk, author=f'student{n}', rating=rng.randint(1, 5), comment='ok', creator_id=n))
+        if len(batch) >= 5000:
+            Review.objects.bulk_create(batch)
+            batch = []
+    Review.objects.bulk_create(batch)
+    ratings.recompute()
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def start_server(port, env):
+    server = subprocess.Popen(
+        [sys.executable, '-m', 'uvicorn', 'professorsService.asgi:application', '--port', str(port), '--log-level', 'warning'],
+        env=env,
+    )
+    deadline = time.monotonic() + 20
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(('127.0.0.1', port), timeout=0.2).close()
+            return server
+        except OSError:
+            time.sleep(0.1)
+    server.kill()
+    raise RuntimeError("uvicorn did not start")
+
+
+async def client(port, paths, token, stop_at, latencies, errors):
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    try:
+        while time.perf_counter() < stop_at:
+            path = paths()
+            start = time.perf_counter()
+            writer.write(
+                f'GET {path} HTTP/1.1\r\nHost: {HOST}\r\nAuthorization: {token}\r\n\r\n'.encode()
+            )
+            head = await reader.readuntil(b'\r\n\r\n')
+            status = int(head.split(b' ', 2)[1])
+            length = 0
+            for line in head.split(b'\r\n'):
+                if line.lower().startswith(b'content-length:'):
+                    length = int(line.split(b':', 1)[1])
+            await reader.readexactly(length)
+            latencies.append(time.perf_counter() - start)
+            if status != 200:
+                errors.append(status)
+    finally:
+        writer.close()
+
+
+async def load(port, paths, token, concurrency, duration):
+    latencies, errors = [], []
+    stop_at = time.perf_counter() + duration
+    await asyncio.gather(*(client(port, paths, token, stop_at, latencies, errors) for _ in range(concurrency)))
+    return latencies, errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--professors', type=int, default=5000)
+    parser.add_argument('--reviews', type=int, default=5, help="Reviews per professor.")
+    parser.add_argument('--concurrency', type=int, default=50)
+    parser.add_argument('--duration', type=float, default=10.0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        env = dict(os.environ, PROFESSORS_DB_PATH=os.path.join(tmpdir, 'bench.sqlite3'))
+        os.environ.update(env)
+        setup()
+        seed(args.professors, args.reviews)
+        token = auth_headers()['HTTP_AUTHORIZATION']
+        rng = random.Random(1)
+        print(f"{args.professors} professors, {args.concurrency} connections, {args.duration:g}s per run")
+
+        for stack, (list_path, detail_path) in STACKS.items():
+            for scenario, paths in (
+                ('list', lambda: list_path),
+                ('detail', lambda: detail_path.format(pk=rng.randint(1, args.professors))),
+            ):
+                port = free_port()
+                server = start_server(port, env)
+                try:
+                    latencies, errors = asyncio.run(load(port, paths, token, args.concurrency, args.duration))
+                finally:
+                    server.terminate()
+                    server.wait()
+                latencies.sort()
+                p50 = latencies[len(latencies) // 2] * 1000
+                p99 = latencies[int(len(latencies) * 0.99)] * 1000
+                print(
+                    f"{stack:<6} {scenario:<7} {len(latencies) / args.duration:9.0f} req/s   "
+                    f"p50 {p50:8.2f} ms   p99 {p99:8.2f} ms   non-200 {len(errors)}"
+                )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,116 @@
+"""
+Concurrent review writes against the default and production SQLite profiles.
+
+    python -m benchmarks.bench_concurrency [--threads 16] [--writes 50]
+
+Every thread is a different student posting (and then updating) reviews
+through the full request stack, while reader threads list professors.
+Each profile gets its own scratch database file. The report counts
+"database is locked" failures and the sustained write throughput.
+"""
+import argparse
+import copy
+import logging
+import os
+import random
+import tempfile
+import threading
+import time
+from collections import Counter
+
+from benchmarks import auth_headers, setup
+
+
+def run_profile(name, overrides, path, args):
+    from django.core.management import call_command
+    from django.db import OperationalError, connections
+    from django.test import Client
+
+    from benchmarks.data import create_professors
+
+    connections.close_all()
+    database = connections.settings['default']
+    original = copy.deepcopy(database)
+    database.update(overrides, NAME=path)
+    try:
+        call_command('migrate', verbosity=0)
+        create_professors(args.professors)
+        connections.close_all()
+
+        outcomes = Counter()
+        lock = threading.Lock()
+        barrier = threading.Barrier(args.threads + args.readers)
+        stop_reading = threading.Event()
+
+        def writer(user_id):
+            client = Client(**auth_headers('STUDENT', user_id))
+            rng = random.Random(user_id)
+            barrier.wait()
+            for _ in range(args.writes):
+                pk = rng.randint(1, args.professors)
+                payload = {'author': f'user{user_id}', 'rating': rng.randint(1, 5), 'comment': 'stress'}
+                try:
+                    response = client.post(f'/api/professors/{pk}/review/', payload, content_type='application/json')
+                    result = response.status_code
+                except OperationalError as exc:
+                    result = 'locked' if 'locked' in str(exc) else type(exc).__name__
+                with lock:
+                    outcomes[result] += 1
+            connections.close_all()
+
+        def reader():
+            client = Client(**auth_headers('STUDENT', 0))
+            barrier.wait()
+            while not stop_reading.is_set():
+                try:
+                    client.get('/api/professors/', {'query': 'smith'})
+                except OperationalError:
+                    with lock:
+                        outcomes['read locked'] += 1
+            connections.close_all()
+
+        writers = [threading.Thread(target=writer, args=(user_id,)) for user_id in range(1, args.threads + 1)]
+        readers = [threading.Thread(target=reader) for _ in range(args.readers)]
+        for thread in writers + readers:
+            thread.start()
+        started = time.perf_counter()
+        for thread in writers:
+            thread.join()
+        elapsed = time.perf_counter() - started
+        stop_reading.set()
+        for thread in readers:
+            thread.join()
+
+        written = outcomes[200] + outcomes[201]
+        print(
+            f"{name:<11} {written:6d} writes in {elapsed:6.2f}s = {written / elapsed:7.0f} writes/s   "
+            f"locked {outcomes['locked'] + outcomes['read locked']:4d}   outcomes {dict(outcomes)}"
+        )
+    finally:
+        connections.close_all()
+        database.clear()
+        database.update(original)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--professors', type=int, default=200)
+    parser.add_argument('--threads', type=int, default=16, help="Concurrent writers.")
+    parser.add_argument('--readers', type=int, default=2, help="Concurrent readers.")
+    parser.add_argument('--writes', type=int, default=50, help="Reviews posted per writer.")
+    args = parser.parse_args()
+
+    setup()
+    from django.conf import settings
+    from django.test.utils import setup_test_environment
+
+    setup_test_environment()  # allow the test client's host
+    logging.getLogger('django.request').setLevel(logging.CRITICAL)  # lock errors are counted, not logged
+    print(f"{args.threads} writers x {args.writes} reviews, {args.readers} readers, {args.professors} professors")
+    with tempfile.TemporaryDirectory() as tmpdir:
+        run_profile('default', {}, os.path.join(tmpdir, 'default.sqlite3'), args)
+        run_profile('production', settings.SQLITE_PRODUCTION, os.path.join(tmpdir, 'production.sqlite3'), args)
+
+
+if __name__ == '__main__':
+    main()
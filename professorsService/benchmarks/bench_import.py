@@ -0,0 +1,62 @@
+"""
+Compare the bulk professor import against one POST per professor.
+
+    python -m benchmarks.bench_import [--rows 50000] [--single-rows 2000]
+
+The single-row endpoint is timed on a smaller sample and reported as
+rows/sec, which is what the comparison needs.
+"""
+import argparse
+import time
+
+from benchmarks import auth_headers, scratch_database, setup
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=50_000)
+    parser.add_argument('--single-rows', type=int, default=2_000)
+    args = parser.parse_args()
+
+    setup()
+    from rest_framework.test import APIClient
+
+    from base.models import Professor
+    from benchmarks.data import professor_rows
+
+    with scratch_database():
+        client = APIClient()
+        headers = auth_headers('STAFF', user_id=2)
+
+        start = time.perf_counter()
+        for row in professor_rows(args.single_rows, seed=1):
+            client.post('/api/professors/create/', row, format='json', **headers)
+        single = time.perf_counter() - start
+        Professor.objects.all().delete()
+
+        rows = list(professor_rows(args.rows, seed=2))
+        start = time.perf_counter()
+        response = client.post('/api/professors/bulk/', rows, format='json', **headers)
+        bulk = time.perf_counter() - start
+        assert response.data['created'] == args.rows, response.data
+
+        start = time.perf_counter()
+        response = client.post('/api/professors/bulk/?mode=upsert', rows, format='json', **headers)
+        reimport = time.perf_counter() - start
+        assert response.data['unchanged'] == args.rows, response.data
+
+        for row in rows:
+            row['office'] = row['office'] + 'A'
+        start = time.perf_counter()
+        response = client.post('/api/professors/bulk/?mode=upsert', rows, format='json', **headers)
+        upsert = time.perf_counter() - start
+        assert response.data['updated'] == args.rows, response.data
+
+        print(f"single-row POST  {args.single_rows:>7} rows  {single:8.2f} s  {args.single_rows / single:10.0f} rows/s")
+        print(f"bulk create      {args.rows:>7} rows  {bulk:8.2f} s  {args.rows / bulk:10.0f} rows/s")
+        print(f"upsert, no-op    {args.rows:>7} rows  {reimport:8.2f} s  {args.rows / reimport:10.0f} rows/s")
+        print(f"upsert, changed  {args.rows:>7} rows  {upsert:8.2f} s  {args.rows / upsert:10.0f} rows/s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,123 @@
+"""
+Compare the default settings with the API-only profile (``settings_api``).
+
+    python -m benchmarks.bench_profiles [--starts 10] [--requests 2000]
+
+For each profile, fresh interpreters measure the cold start: importing
+Django, ``django.setup()``, building the WSGI handler with its middleware
+and loading the URLconf. Another process then times requests through
+the WSGI handler: an unknown ``/api/`` path (middleware and URL resolving
+only) and a cached professor detail read (plus authentication,
+throttling and the response cache).
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+PROFILES = ('professorsService.settings', 'professorsService.settings_api')
+
+
+# Run in a fresh interpreter, timing everything after it started up
+COLD_START = """
+import json, sys, time
+start = time.perf_counter()
+from django.core.wsgi import get_wsgi_application
+from django.urls import get_resolver
+get_wsgi_application()
+get_resolver().url_patterns
+print(json.dumps({'seconds': time.perf_counter() - start, 'modules': len(sys.modules)}))
+"""
+
+
+def cold_start(profile, env):
+    output = subprocess.run(
+        [sys.executable, '-c', COLD_START], env=dict(env, DJANGO_SETTINGS_MODULE=profile),
+        check=True, capture_output=True, text=True,
+    ).stdout
+    return json.loads(output)
+
+
+def requests(count, rounds=5):
+    from django.conf import settings
+    from django.core.wsgi import get_wsgi_application
+    from django.test import RequestFactory
+
+    application = get_wsgi_application()
+    settings.DEBUG = False  # time the production 404, not the debug page
+    from benchmarks import auth_headers, measure
+    from base.models import Professor
+
+    # Call the WSGI handler directly; the test client's own bookkeeping
+    # would dwarf the middleware
+    factory = RequestFactory(SERVER_NAME=settings.ALLOWED_HOSTS[0], **auth_headers())
+    professor = Professor.objects.first()
+    results = {}
+    for name, path, expect in (
+        ('unknown path', '/api/missing/', '404'),
+        ('cached detail', f'/api/professors/{professor.id}/', '200'),
+    ):
+        environ = factory.get(path).environ
+
+        def call():
+            statuses = []
+            body = application(dict(environ), lambda status, headers: statuses.append(status))
+            try:
+                b''.join(body)
+            finally:
+                body.close()
+            return statuses[0]
+
+        if not call().startswith(expect):
+            raise SystemExit(f"{path} did not return {expect}")
+        results[name] = min(statistics.median(measure(call, repeat=count, warmup=50)) for _ in range(rounds))
+    return results
+
+
+def child(profile, count):
+    os.environ['DJANGO_SETTINGS_MODULE'] = profile
+    print(json.dumps(requests(count)))
+
+
+def run_requests(profile, env, count):
+    output = subprocess.run(
+        [sys.executable, '-m', 'benchmarks.bench_profiles', '--child', profile, str(count)],
+        env=env, check=True, capture_output=True, text=True,
+    ).stdout
+    return json.loads(output.splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--starts', type=int, default=10)
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--child', nargs=2, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        profile, count = args.child
+        return child(profile, int(count))
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        env = dict(os.environ, PROFESSORS_DB_PATH=os.path.join(tmpdir, 'bench.sqlite3'), PROFESSORS_THROTTLING='0')
+        subprocess.run([sys.executable, 'manage.py', 'migrate', '-v0'], env=env, check=True)
+        subprocess.run(
+            [sys.executable, 'manage.py', 'shell', '-c',
+             "from base.models import Professor; Professor.objects.create(name='Bench', department='CS', email='b@umass.edu', office='X')"],
+            env=env, check=True, stdout=subprocess.DEVNULL,
+        )
+        print(f"{'profile':<34}{'cold start ms':>14}{'modules':>9}{'404 us':>9}{'detail us':>11}")
+        for profile in PROFILES:
+            starts = [cold_start(profile, env) for _ in range(args.starts)]
+            timings = run_requests(profile, env, args.requests)
+            print(
+                f"{profile:<34}{statistics.median(s['seconds'] for s in starts) * 1000:>14.1f}"
+                f"{starts[0]['modules']:>9}{timings['unknown path'] * 1e6:>9.0f}{timings['cached detail'] * 1e6:>11.0f}"
+            )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+"""
+Compare deleting a heavily reviewed professor in one transaction with the
+soft delete and batched purge.
+
+    python -m benchmarks.bench_purge [--reviews 200000] [--batch-size 500]
+
+Reports the longest write transaction of each, which is how long every
+other writer waits on SQLite, and the total time.
+"""
+import argparse
+import time
+
+from benchmarks import scratch_database, setup
+
+
+def seed(reviews):
+    from base.models import Professor, Review
+
+    professor = Professor.objects.create(name='Popular', department='CS', email='popular@umass.edu', office='LGRC')
+    Review.objects.bulk_create(
+        (Review(professor=professor, author='S', rating=i % 5 + 1, comment='Review', creator_id=i) for i in range(reviews)),
+        batch_size=5000,
+    )
+    return professor
+
+
+def hard_delete(reviews):
+    from django.db import transaction
+
+    professor = seed(reviews)
+    start = time.perf_counter()
+    with transaction.atomic():
+        professor.delete()
+    seconds = time.perf_counter() - start
+    return seconds, seconds
+
+
+def soft_delete_and_purge(reviews, batch_size):
+    from django.utils import timezone
+
+    from base import purge
+    from base.models import Professor
+
+    professor = seed(reviews)
+    start = time.perf_counter()
+    Professor.objects.filter(pk=professor.pk).update(deleted_at=timezone.now())
+    hidden = time.perf_counter() - start
+    stats = purge.purge_professor(professor.pk, batch_size)
+    return max(hidden, stats.max_transaction_seconds), time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--reviews', type=int, default=200_000)
+    parser.add_argument('--batch-size', type=int, default=500)
+    args = parser.parse_args()
+
+    setup()
+    with scratch_database():
+        print(f"one professor with {args.reviews} reviews")
+        for label, run in (
+            ('hard delete', lambda: hard_delete(args.reviews)),
+            (f'soft delete + purge ({args.batch_size}/tx)', lambda: soft_delete_and_purge(args.reviews, args.batch_size)),
+        ):
+            longest, total = run()
+            print(f"{label:<34} longest write transaction {longest * 1000:9.1f} ms   total {total * 1000:9.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,152 @@
+"""
+Latency of the review comment search against a ``LIKE`` scan.
+
+    python -m benchmarks.bench_review_search [--professors 10000] [--reviews 1000000]
+
+Comments are a few sentences about exams, grading, lectures and office
+hours mixed with words drawn from a large Zipf-distributed vocabulary, so
+the index has common, rare and absent terms. Each query fetches the first
+page of 20 results, ranked and with snippets, as ``searchReviews`` does.
+The ``LIKE`` scan has no relevance to rank by, so it gets the newest 20
+matches instead, which still means testing every comment.
+"""
+import argparse
+import itertools
+import random
+import time
+
+from benchmarks import measure, report, scratch_database, setup
+
+SENTENCES = [
+    'The exams were {adj}.', 'Exams are curved {often}.', 'Office hours were {adj}.', 'Lectures felt {adj} and {adj}.',
+    'Homework took {hours} hours a week.', 'Grading was {adj}.', 'Would {maybe} take again.', 'The textbook was {adj}.',
+    'Quizzes every week, {adj} ones.', 'Labs were {adj} but {adj}.', 'Projects are {adj} and the group work is {adj}.',
+    'Attendance is {often} mandatory.', 'The final was {adj} compared to the midterm.', 'Slides are {adj}.',
+]
+ADJECTIVES = [
+    'fair', 'hard', 'curved', 'easy', 'boring', 'engaging', 'confusing', 'clear', 'helpful', 'useless', 'brutal',
+    'lenient', 'organized', 'chaotic', 'inspiring', 'dry', 'long', 'short', 'relevant', 'outdated',
+]
+OFTEN = ['always', 'sometimes', 'never', 'rarely', 'heavily', 'slightly']
+MAYBE = ['definitely', 'not', 'maybe', 'never']
+VOCABULARY = 20_000
+SYLLABLES = ['ka', 'lo', 'mi', 'ne', 'ru', 'ta', 'shi', 'vo', 'zen', 'pa', 'qu', 'dor', 'fen', 'gal', 'hex', 'jor']
+
+QUERIES = [
+    ('common word', 'exams'),
+    ('two words', 'curved exams'),
+    ('phrase', '"office hours were helpful"'),
+    ('rare word', None),  # filled with the rarest word in at least 5 reviews
+    ('no match', 'xylophone'),
+]
+
+
+def vocabulary(rng):
+    words = set()
+    while len(words) < VOCABULARY:
+        words.add(''.join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4))))
+    return sorted(words)
+
+
+def comments(count, seed=0):
+    rng = random.Random(seed)
+    words = vocabulary(rng)
+    cumulative = list(itertools.accumulate(1 / rank for rank in range(1, len(words) + 1)))
+    for _ in range(count):
+        sentences = []
+        for _ in range(rng.randint(1, 4)):
+            sentence = rng.choice(SENTENCES)
+            while '{adj}' in sentence:
+                sentence = sentence.replace('{adj}', rng.choice(ADJECTIVES), 1)
+            sentences.append(sentence.format(often=rng.choice(OFTEN), maybe=rng.choice(MAYBE), hours=rng.randint(2, 20)))
+        filler = ' '.join(rng.choices(words, cum_weights=cumulative, k=rng.randint(3, 15)))
+        yield f"{' '.join(sentences)} {filler.capitalize()}."
+
+
+def create_corpus(count, batch_size=10_000):
+    from django.db import transaction
+
+    from base.models import Professor, Review
+    from benchmarks.data import review_rows
+
+    professor_ids = list(Professor.objects.order_by('id').values_list('id', flat=True))
+    batch = []
+    for row, comment in zip(review_rows(count, professor_ids), comments(count)):
+        batch.append(Review(**dict(row, comment=comment)))
+        if len(batch) >= batch_size:
+            with transaction.atomic():
+                Review.objects.bulk_create(batch)
+            batch = []
+    with transaction.atomic():
+        Review.objects.bulk_create(batch)
+
+
+def rare_word():
+    from django.db import connection
+
+    # fts5vocab reads the term counts straight from the index
+    with connection.cursor() as cursor:
+        cursor.execute("CREATE VIRTUAL TABLE temp.review_terms USING fts5vocab(main, 'base_review_search', 'row')")
+        cursor.execute("SELECT term FROM temp.review_terms WHERE doc >= 5 ORDER BY doc, term LIMIT 1")
+        term = cursor.fetchone()[0]
+        cursor.execute("DROP TABLE temp.review_terms")
+    return term
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--professors', type=int, default=10_000)
+    parser.add_argument('--reviews', type=int, default=1_000_000)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    setup()
+    from django.db import connection
+    from django.db.models import F
+
+    from base import review_search
+    from base.models import Professor, Review
+    from benchmarks.data import create_professors
+
+    with scratch_database():
+        create_professors(args.professors)
+        start = time.perf_counter()
+        create_corpus(args.reviews)
+        loaded = time.perf_counter() - start
+        start = time.perf_counter()
+        review_search.rebuild(connection)
+        rebuilt = time.perf_counter() - start
+        print(f"{args.professors} professors, {args.reviews} reviews, fts5={review_search.is_available()}")
+        print(f"load with index triggers {loaded:6.1f} s, full rebuild {rebuilt:6.1f} s")
+
+        popular = Professor.objects.order_by('id').values_list('id', 'department').first()
+        queries = [(label, text if text is not None else rare_word()) for label, text in QUERIES]
+        for label, text in queries:
+            for scope, professor, department in (
+                ('all', None, None),
+                ('professor', popular[0], None),
+                ('department', None, popular[1]),
+            ):
+                expression = review_search.build_query(text, professor, department)
+                reviews = Review.objects.filter(professor__deleted_at__isnull=True)
+                if department:
+                    reviews = reviews.filter(professor__department=department)
+
+                def fts():
+                    queryset = review_search.search_reviews(reviews, expression).annotate(
+                        professor_name=F('professor__name'), department=F('professor__department'),
+                    )
+                    return list(queryset.order_by('search_rank', 'id').values('id', 'snippet', 'professor_name')[:20])
+
+                def like():
+                    queryset = reviews if professor is None else reviews.filter(professor_id=professor)
+                    for word in text.strip('"').split():
+                        queryset = queryset.filter(comment__icontains=word)
+                    return list(queryset.order_by('-created_at', '-id').values('id', 'comment')[:20])
+
+                report(f'fts5  {label:<12}{scope:<11}', measure(fts, repeat=args.repeat))
+                report(f'LIKE  {label:<12}{scope:<11}', measure(like, repeat=3, warmup=1))
+
+
+if __name__ == '__main__':
+    main()
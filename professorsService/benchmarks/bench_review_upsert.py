@@ -0,0 +1,100 @@
+"""
+Compare the old two-step review write (look up by professor and creator,
+then INSERT or UPDATE) on the schema without review indexes against the
+indexed single-statement upsert.
+
+    python -m benchmarks.bench_review_upsert [--professors 10000] [--reviews 500000] [--writes 2000]
+
+Half of the writes update an existing review on the most reviewed
+professors, where the unindexed lookup has the most rows to filter; the
+other half are first reviews by new users.
+"""
+import argparse
+import random
+
+from benchmarks import measure, report, scratch_database, setup
+
+
+def workload(count, seed=0):
+    from django.db.models import Max
+
+    from base.models import Professor, Review
+
+    rng = random.Random(seed)
+    popular = list(Professor.objects.order_by('-review_count').values_list('id', flat=True)[:20])
+    everyone = list(Professor.objects.values_list('id', flat=True))
+    existing = list(
+        Review.objects.filter(professor_id__in=popular).values_list('professor_id', 'creator_id')[:count]
+    )
+    next_user = Review.objects.aggregate(top=Max('creator_id'))['top'] + 1
+    writes = []
+    for i in range(count):
+        if i % 2 and existing:
+            professor_id, creator_id = rng.choice(existing)
+        else:
+            professor_id, creator_id = rng.choice(everyone), next_user + i
+        writes.append((professor_id, creator_id, {'author': 'bench', 'rating': rng.randint(1, 5), 'comment': 'Benchmark.'}))
+    return writes
+
+
+def two_step(professor_id, creator_id, fields):
+    from django.db import transaction
+
+    from base.models import Review
+    from base.ratings import apply_review_delta
+
+    with transaction.atomic():
+        review = Review.objects.filter(professor_id=professor_id, creator_id=creator_id).first()
+        if review:
+            old_rating = review.rating
+            for name, value in fields.items():
+                setattr(review, name, value)
+            review.save()
+            apply_review_delta(professor_id, 0, review.rating - old_rating)
+        else:
+            review = Review.objects.create(professor_id=professor_id, creator_id=creator_id, **fields)
+            apply_review_delta(professor_id, 1, review.rating)
+
+
+def upsert(professor_id, creator_id, fields):
+    from django.db import transaction
+
+    from base.models import Review
+    from base.ratings import upsert_review
+
+    with transaction.atomic():
+        review = Review.objects.filter(professor_id=professor_id, creator_id=creator_id).first()
+        upsert_review(professor_id, creator_id, fields, existing=review)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--professors', type=int, default=10_000)
+    parser.add_argument('--reviews', type=int, default=500_000)
+    parser.add_argument('--writes', type=int, default=2_000)
+    args = parser.parse_args()
+
+    setup()
+    from django.core.management import call_command
+
+    from benchmarks.data import create_professors, create_reviews
+
+    with scratch_database():
+        # Start from the schema before the review constraint and indexes
+        call_command('migrate', 'base', '0006', verbosity=0)
+        create_professors(args.professors)
+        create_reviews(args.reviews)
+        print(f"{args.professors} professors, {args.reviews} reviews, {args.writes} writes (half updates)")
+
+        writes = workload(args.writes)
+        calls = iter(writes)
+        report('two-step, no review indexes', measure(lambda: two_step(*next(calls)), repeat=len(writes), warmup=0))
+
+        call_command('migrate', 'base', verbosity=0)
+        writes = workload(args.writes, seed=1)
+        calls = iter(writes)
+        report('upsert, unique + indexes', measure(lambda: upsert(*next(calls)), repeat=len(writes), warmup=0))
+
+
+if __name__ == '__main__':
+    main()
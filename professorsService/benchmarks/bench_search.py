@@ -0,0 +1,41 @@
+"""
+Compare the FTS5 search index against the ``icontains`` scan.
+
+    python -m benchmarks.bench_search [--professors 100000]
+"""
+import argparse
+
+from benchmarks import measure, report, scratch_database, setup
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--professors', type=int, default=100_000)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    setup()
+    from django.db.models import Q
+
+    from base import search
+    from base.models import Professor
+    from benchmarks.data import create_professors
+
+    with scratch_database():
+        create_professors(args.professors)
+        print(f"{args.professors} professors, first page of 50, fts5={search.is_available()}")
+        for term in ('smith', 'nunez', 'ali', 'physics', 'zzz'):
+            def fts():
+                queryset, ordering = search.search_professors(Professor.objects.all(), term)
+                return list(queryset.order_by(*ordering)[:50])
+
+            def like():
+                queryset = Professor.objects.filter(Q(name__icontains=term) | Q(department__icontains=term))
+                return list(queryset.order_by('name', 'id')[:50])
+
+            report(f'fts5   {term!r}', measure(fts, repeat=args.repeat))
+            report(f'LIKE   {term!r}', measure(like, repeat=args.repeat))
+
+
+if __name__ == '__main__':
+    main()
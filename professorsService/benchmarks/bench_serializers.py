@@ -0,0 +1,79 @@
+"""
+Compare the DRF serializer read path with the ``values()`` fast path.
+
+    python -m benchmarks.bench_serializers [--professors 10000] [--reviews 50000]
+
+Each run fetches, serializes and renders to JSON bytes every professor
+(as summaries, then with their reviews embedded) and reports rows per
+second. Both paths are checked to produce the same bytes first.
+"""
+import argparse
+import statistics
+
+from benchmarks import measure, scratch_database, setup
+
+
+def serializer_summaries():
+    from rest_framework.renderers import JSONRenderer
+
+    from api.serializers import ProfessorSummarySerializer
+    from base.models import Professor
+
+    professors = Professor.objects.order_by('name', 'id')
+    return JSONRenderer().render(ProfessorSummarySerializer(professors, many=True).data)
+
+
+def fast_summaries():
+    from api import fastpath
+    from base.models import Professor
+
+    rows = Professor.objects.order_by('name', 'id').values(*fastpath.PROFESSOR_SUMMARY.fields)
+    return fastpath.render_json(fastpath.summaries(rows))
+
+
+def serializer_with_reviews():
+    from rest_framework.renderers import JSONRenderer
+
+    from api.serializers import ProfessorSerializer
+    from base.models import Professor
+
+    professors = Professor.objects.order_by('name', 'id').prefetch_related('reviews')
+    return JSONRenderer().render(ProfessorSerializer(professors, many=True).data)
+
+
+def fast_with_reviews():
+    from api import fastpath
+    from base.models import Professor, Review
+
+    rows = list(Professor.objects.order_by('name', 'id').values(*fastpath.PROFESSOR.fields))
+    reviews = Review.objects.filter(professor_id__in=[row['id'] for row in rows])
+    return fastpath.render_json(fastpath.professors_with_reviews(rows, reviews))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--professors', type=int, default=10_000)
+    parser.add_argument('--reviews', type=int, default=50_000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    setup()
+    from benchmarks.data import create_professors, create_reviews
+
+    with scratch_database():
+        create_professors(args.professors)
+        create_reviews(args.reviews)
+        print(f"{args.professors} professors, {args.reviews} reviews, median of {args.repeat} runs")
+        for label, slow, fast in (
+            ('summaries', serializer_summaries, fast_summaries),
+            ('with reviews', serializer_with_reviews, fast_with_reviews),
+        ):
+            if slow() != fast():
+                raise SystemExit(f"{label}: the fast path renders different bytes")
+            for path, fn in (('serializer', slow), ('values()', fast)):
+                seconds = statistics.median(measure(fn, repeat=args.repeat, warmup=1))
+                print(f"{label:<14}{path:<12}{seconds * 1000:9.1f} ms {args.professors / seconds:12,.0f} rows/s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,79 @@
+"""
+Build the similar professor lists at scale.
+
+    python -m benchmarks.bench_similarity [--professors 10000] [--reviews 1000000]
+
+Students rate about ten professors each, favouring one department, so the
+lists have real structure. Reports the full build, then an incremental
+refresh after a further 0.1% of reviews, with the peak Python memory of
+each (tracemalloc).
+"""
+import argparse
+import random
+import time
+import tracemalloc
+
+from benchmarks import scratch_database, setup
+
+PER_STUDENT = 10
+
+
+def create_ratings(count, professor_ids, departments, first_student=1, seed=0, batch_size=20_000):
+    from django.db import transaction
+
+    from base.models import Review
+
+    rng = random.Random(seed)
+    batch = []
+    for offset in range(count // PER_STUDENT):
+        student = first_student + offset
+        favourite = student % 10
+        for professor_id in rng.sample(professor_ids, PER_STUDENT):
+            liked = departments[professor_id] == favourite
+            rating = min(5, max(1, round(rng.gauss(4.3 if liked else 2.7, 0.8))))
+            batch.append(Review(professor_id=professor_id, author='S', rating=rating, comment='Review', creator_id=student))
+        if len(batch) >= batch_size:
+            with transaction.atomic():
+                Review.objects.bulk_create(batch)
+            batch = []
+    with transaction.atomic():
+        Review.objects.bulk_create(batch)
+
+
+def timed_build(full):
+    from base import similarity
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    professors, written = similarity.build(full=full)
+    seconds = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return professors, written, seconds, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--professors', type=int, default=10_000)
+    parser.add_argument('--reviews', type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    setup()
+    from base.models import Professor
+    from benchmarks.data import create_professors
+
+    with scratch_database():
+        create_professors(args.professors)
+        professor_ids = list(Professor.objects.order_by('id').values_list('id', flat=True))
+        departments = {pk: i % 10 for i, pk in enumerate(professor_ids)}
+        create_ratings(args.reviews, professor_ids, departments)
+        print(f"{args.professors} professors, {args.reviews} reviews by {args.reviews // PER_STUDENT} students")
+        for label, full, extra in (('full build', True, 0), ('incremental', False, args.reviews // 1000)):
+            if extra:
+                create_ratings(extra, professor_ids, departments, first_student=args.reviews, seed=1)
+            professors, written, seconds, peak = timed_build(full)
+            print(f"{label:<14}{professors:>8} professors {written:>9} neighbours {seconds:8.1f} s   peak {peak / 2**20:7.1f} MiB")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,90 @@
+"""
+Deterministic synthetic data for benchmarks.
+"""
+import random
+
+# name: (professors, reviews)
+DATASETS = {
+    'small': (1_000, 20_000),
+    'medium': (10_000, 500_000),
+    'large': (100_000, 5_000_000),
+}
+
+COMMENTS = [
+    'Clear lectures and fair exams.', 'Tough grader but you learn a lot.', 'Office hours were very helpful.',
+    'Disorganized, hard to follow.', 'Best course I have taken.', 'Too much homework for the credit.',
+]
+
+DEPARTMENTS = ['CS', 'MATH', 'BIO', 'PHYS', 'CHEM', 'HIST', 'ECON', 'ENGL', 'PSYCH', 'ART']
+FIRST_NAMES = ['Alice', 'Bob', 'Carol', 'Dana', 'Eve', 'Frank', 'Grace', 'Heidi', 'Ivan', 'Judy', 'José', 'Zoë']
+LAST_NAMES = ['Smith', 'Jones', 'Lee', 'Nguyen', 'Garcia', 'Müller', 'Núñez', 'Chen', 'Patel', 'Kowalski']
+
+
+def professor_rows(count, seed=0):
+    rng = random.Random(seed)
+    for i in range(count):
+        first = rng.choice(FIRST_NAMES)
+        last = rng.choice(LAST_NAMES)
+        yield {
+            'name': f'{first} {last} {i}',
+            'department': rng.choice(DEPARTMENTS),
+            'email': f'prof{i}@umass.edu',
+            'office': f'{rng.choice(DEPARTMENTS)}{rng.randint(100, 999)}',
+        }
+
+
+def create_professors(count, seed=0, batch_size=5000):
+    from base.models import Professor
+
+    batch = []
+    for row in professor_rows(count, seed):
+        batch.append(Professor(**row))
+        if len(batch) >= batch_size:
+            Professor.objects.bulk_create(batch)
+            batch = []
+    if batch:
+        Professor.objects.bulk_create(batch)
+
+
+def review_rows(count, professor_ids, seed=0):
+    """
+    Reviews spread unevenly like real traffic: half go to the most popular
+    1% of professors, the rest uniformly to everyone.
+    """
+    rng = random.Random(seed)
+    popular = max(1, len(professor_ids) // 100)
+    for i in range(count):
+        index = rng.randrange(popular) if i % 2 else rng.randrange(len(professor_ids))
+        yield {
+            'professor_id': professor_ids[index],
+            'author': f'student{i}',
+            'rating': rng.choices(range(1, 6), weights=(1, 1, 2, 3, 3))[0],
+            'comment': rng.choice(COMMENTS),
+            'creator_id': 10_000 + i,
+        }
+
+
+def create_reviews(count, seed=0, batch_size=10_000):
+    from django.db import transaction
+
+    from base import ratings
+    from base.models import Professor, Review
+
+    professor_ids = list(Professor.objects.order_by('id').values_list('id', flat=True))
+    batch = []
+    for row in review_rows(count, professor_ids, seed):
+        batch.append(Review(**row))
+        if len(batch) >= batch_size:
+            with transaction.atomic():
+                Review.objects.bulk_create(batch)
+            batch = []
+    if batch:
+        Review.objects.bulk_create(batch)
+    with transaction.atomic():
+        ratings.recompute()
+
+
+def create_dataset(name, seed=0):
+    professors, reviews = DATASETS[name]
+    create_professors(professors, seed)
+    create_reviews(reviews, seed)
@@ -0,0 +1,295 @@
+"""
+Latency, query and memory benchmark of every API endpoint.
+
+    python -m benchmarks.suite [--dataset small|medium|large] [--output suite-small.json]
+    python -m benchmarks.suite --baseline suite-small.json   # exits 1 on regressions
+
+Requests go through the test client and the real URLconf, with real
+tokens, against a deterministic dataset (see ``benchmarks.data.DATASETS``)
+in a throwaway database. For each scenario the timed pass reports
+throughput and p50/p95/p99 latency, and a separate profiled pass records
+the SQL queries per request and the peak Python memory allocated while
+serving one request. Read scenarios marked cold clear the response cache
+before every request so they measure the database path.
+
+``--baseline`` compares the run with an earlier JSON result. A scenario
+regresses when its p50, p95 or peak memory grows by more than ``--tolerance``
+(and by more than a small absolute floor, so sub-millisecond noise does not
+count), or when it issues more queries than before.
+"""
+import argparse
+import datetime
+import fnmatch
+import itertools
+import json
+import platform
+import sqlite3
+import statistics
+import sys
+import time
+import tracemalloc
+
+from benchmarks import auth_headers, percentile, scratch_database, setup
+
+# Absolute floors below which a relative regression is treated as noise
+LATENCY_FLOOR_MS = 0.5
+MEMORY_FLOOR_KIB = 64
+
+
+class Scenario:
+    """
+    One endpoint under test. ``build(i)`` returns ``(path, data, headers)``
+    for the i-th request and runs untimed, so it may create fixtures.
+    """
+
+    def __init__(self, name, method, build, expect=200, cold=False, iterations=None):
+        self.name = name
+        self.method = method
+        self.build = build
+        self.expect = expect
+        self.cold = cold
+        self.iterations = iterations
+
+
+def scenarios(dataset_professors):
+    from base.models import Professor, Review
+    from api.pagination import KeysetPagination
+    from benchmarks.data import professor_rows
+
+    student = auth_headers('STUDENT', 1)
+    staff = auth_headers('STAFF', 2)
+    popular = Professor.objects.order_by('-review_count', 'id').values_list('id', flat=True).first()
+    ids = list(Professor.objects.order_by('id').values_list('id', flat=True))
+    middle = Professor.objects.order_by('name', 'id')[len(ids) // 2]
+    deep_cursor = KeysetPagination().encode_cursor([middle.name, middle.id], reverse=False)
+
+    def some_id(i):
+        return ids[(i * 7919) % len(ids)]
+
+    def batch(i):
+        return f'/api/professors/batch/?ids={",".join(str(some_id(i * 30 + j)) for j in range(30))}', None, student
+
+    def get(path):
+        return lambda i: (path, None, student)
+
+    def new_professor(i):
+        professor = Professor.objects.create(name=f'Temp {i}', department='CS', email=f'temp{i}@umass.edu', office='LGRC')
+        return f'/api/professors/{professor.id}/delete/', None, staff
+
+    def new_review(i):
+        review = Review.objects.create(professor_id=popular, author='temp', rating=3, comment='temp', creator_id=2)
+        return f'/api/professors/{popular}/review/{review.id}/delete/', None, staff
+
+    def bulk_rows(i):
+        rows = list(professor_rows(500, seed=i))
+        for row in rows:
+            row['email'] = f'bulk{i}-{row["email"]}'
+        return '/api/professors/bulk/', rows, staff
+
+    return [
+        Scenario('professors.list', 'get', get('/api/professors/')),
+        Scenario('professors.list.cold', 'get', get('/api/professors/'), cold=True),
+        Scenario('professors.list.deep.cold', 'get', get(f'/api/professors/?cursor={deep_cursor}'), cold=True),
+        Scenario('professors.list.reviews.cold', 'get', get('/api/professors/?include=reviews'), cold=True),
+        Scenario('professors.search.cold', 'get', get('/api/professors/?query=smith'), cold=True),
+        Scenario('professors.detail', 'get', lambda i: (f'/api/professors/{some_id(i)}/', None, student)),
+        Scenario('professors.detail.cold', 'get', lambda i: (f'/api/professors/{some_id(i)}/', None, student), cold=True),
+        Scenario('professors.detail.popular.cold', 'get', get(f'/api/professors/{popular}/'), cold=True),
+        Scenario('professors.batch', 'get', batch),
+        Scenario('professors.batch.cold', 'get', batch, cold=True),
+        Scenario('professors.reviews.cold', 'get', get(f'/api/professors/{popular}/reviews/'), cold=True),
+        Scenario('professors.reviews.highest.cold', 'get', get(f'/api/professors/{popular}/reviews/?sort=highest'), cold=True),
+        Scenario('professors.top.cold', 'get', get('/api/professors/top/'), cold=True),
+        Scenario('professors.top.department.cold', 'get', get('/api/professors/top/?department=CS'), cold=True),
+        Scenario('departments.cold', 'get', get('/api/departments/'), cold=True),
+        Scenario('reviews.search.cold', 'get', get('/api/reviews/search/?query=office%20hours'), cold=True),
+        Scenario('reviews.search.professor.cold', 'get', get(f'/api/reviews/search/?query=exams&professor={popular}'), cold=True),
+        Scenario('async.professors.list.cold', 'get', get('/api/async/professors/'), cold=True),
+        Scenario('async.professors.detail.cold', 'get', lambda i: (f'/api/async/professors/{some_id(i)}/', None, student), cold=True),
+        Scenario(
+            'professors.create', 'post',
+            lambda i: ('/api/professors/create/', {'name': f'New {i}', 'department': 'CS', 'email': f'new{i}@umass.edu', 'office': 'LGRC'}, staff),
+            expect=201,
+        ),
+        Scenario('professors.delete', 'delete', new_professor, expect=204),
+        Scenario('professors.bulk', 'post', bulk_rows, iterations=20),
+        Scenario(
+            'reviews.create', 'post',
+            lambda i: (f'/api/professors/{some_id(i)}/review/', {'author': 'bench', 'rating': 4, 'comment': 'Good.'},
+                       auth_headers('STUDENT', 5_000_000 + i)),
+            expect=201,
+        ),
+        Scenario(
+            'reviews.update', 'post',
+            lambda i: (f'/api/professors/{popular}/review/', {'author': 'bench', 'rating': i % 5 + 1, 'comment': 'Again.'}, student),
+            expect=(200, 201),
+        ),
+        Scenario('reviews.delete', 'delete', new_review, expect=204),
+        Scenario('export.professors', 'get', lambda i: ('/api/export/professors/', None, staff),
+                 iterations=max(3, 200_000 // dataset_professors)),
+    ]
+
+
+def call(client, scenario, request):
+    """Issue a request built by ``scenario.build``; returns the seconds it took."""
+    from django.core.cache import cache
+
+    path, data, headers = request
+    if scenario.cold:
+        cache.clear()
+    start = time.perf_counter()
+    if scenario.method == 'get':
+        response = client.get(path, **headers)
+    elif scenario.method == 'post':
+        response = client.post(path, data, content_type='application/json', **headers)
+    else:
+        response = client.delete(path, **headers)
+    if response.streaming:
+        for _ in response.streaming_content:
+            pass
+    elapsed = time.perf_counter() - start
+    expected = scenario.expect if isinstance(scenario.expect, tuple) else (scenario.expect,)
+    if response.status_code not in expected:
+        raise AssertionError(f"{scenario.name}: {path} returned {response.status_code}")
+    return elapsed
+
+
+def run(client, scenario, iterations, warmup, profiled):
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    iterations = scenario.iterations or iterations
+    counter = itertools.count()
+    for _ in range(warmup):
+        call(client, scenario, scenario.build(next(counter)))
+
+    durations = [call(client, scenario, scenario.build(next(counter))) for _ in range(iterations)]
+
+    # Counting queries and tracing allocations both slow requests down, so
+    # they get their own pass
+    queries, peaks = [], []
+    tracemalloc.start()
+    try:
+        for _ in range(min(profiled, iterations)):
+            request = scenario.build(next(counter))
+            with CaptureQueriesContext(connection) as captured:
+                baseline = tracemalloc.get_traced_memory()[0]
+                tracemalloc.reset_peak()
+                call(client, scenario, request)
+                peaks.append(tracemalloc.get_traced_memory()[1] - baseline)
+            queries.append(len(captured))
+    finally:
+        tracemalloc.stop()
+
+    ordered = sorted(durations)
+    return {
+        'requests': iterations,
+        'throughput_rps': round(iterations / sum(durations), 1),
+        'mean_ms': round(statistics.fmean(ordered) * 1000, 3),
+        'p50_ms': round(percentile(ordered, 50) * 1000, 3),
+        'p95_ms': round(percentile(ordered, 95) * 1000, 3),
+        'p99_ms': round(percentile(ordered, 99) * 1000, 3),
+        'queries': max(queries),
+        'peak_memory_kib': round(max(peaks) / 1024, 1),
+    }
+
+
+def compare(baseline, current, tolerance):
+    """Return a description of every regression of ``current`` against ``baseline``."""
+    regressions = []
+    for name, before in baseline['results'].items():
+        after = current['results'].get(name)
+        if after is None:
+            continue
+        for key in ('p50_ms', 'p95_ms'):
+            if after[key] > before[key] * (1 + tolerance) and after[key] - before[key] > LATENCY_FLOOR_MS:
+                regressions.append(f"{name}: {key[:3]} {before[key]} ms -> {after[key]} ms")
+        if after['queries'] > before['queries']:
+            regressions.append(f"{name}: queries {before['queries']} -> {after['queries']}")
+        if (after['peak_memory_kib'] > before['peak_memory_kib'] * (1 + tolerance)
+                and after['peak_memory_kib'] - before['peak_memory_kib'] > MEMORY_FLOOR_KIB):
+            regressions.append(f"{name}: peak memory {before['peak_memory_kib']} KiB -> {after['peak_memory_kib']} KiB")
+    return regressions
+
+
+def main():
+    from benchmarks.data import DATASETS
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--dataset', choices=DATASETS, default='small')
+    parser.add_argument('--iterations', type=int, default=200, help="Timed requests per scenario.")
+    parser.add_argument('--warmup', type=int, default=10)
+    parser.add_argument('--profiled', type=int, default=10, help="Requests per scenario in the query/memory pass.")
+    parser.add_argument('--only', help="Run only scenarios matching this glob, e.g. 'reviews.*'.")
+    parser.add_argument('--output', help="Result file (default: suite-<dataset>.json).")
+    parser.add_argument('--baseline', help="Earlier result file to check for regressions.")
+    parser.add_argument(
+        '--tolerance', type=float, default=0.5,
+        help="Allowed relative growth of p50/p95 latency and memory; compare runs from the same machine.",
+    )
+    parser.add_argument('--db-file', help="Build the scratch database in this file instead of in memory (large dataset).")
+    args = parser.parse_args()
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        if baseline['dataset'] != args.dataset:
+            parser.error(f"baseline was run on the {baseline['dataset']} dataset")
+
+    setup()
+    import django
+    from django.db import connections
+    from django.test import Client
+
+    from benchmarks.data import create_dataset
+
+    if args.db_file:
+        connections.settings['default'].setdefault('TEST', {})['NAME'] = args.db_file
+    professors, reviews = DATASETS[args.dataset]
+    result = {
+        'dataset': args.dataset,
+        'professors': professors,
+        'reviews': reviews,
+        'created_at': datetime.datetime.now(datetime.timezone.utc).isoformat(timespec='seconds'),
+        'environment': {
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'sqlite': sqlite3.sqlite_version,
+            'machine': platform.machine(),
+        },
+        'results': {},
+    }
+
+    with scratch_database():
+        started = time.perf_counter()
+        create_dataset(args.dataset)
+        print(f"{args.dataset}: {professors} professors, {reviews} reviews generated in {time.perf_counter() - started:.1f}s")
+        client = Client()
+        print(f"{'scenario':<32}{'req/s':>9}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'queries':>9}{'peak KiB':>10}")
+        for scenario in scenarios(professors):
+            if args.only and not fnmatch.fnmatch(scenario.name, args.only):
+                continue
+            stats = run(client, scenario, args.iterations, args.warmup, args.profiled)
+            result['results'][scenario.name] = stats
+            print(
+                f"{scenario.name:<32}{stats['throughput_rps']:>9.0f}{stats['p50_ms']:>10.2f}{stats['p95_ms']:>10.2f}"
+                f"{stats['p99_ms']:>10.2f}{stats['queries']:>9}{stats['peak_memory_kib']:>10.0f}"
+            )
+
+    output = args.output or f'suite-{args.dataset}.json'
+    with open(output, 'w') as f:
+        json.dump(result, f, indent=2)
+    print(f"Results written to {output}")
+
+    if baseline is not None:
+        regressions = compare(baseline, result, args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            sys.exit(1)
+        print(f"No regressions against {args.baseline}.")
+
+
+if __name__ == '__main__':
+    main()
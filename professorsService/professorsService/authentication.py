@@ -1,6 +1,12 @@
 from __future__ import annotations
 
+import hashlib
+import logging
+import threading
+import time
+from collections import OrderedDict
 from dataclasses import dataclass
+from functools import lru_cache
 from typing import Optional, Tuple
 
 from django.conf import settings
@@ -10,6 +16,10 @@ from rest_framework.request import Request
 from rest_framework_simplejwt.backends import TokenBackend
 from rest_framework_simplejwt.exceptions import TokenBackendError
 
+from .profiling import timed
+
+logger = logging.getLogger(__name__)
+
 
 @dataclass
 class ExternalJWTUser:
@@ -34,11 +44,74 @@ class ExternalJWTUser:
         return f"ExternalJWTUser(id={self.id}, email={self.email}, username={self.username}, role={self.role})"
 
 
+class VerifiedTokenCache:
+    """
+    Bounded LRU of tokens that already passed signature verification.
+
+    Entries are keyed on a SHA-256 digest of the raw token (the token itself
+    is never stored) and expire at the token's ``exp`` claim, so a cache hit
+    can skip the HMAC check and JSON decode without extending a token's life.
+    """
+
+    def __init__(self, maxsize: int) -> None:
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[bytes, Tuple[float, ExternalJWTUser, dict]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(token: str) -> bytes:
+        return hashlib.sha256(token.encode()).digest()
+
+    def get(self, token: str) -> Optional[Tuple[ExternalJWTUser, dict]]:
+        key = self.key(token)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > time.time():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1], entry[2]
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+    def set(self, token: str, user: ExternalJWTUser, payload: dict) -> None:
+        expires_at = payload.get("exp")
+        if self.maxsize <= 0 or not isinstance(expires_at, (int, float)):
+            return
+        key = self.key(token)
+        with self._lock:
+            self._entries[key] = (expires_at, user, payload)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = 0
+
+    def info(self) -> dict:
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "size": len(self._entries), "maxsize": self.maxsize}
+
+
+token_cache = VerifiedTokenCache(getattr(settings, "EXTERNAL_JWT_CACHE_SIZE", 4096))
+
+
+@lru_cache(maxsize=None)
+def get_token_backend(algorithm: str, signing_key: str) -> TokenBackend:
+    return TokenBackend(algorithm=algorithm, signing_key=signing_key)
+
+
 class ExternalJWTAuthentication(BaseAuthentication):
     """
     Authenticate requests using the JWTs issued by the user-auth service.
     The token is decoded locally with the shared signing key, so no
-    additional network round-trip is required.
+    additional network round-trip is required. Verified tokens are kept in
+    ``token_cache`` until they expire.
     """
 
     keyword = "bearer"
@@ -46,11 +119,16 @@ class ExternalJWTAuthentication(BaseAuthentication):
     def __init__(self) -> None:
         signing_key = settings.SIMPLE_JWT.get("SIGNING_KEY", settings.SECRET_KEY)
         algorithm = settings.SIMPLE_JWT.get("ALGORITHM", "HS256")
-        self.token_backend = TokenBackend(algorithm=algorithm, signing_key=signing_key)
+        self.token_backend = get_token_backend(algorithm, signing_key)
 
+    @staticmethod
+    def cache_info() -> dict:
+        """Hit/miss counters and size of the verified-token cache."""
+        return token_cache.info()
+
+    @timed("auth")
     def authenticate(self, request: Request) -> Optional[Tuple[ExternalJWTUser, dict]]:
         auth_header = request.headers.get("Authorization")
-        print("53-auth_header: ", auth_header)
         if not auth_header:
             return None
 
@@ -62,8 +140,11 @@ class ExternalJWTAuthentication(BaseAuthentication):
         if scheme.lower() != self.keyword:
             return None
 
+        cached = token_cache.get(token)
+        if cached is not None:
+            return cached
+
         payload = self._decode_token(token)
-        print("payload: ",payload)
         raw_user_id = payload.get("user_id")
         if raw_user_id is None:
             raise AuthenticationFailed("Token payload missing user_id")
@@ -79,11 +160,13 @@ class ExternalJWTAuthentication(BaseAuthentication):
             username=payload.get("username"),
             role=payload.get("role")
         )
-        print("user: ", user)
+        logger.debug("Authenticated %s", user)
+        token_cache.set(token, user, payload)
         return (user, payload)
 
     def _decode_token(self, token: str) -> dict:
         try:
             return self.token_backend.decode(token, verify=True)
         except TokenBackendError as exc:
+            logger.debug("Rejected token: %s", exc)
             raise AuthenticationFailed("Invalid or expired token") from exc
@@ -0,0 +1,138 @@
+"""
+Per-request profiling: SQL query count and time, plus named timings such
+as JWT authentication and serialization.
+
+``ProfilingMiddleware`` (enabled with ``PROFESSORS_PROFILING=1``) reports
+them in a ``Server-Timing`` header, logs requests slower than
+``PROFILING_SLOW_REQUEST_MS`` as one JSON object per line and warns about
+query shapes repeated within a request, the signature of an N+1 loop.
+``assert_no_n_plus_one`` runs the same detector inside tests.
+
+Code reports named timings with ``timed(name)``, as a context manager or
+decorator. Outside a profiled request it does nothing.
+"""
+import json
+import logging
+import re
+import time
+from collections import Counter, defaultdict
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+_current = ContextVar('request_profile', default=None)
+
+# Collapse IN lists so "IN (%s, %s)" and "IN (%s, %s, %s)" share a shape
+_IN_LIST = re.compile(r'IN \((?:%s, )*%s\)')
+_WHITESPACE = re.compile(r'\s+')
+
+
+def query_shape(sql):
+    return _WHITESPACE.sub(' ', _IN_LIST.sub('IN (...)', sql)).strip()
+
+
+class RequestProfile:
+    def __init__(self):
+        self.queries = 0
+        self.sql_time = 0.0
+        self.shapes = Counter()
+        self.timings = defaultdict(float)
+
+    def __call__(self, execute, sql, params, many, context):
+        # Installed with connection.execute_wrapper()
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.sql_time += time.perf_counter() - start
+            self.queries += 1
+            self.shapes[query_shape(sql)] += 1
+
+    def repeated(self, threshold):
+        """Query shapes run at least ``threshold`` times, most frequent first."""
+        return {shape: count for shape, count in self.shapes.most_common() if count >= threshold}
+
+    def server_timing(self, total):
+        metrics = [f'db;dur={self.sql_time * 1000:.1f};desc="{self.queries} queries"']
+        metrics += [f'{name};dur={seconds * 1000:.1f}' for name, seconds in self.timings.items()]
+        metrics.append(f'total;dur={total * 1000:.1f}')
+        return ', '.join(metrics)
+
+
+@contextmanager
+def profile():
+    """Profile everything run in this context, on every database connection."""
+    request_profile = RequestProfile()
+    token = _current.set(request_profile)
+    try:
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(request_profile))
+            yield request_profile
+    finally:
+        _current.reset(token)
+
+
+@contextmanager
+def timed(name):
+    request_profile = _current.get()
+    if request_profile is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        request_profile.timings[name] += time.perf_counter() - start
+
+
+@contextmanager
+def assert_no_n_plus_one(threshold=None):
+    """
+    Fail with ``AssertionError`` if a query shape repeats ``threshold`` or
+    more times (default ``PROFILING_N_PLUS_ONE_THRESHOLD``) inside the block.
+    """
+    threshold = threshold or settings.PROFILING_N_PLUS_ONE_THRESHOLD
+    with profile() as request_profile:
+        yield request_profile
+    repeated = request_profile.repeated(threshold)
+    if repeated:
+        lines = '\n'.join(f'  {count}x {shape}' for shape, count in repeated.items())
+        raise AssertionError(f"Possible N+1 queries ({request_profile.queries} total):\n{lines}")
+
+
+class ProfilingMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        start = time.perf_counter()
+        with profile() as request_profile:
+            response = self.get_response(request)
+        total = time.perf_counter() - start
+        response['Server-Timing'] = request_profile.server_timing(total)
+
+        repeated = request_profile.repeated(settings.PROFILING_N_PLUS_ONE_THRESHOLD)
+        if repeated:
+            logger.warning(json.dumps({
+                'event': 'n_plus_one',
+                'method': request.method,
+                'path': request.get_full_path(),
+                'repeated': repeated,
+            }))
+        if total * 1000 >= settings.PROFILING_SLOW_REQUEST_MS:
+            logger.warning(json.dumps({
+                'event': 'slow_request',
+                'method': request.method,
+                'path': request.get_full_path(),
+                'status': response.status_code,
+                'total_ms': round(total * 1000, 1),
+                'db_ms': round(request_profile.sql_time * 1000, 1),
+                'queries': request_profile.queries,
+                **{f'{name}_ms': round(seconds * 1000, 1) for name, seconds in request_profile.timings.items()},
+            }))
+        return response
@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -55,6 +56,30 @@ SIMPLE_JWT = {
     'SIGNING_KEY': SECRET_KEY,
 }
 
+# Number of verified tokens ExternalJWTAuthentication keeps until they expire (0 disables)
+EXTERNAL_JWT_CACHE_SIZE = 4096
+
+# Authentication logs are quiet by default; set AUTH_LOG_LEVEL=DEBUG to trace tokens
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+        },
+    },
+    'loggers': {
+        'professorsService.authentication': {
+            'handlers': ['console'],
+            'level': os.environ.get('AUTH_LOG_LEVEL', 'WARNING'),
+        },
+        'professorsService.profiling': {
+            'handlers': ['console'],
+            'level': 'WARNING',
+        },
+    },
+}
+
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -63,8 +88,17 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'api.throttling.RateLimitHeadersMiddleware',
 ]
 
+# Opt-in request profiling (see professorsService.profiling): Server-Timing
+# headers, a slow-request log and an N+1 query detector
+if os.environ.get('PROFESSORS_PROFILING') == '1':
+    MIDDLEWARE.insert(0, 'professorsService.profiling.ProfilingMiddleware')
+
+PROFILING_SLOW_REQUEST_MS = int(os.environ.get('PROFILING_SLOW_REQUEST_MS', 500))
+PROFILING_N_PLUS_ONE_THRESHOLD = 5
+
 ROOT_URLCONF = 'professorsService.urls'
 
 TEMPLATES = [
@@ -91,10 +125,87 @@ WSGI_APPLICATION = 'professorsService.wsgi.application'
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+        # Overridable so benchmarks and scratch servers never touch the real database
+        'NAME': os.environ.get('PROFESSORS_DB_PATH', BASE_DIR / 'db.sqlite3'),
     }
 }
 
+# Production profile for concurrent traffic, enabled with
+# PROFESSORS_DB_PROFILE=production. WAL lets readers run alongside the single
+# writer, the busy timeout makes writers queue instead of failing with
+# "database is locked", and IMMEDIATE transactions take the write lock up
+# front so a read-then-write transaction never has to upgrade its lock.
+SQLITE_PRODUCTION = {
+    'CONN_MAX_AGE': 600,
+    'CONN_HEALTH_CHECKS': True,
+    'OPTIONS': {
+        'timeout': 20,
+        'transaction_mode': 'IMMEDIATE',
+        'init_command': (
+            'PRAGMA journal_mode=WAL;'
+            'PRAGMA synchronous=NORMAL;'
+            'PRAGMA mmap_size=268435456;'
+            'PRAGMA cache_size=-65536;'
+            'PRAGMA temp_store=MEMORY'
+        ),
+    },
+}
+
+if os.environ.get('PROFESSORS_DB_PROFILE') == 'production':
+    DATABASES['default'].update(SQLITE_PRODUCTION)
+
+
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+# Professor reads are cached per version (see api.caching). The default
+# locmem cache is private to each process: set PROFESSORS_REDIS_URL (e.g.
+# redis://localhost:6379/0, needs the redis package) when running several
+# workers, and for the version bumps of management commands (import_reviews,
+# reconcile_ratings, build_similarity, rebuild_department_stats) to reach
+# the server.
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+if os.environ.get('PROFESSORS_REDIS_URL'):
+    CACHES['default'] = {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': os.environ['PROFESSORS_REDIS_URL'],
+    }
+
+PROFESSORS_CACHE_TIMEOUT = 300
+
+# Token-bucket request budgets per role and scope (see api.throttling): a
+# "30/min" bucket allows bursts of 30 requests and refills one every two
+# seconds. Searches also spend read tokens. Roles and scopes without a rate
+# are not throttled. Buckets live in PROFESSORS_THROTTLE_CACHE, which must
+# be shared (Redis, Memcached) for the limits to hold across workers.
+# PROFESSORS_THROTTLING=0 turns throttling off, e.g. for load tests.
+PROFESSORS_THROTTLE_RATES = {
+    'STUDENT': {'read': '600/min', 'search': '60/min', 'write': '30/min'},
+    'STAFF': {'read': '1200/min', 'search': '120/min', 'write': '600/min'},
+}
+if os.environ.get('PROFESSORS_THROTTLING') == '0':
+    PROFESSORS_THROTTLE_RATES = {}
+PROFESSORS_THROTTLE_CACHE = 'default'
+
+# Deleted professors are hidden at once and purged in the background (see
+# base.purge), deleting this many reviews per transaction. Without the
+# background worker (PROFESSORS_PURGE_IN_BACKGROUND=0), run
+# purge_deleted_professors periodically instead.
+PROFESSORS_PURGE_BATCH_SIZE = 500
+PROFESSORS_PURGE_IN_BACKGROUND = os.environ.get('PROFESSORS_PURGE_IN_BACKGROUND') != '0'
+
+
+# Leaderboard ranking (see base.ratings.bayesian_score_expression): a
+# professor's score is their mean rating as if they had RATING_PRIOR_WEIGHT
+# extra reviews of RATING_PRIOR_MEAN, so a few reviews cannot outrank many.
+# Run reconcile_ratings after changing these to rescore every professor.
+RATING_PRIOR_MEAN = 3.5
+RATING_PRIOR_WEIGHT = 10
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -0,0 +1,43 @@
+"""
+API-only settings profile.
+
+The API authenticates every request with the stateless
+``ExternalJWTAuthentication``, so the session, CSRF, auth, message and
+clickjacking middleware and the admin, session, message and static file
+apps only add import time and per-request work. This profile drops them,
+serves only ``/api/`` (``professorsService.urls_api``) and renders JSON
+only.
+
+Run API workers with ``DJANGO_SETTINGS_MODULE=professorsService.settings_api``
+and keep the admin on a separate process using the default
+``professorsService.settings``; both share the database.
+"""
+from .settings import *  # noqa: F401,F403
+from .settings import MIDDLEWARE, REST_FRAMEWORK
+
+# auth and contenttypes stay for their models, which simplejwt's token
+# backend imports; their middleware is what costs per request
+INSTALLED_APPS = [
+    'django.contrib.auth',
+    'django.contrib.contenttypes',
+    'rest_framework',
+    'rest_framework_simplejwt',
+    'base.apps.BaseConfig',
+    'api.apps.ApiConfig',
+]
+
+_STRIPPED_MIDDLEWARE = {
+    'django.contrib.sessions.middleware.SessionMiddleware',
+    'django.middleware.csrf.CsrfViewMiddleware',
+    'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'django.contrib.messages.middleware.MessageMiddleware',
+    'django.middleware.clickjacking.XFrameOptionsMiddleware',
+}
+MIDDLEWARE = [name for name in MIDDLEWARE if name not in _STRIPPED_MIDDLEWARE]
+
+ROOT_URLCONF = 'professorsService.urls_api'
+
+REST_FRAMEWORK = {
+    **REST_FRAMEWORK,
+    'DEFAULT_RENDERER_CLASSES': ['rest_framework.renderers.JSONRenderer'],
+}
@@ -0,0 +1,9 @@
+"""
+URL configuration of the API-only profile (``settings_api``): the API
+without the admin.
+"""
+from django.urls import path, include
+
+urlpatterns = [
+    path('api/', include('api.urls')),
+]